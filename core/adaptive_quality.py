@@ -0,0 +1,228 @@
+"""
+Адаптивное качество видео: понижение и повышение битрейта и разрешения по состоянию канала
+"""
+import copy
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from .session_telemetry import HEALTH_DEGRADED, HEALTH_GOOD, HEALTH_STALLED, HEALTH_WINDOW
+from .utils import debug_print
+
+# Ступени качества (bit_rate, max_size) от лучшей к худшей; 0 - без ограничения размера
+QUALITY_TIERS = (
+    (16000000, 0),
+    (8000000, 1920),
+    (4000000, 1600),
+    (2000000, 1280),
+    (1000000, 1024),
+)
+
+# Сглаживание замеров задержки (экспоненциальное среднее)
+RTT_SMOOTHING = 0.3
+# Во сколько раз может вырасти пауза перед повышением после неудачных попыток
+MAX_UPGRADE_BACKOFF = 16
+# Падение FPS: среднее последних замеров ниже этой доли медианы всей истории
+FPS_DROP_RATIO = 0.5
+
+
+def build_quality_ladder(video: Dict[str, Any]) -> List[Dict[str, int]]:
+    """Строит лестницу качества: первая ступень - настройки пользователя, дальше - ступени ниже нее"""
+    bit_rate = video.get('bit_rate', 0) or QUALITY_TIERS[0][0]
+    max_size = video.get('max_size', 0)
+    ladder = [{'bit_rate': bit_rate, 'max_size': max_size}]
+    for tier_bit_rate, tier_max_size in QUALITY_TIERS:
+        if tier_bit_rate >= bit_rate:
+            continue
+        if max_size and (not tier_max_size or tier_max_size > max_size):
+            tier_max_size = max_size
+        ladder.append({'bit_rate': tier_bit_rate, 'max_size': tier_max_size})
+    return ladder
+
+
+@dataclass
+class AdaptiveSession:
+    """Состояние адаптации одной сессии"""
+    device_id: str
+    ladder: List[Dict[str, int]]
+    tier: int = 0
+    bad_streak: int = 0
+    good_streak: int = 0
+    last_change: float = field(default_factory=time.monotonic)
+    last_upgrade: Optional[float] = None
+    upgrade_backoff: int = 1
+    rtt: Optional[float] = None
+    rtt_request: Optional[int] = None  # id незавершенного замера задержки
+    last_rtt_probe: float = 0.0
+
+
+class AdaptiveQualityController(QObject):
+    """Следит за телеметрией и задержкой канала и меняет ступень качества сессии.
+
+    Плохая оценка - пропуск кадров, зависание, падение FPS или высокая задержка.
+    Гистерезис: понижение - после degrade_after плохих оценок подряд, повышение -
+    после upgrade_after хороших и не раньше upgrade_cooldown. Если после повышения
+    качество быстро пришлось снова понизить, пауза перед следующим повышением
+    удваивается. Сама смена ступени требует перезапуска scrcpy, поэтому контроллер
+    только сообщает о ней сигналом tier_changed.
+    """
+
+    tier_changed = pyqtSignal(str, int, int, dict)  # device_id, прежняя ступень, новая (0 - исходная), качество
+
+    def __init__(self, telemetry, async_adb=None, interval_ms: int = 2000, degrade_after: int = 3,
+                 upgrade_after: int = 30, degrade_cooldown: float = 20.0, upgrade_cooldown: float = 90.0,
+                 settle_time: float = 10.0, rtt_interval: float = 6.0, rtt_bad_ms: float = 150.0,
+                 rtt_good_ms: float = 60.0):
+        super().__init__()
+        self.telemetry = telemetry
+        self.async_adb = async_adb
+        self.degrade_after = degrade_after
+        self.upgrade_after = upgrade_after
+        self.degrade_cooldown = degrade_cooldown
+        self.upgrade_cooldown = upgrade_cooldown
+        self.settle_time = settle_time
+        self.rtt_interval = rtt_interval
+        self.rtt_bad_ms = rtt_bad_ms
+        self.rtt_good_ms = rtt_good_ms
+        self.sessions = {}  # device_id -> AdaptiveSession
+        self._remembered_tiers = {}  # device_id -> ступень, на которой сессия остановилась
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._evaluate)
+        if self.async_adb is not None:
+            self.async_adb.rtt_measured.connect(self._on_rtt_measured)
+
+    # Публичное API
+
+    def track(self, device_id: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """Берет сессию под управление и возвращает настройки с текущей ступенью качества"""
+        ladder = build_quality_ladder(settings.get('video', {}))
+        session = AdaptiveSession(device_id, ladder)
+        # Начинаем со ступени, на которой устройство работало в прошлый раз
+        session.tier = min(self._remembered_tiers.get(device_id, 0), len(ladder) - 1)
+        self.sessions[device_id] = session
+        if not self._timer.isActive():
+            self._timer.start()
+        return self.apply(device_id, settings)
+
+    def untrack(self, device_id: str):
+        """Прекращает управление сессией"""
+        session = self.sessions.pop(device_id, None)
+        if session is not None:
+            self._remembered_tiers[device_id] = session.tier
+        if not self.sessions:
+            self._timer.stop()
+
+    def clear(self):
+        """Прекращает управление всеми сессиями"""
+        for device_id in list(self.sessions):
+            self.untrack(device_id)
+
+    def is_tracked(self, device_id: str) -> bool:
+        """Проверяет, управляется ли качество сессии"""
+        return device_id in self.sessions
+
+    def apply(self, device_id: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """Возвращает копию настроек с битрейтом и размером текущей ступени"""
+        settings = copy.deepcopy(settings)
+        session = self.sessions.get(device_id)
+        if session is not None:
+            settings.setdefault('video', {}).update(session.ladder[session.tier])
+        return settings
+
+    def get_state(self, device_id: str) -> Optional[Dict[str, Any]]:
+        """Возвращает текущую ступень и сглаженную задержку сессии"""
+        session = self.sessions.get(device_id)
+        if session is None:
+            return None
+        return dict(tier=session.tier, tiers=len(session.ladder), rtt=session.rtt, **session.ladder[session.tier])
+
+    # Оценка качества
+
+    def _evaluate(self):
+        """Периодически оценивает все сессии"""
+        now = time.monotonic()
+        for session in list(self.sessions.values()):
+            self._probe_rtt(session, now)
+            snapshot = self.telemetry.snapshot(session.device_id)
+            if snapshot is None or now - session.last_change < self.settle_time:
+                # Сессия еще не дала замеров или только что перезапущена
+                session.bad_streak = session.good_streak = 0
+                continue
+            self._classify(session, snapshot)
+            self._decide(session, now)
+
+    def _classify(self, session: AdaptiveSession, snapshot: Dict[str, Any]):
+        """Обновляет счетчики плохих и хороших оценок подряд"""
+        health = snapshot.get('health')
+        rtt_bad = session.rtt is not None and session.rtt > self.rtt_bad_ms
+        rtt_good = session.rtt is None or session.rtt <= self.rtt_good_ms
+        fps_dropped = self._fps_dropped(snapshot.get('fps_history') or [])
+        if health in (HEALTH_DEGRADED, HEALTH_STALLED) or fps_dropped or rtt_bad:
+            session.bad_streak += 1
+            session.good_streak = 0
+        elif health == HEALTH_GOOD and rtt_good and not fps_dropped:
+            session.good_streak += 1
+            session.bad_streak = 0
+        else:
+            # Промежуточное состояние не приближает ни понижение, ни повышение
+            session.bad_streak = session.good_streak = 0
+
+    @staticmethod
+    def _fps_dropped(fps_history: List[int]) -> bool:
+        """Последние замеры FPS заметно ниже обычного для сессии"""
+        if len(fps_history) < HEALTH_WINDOW * 2:
+            return False  # истории мало, чтобы судить о норме
+        baseline = statistics.median(fps_history)
+        recent = fps_history[-HEALTH_WINDOW:]
+        return baseline > 0 and sum(recent) / len(recent) < baseline * FPS_DROP_RATIO
+
+    def _decide(self, session: AdaptiveSession, now: float):
+        """Меняет ступень, если плохое или хорошее состояние держится достаточно долго"""
+        since_change = now - session.last_change
+        if (session.bad_streak >= self.degrade_after and session.tier < len(session.ladder) - 1
+                and since_change >= self.degrade_cooldown):
+            # Быстрый откат после повышения - повышение было преждевременным
+            if session.last_upgrade is not None and now - session.last_upgrade < self.upgrade_cooldown:
+                session.upgrade_backoff = min(MAX_UPGRADE_BACKOFF, session.upgrade_backoff * 2)
+            self._change_tier(session, session.tier + 1, now)
+        elif (session.good_streak >= self.upgrade_after and session.tier > 0
+              and since_change >= self.upgrade_cooldown * session.upgrade_backoff):
+            session.last_upgrade = now
+            self._change_tier(session, session.tier - 1, now)
+
+    def _change_tier(self, session: AdaptiveSession, tier: int, now: float):
+        """Переходит на другую ступень и сообщает об этом"""
+        previous_tier, session.tier = session.tier, tier
+        session.last_change = now
+        session.bad_streak = session.good_streak = 0
+        quality = dict(session.ladder[tier])
+        debug_print(f"📶 Quality {'down' if tier > previous_tier else 'up'} for {session.device_id}: tier {tier}, "
+                    f"{quality['bit_rate'] // 1000} kbps, max size {quality['max_size'] or 'unlimited'} "
+                    f"(rtt: {session.rtt if session.rtt is None else round(session.rtt)} ms)")
+        self.tier_changed.emit(session.device_id, previous_tier, tier, quality)
+
+    # Задержка канала
+
+    def _probe_rtt(self, session: AdaptiveSession, now: float):
+        """Запрашивает замер задержки, если предыдущий устарел и уже завершился"""
+        if self.async_adb is None or now - session.last_rtt_probe < self.rtt_interval:
+            return
+        if session.rtt_request is not None and self.async_adb.is_pending(session.rtt_request):
+            return  # медленное устройство - не копим замеры
+        session.last_rtt_probe = now
+        session.rtt_request = self.async_adb.measure_rtt(session.device_id)
+
+    def _on_rtt_measured(self, device_id: str, rtt: Optional[float]):
+        """Сглаживает новый замер задержки"""
+        session = self.sessions.get(device_id)
+        if session is None:
+            return
+        session.rtt_request = None
+        if rtt is None:
+            return
+        session.rtt = rtt if session.rtt is None else session.rtt + RTT_SMOOTHING * (rtt - session.rtt)
@@ -0,0 +1,234 @@
+"""
+Клиент протокола ADB-сервера (smart socket) без запуска бинарника adb
+"""
+import os
+import socket
+import threading
+import time
+from typing import Optional
+
+DEFAULT_ADB_HOST = '127.0.0.1'
+DEFAULT_ADB_PORT = 5037
+
+
+class AdbProtocolError(Exception):
+    """Сервер ADB ответил FAIL или нарушил протокол"""
+
+
+class AdbConnectionPool:
+    """Пул соединений с локальным ADB-сервером.
+
+    Сервер закрывает сокет после ответа на host-запрос, а сокет с transport/shell
+    превращается в поток данных, поэтому соединение нельзя использовать повторно.
+    Пул держит несколько заранее открытых «тёплых» сокетов и ограничивает
+    количество одновременных соединений с сервером.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float = 5.0,
+                 max_connections: int = 8, spare_connections: int = 2, max_idle: float = 30.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.spare_connections = spare_connections
+        self.max_idle = max_idle
+        self._semaphore = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self._spare = []  # [(socket, created_at)]
+        self._refilling = False  # пополнение идет в фоновом потоке
+        self._closed = False
+
+    def _open(self) -> socket.socket:
+        """Открывает новое соединение с сервером"""
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def acquire(self) -> socket.socket:
+        """Возвращает готовое соединение (тёплое из пула или новое)"""
+        self._semaphore.acquire()
+        try:
+            now = time.monotonic()
+            with self._lock:
+                while self._spare:
+                    sock, created_at = self._spare.pop()
+                    if now - created_at <= self.max_idle:
+                        sock.settimeout(self.timeout)
+                        return sock
+                    sock.close()
+            return self._open()
+        except Exception:
+            self._semaphore.release()
+            raise
+
+    def release(self, sock: socket.socket):
+        """Закрывает использованное соединение; запас тёплых сокетов пополняется в фоне"""
+        try:
+            sock.close()
+        finally:
+            self._semaphore.release()
+        with self._lock:
+            if self._closed or self._refilling or len(self._spare) >= self.spare_connections:
+                return
+            self._refilling = True
+        # Открытие сокетов не должно задерживать вызывающий поток
+        threading.Thread(target=self._refill, name='adb-pool-refill', daemon=True).start()
+
+    def _refill(self):
+        """Дополняет пул тёплых соединений до нужного размера (выполняется в фоновом потоке)"""
+        try:
+            while True:
+                with self._lock:
+                    if len(self._spare) >= self.spare_connections:
+                        return
+                try:
+                    sock = self._open()
+                except OSError:
+                    return
+                with self._lock:
+                    if self._closed:
+                        sock.close()
+                        return
+                    self._spare.append((sock, time.monotonic()))
+        finally:
+            with self._lock:
+                self._refilling = False
+
+    def close(self):
+        """Закрывает все тёплые соединения"""
+        with self._lock:
+            self._closed = True
+            spare, self._spare = self._spare, []
+        for sock, _ in spare:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+
+class AdbClient:
+    """Клиент smart socket протокола ADB-сервера (127.0.0.1:5037)"""
+
+    def __init__(self, host: str = None, port: int = None, timeout: float = 5.0):
+        self.host = host or DEFAULT_ADB_HOST
+        if port is None:
+            port = int(os.environ.get('ANDROID_ADB_SERVER_PORT', DEFAULT_ADB_PORT))
+        self.port = port
+        self.timeout = timeout
+        self.pool = AdbConnectionPool(self.host, self.port, timeout=timeout)
+
+    # Низкоуровневые операции протокола
+
+    @staticmethod
+    def _encode_request(request: str) -> bytes:
+        """Кодирует запрос: 4 hex-символа длины + тело"""
+        payload = request.encode('utf-8')
+        return f"{len(payload):04x}".encode('ascii') + payload
+
+    @staticmethod
+    def _recv_exact(sock: socket.socket, size: int) -> bytes:
+        """Читает ровно size байт из сокета"""
+        data = bytearray()
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise AdbProtocolError("Соединение с ADB-сервером закрыто")
+            data.extend(chunk)
+        return bytes(data)
+
+    def _read_length_prefixed(self, sock: socket.socket) -> str:
+        """Читает строку с 4-символьным hex-префиксом длины"""
+        length = int(self._recv_exact(sock, 4).decode('ascii'), 16)
+        return self._recv_exact(sock, length).decode('utf-8', errors='replace')
+
+    def _send_request(self, sock: socket.socket, request: str):
+        """Отправляет запрос и проверяет статус OKAY/FAIL"""
+        sock.sendall(self._encode_request(request))
+        status = self._recv_exact(sock, 4)
+        if status == b'OKAY':
+            return
+        if status == b'FAIL':
+            raise AdbProtocolError(self._read_length_prefixed(sock))
+        raise AdbProtocolError(f"Неожиданный ответ ADB-сервера: {status!r}")
+
+    @staticmethod
+    def _read_all(sock: socket.socket) -> bytes:
+        """Читает поток до закрытия соединения сервером"""
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def _host_query(self, request: str) -> str:
+        """Выполняет host-запрос с ответом в формате длина+данные"""
+        sock = self.pool.acquire()
+        try:
+            self._send_request(sock, request)
+            return self._read_length_prefixed(sock)
+        finally:
+            self.pool.release(sock)
+
+    # Публичное API
+
+    def server_version(self) -> int:
+        """Возвращает версию протокола ADB-сервера"""
+        return int(self._host_query('host:version'), 16)
+
+    def is_available(self) -> bool:
+        """Проверяет, доступен ли ADB-сервер"""
+        try:
+            self.server_version()
+            return True
+        except (OSError, AdbProtocolError, ValueError):
+            return False
+
+    def devices_long(self) -> str:
+        """Аналог `adb devices -l` без заголовка"""
+        return self._host_query('host:devices-l')
+
+    def connect(self, address: str) -> str:
+        """Аналог `adb connect <address>`"""
+        return self._host_query(f'host:connect:{address}')
+
+    def disconnect(self, address: str) -> str:
+        """Аналог `adb disconnect <address>`"""
+        return self._host_query(f'host:disconnect:{address}')
+
+    def shell(self, serial: str, command: str, timeout: Optional[float] = None,
+              transport_id: str = '') -> str:
+        """Выполняет shell-команду на устройстве и возвращает её вывод"""
+        sock = self.pool.acquire()
+        try:
+            if timeout is not None:
+                sock.settimeout(timeout)
+            if transport_id:
+                self._send_request(sock, f'host:transport-id:{transport_id}')
+            else:
+                self._send_request(sock, f'host:transport:{serial}')
+            self._send_request(sock, f'shell:{command}')
+            return self._read_all(sock).decode('utf-8', errors='replace')
+        finally:
+            self.pool.release(sock)
+
+    def open_stream(self, request: str) -> socket.socket:
+        """Открывает отдельное долгоживущее соединение для потоковой службы (track-devices)"""
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        try:
+            self._send_request(sock, request)
+        except Exception:
+            sock.close()
+            raise
+        # Дальше сервер присылает данные только при изменениях - ждём без таймаута
+        sock.settimeout(None)
+        return sock
+
+    def read_message(self, sock: socket.socket) -> str:
+        """Читает очередное сообщение потоковой службы"""
+        return self._read_length_prefixed(sock)
+
+    def close(self):
+        """Освобождает ресурсы клиента"""
+        self.pool.close()
+
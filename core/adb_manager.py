@@ -1,11 +1,20 @@
 import os
 import platform
+import re
+import socket
 import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple, Any
 
-from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
 
+from .adb_client import AdbClient, AdbProtocolError
+from .camera_cache import camera_cache
+from .camera_capabilities import CAMERA_PROBE_ARGS, CameraCapabilities, parse_camera_capabilities
+from .device_tracker import DeviceTracker
 from .path_manager import path_manager
+from .property_cache import property_cache
 from .utils import debug_print
 
 
@@ -20,112 +29,421 @@ def run_subprocess_safe(cmd, **kwargs):
     return subprocess.run(cmd, **kwargs)
 
 
+# Поля, которые `adb devices -l` выводит в формате ключ:значение
+DEVICE_LINE_FIELDS = ('usb', 'product', 'model', 'device', 'transport_id')
+
+
+def parse_device_line(line: str) -> Optional[Dict[str, str]]:
+    """Разбирает строку вывода `adb devices -l`.
+
+    Пример: ``emulator-5554  device product:sdk_gphone64 model:Pixel_7 device:emu64x transport_id:1``.
+    Статус может состоять из нескольких слов (``no permissions (...)``), поэтому
+    статусом считается всё между серийным номером и первым известным полем.
+    """
+    parts = line.strip().split()
+    # Пропускаем заголовок и служебные сообщения запуска сервера
+    if len(parts) < 2 or line.startswith('List of devices') or line.startswith('*'):
+        return None
+
+    status_parts = []
+    fields = {}
+    for part in parts[1:]:
+        key, sep, value = part.partition(':')
+        if sep and key in DEVICE_LINE_FIELDS:
+            fields[key] = value
+        elif not fields:
+            status_parts.append(part)
+
+    return {
+        'id': parts[0],
+        'status': ' '.join(status_parts) or 'unknown',
+        **fields
+    }
+
+
+# Свойства, которые запрашиваются одним shell-вызовом при первом обращении к устройству
+BATCH_PROPERTIES = (
+    'ro.product.model',
+    'ro.product.device',
+    'ro.build.version.sdk',
+    'ro.product.cpu.abi',
+    'ro.build.fingerprint',
+)
+# Значения, которые дает не getprop, а отдельные команды (ключ -> команда)
+BATCH_COMMANDS = {
+    'screen_size': 'wm size',
+    'wlan_ip': 'ip -o -4 addr show wlan0',
+    'boot_id': 'cat /proc/sys/kernel/random/boot_id',
+}
+
+
+def build_batch_command(props=BATCH_PROPERTIES, commands=None) -> str:
+    """Строит одну shell-команду, печатающую все значения в виде строк ключ=значение"""
+    commands = BATCH_COMMANDS if commands is None else commands
+    parts = [f'echo "{prop}=$(getprop {prop})"' for prop in props]
+    parts += [f'echo "{key}=$({command} 2>/dev/null)"' for key, command in commands.items()]
+    return '; '.join(parts)
+
+
+def parse_batch_output(output: str, keys) -> Dict[str, str]:
+    """Разбирает вывод build_batch_command; многострочные значения склеиваются"""
+    keys = set(keys)
+    values = {}
+    current = None
+    for line in output.splitlines():
+        key, sep, value = line.partition('=')
+        if sep and key in keys:
+            current = key
+            values[key] = value.strip()
+        elif current is not None and line.strip():
+            values[current] = f"{values[current]}\n{line.strip()}"
+
+    # Приводим вывод вспомогательных команд к коротким значениям
+    if 'screen_size' in values:
+        # "Physical size: 1080x2400" (+ "Override size: ..." - берем последнее)
+        sizes = re.findall(r'(\d+x\d+)', values['screen_size'])
+        values['screen_size'] = sizes[-1] if sizes else ''
+    if 'wlan_ip' in values:
+        match = re.search(r'inet (\d+\.\d+\.\d+\.\d+)', values['wlan_ip'])
+        values['wlan_ip'] = match.group(1) if match else ''
+    return values
+
+
 class AdbManager(QObject):
     """Менеджер для работы с ADB командами"""
 
     device_list_changed = pyqtSignal(list)
+    device_info_updated = pyqtSignal(dict)  # подробности об устройстве получены
+    tracking_state_changed = pyqtSignal(bool)  # True - работает push-отслеживание устройств
+    _device_enriched = pyqtSignal(dict)  # внутренний: результат из рабочего потока
 
-    def __init__(self):
+    def __init__(self, max_parallel_enrichment: int = 8, enrichment_timeout: int = 5):
         super().__init__()
         self.devices = []
+        # Параллельное получение подробностей об устройствах
+        self.max_parallel_enrichment = max(1, max_parallel_enrichment)
+        self.enrichment_timeout = enrichment_timeout
+        self._executor = None
+        self._pending_enrichment = set()
+        self._device_enriched.connect(self._on_device_enriched, Qt.QueuedConnection)
         # Используем PathManager для определения пути к ADB
         self.adb_path = path_manager.get_adb_path()
+        # Работаем с ADB-сервером напрямую по протоколу, бинарник - только запасной вариант
+        self.adb_client = AdbClient()
+        self.tracker = None
+        # Кэш свойств устройств (общий для всех экземпляров)
+        self.property_cache = property_cache
+
+    def _run_adb(self, args: List[str], timeout: float) -> subprocess.CompletedProcess:
+        """Запускает бинарник adb (запасной путь, если сервер недоступен)"""
+        return run_subprocess_safe(
+            [self.adb_path] + args,
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+
+    def _shell(self, device_id: str, command: str, timeout: float = 5) -> Optional[str]:
+        """Выполняет shell-команду на устройстве, возвращает вывод или None при ошибке"""
+        # Адресуем устройство по transport_id, если он известен - он однозначен даже для дублей серийника
+        transport_id = self.get_transport_id(device_id)
+        started = time.monotonic()
+        try:
+            return self.adb_client.shell(device_id, command, timeout=timeout, transport_id=transport_id)
+        except AdbProtocolError as e:
+            # Сервер ответил, но устройство недоступно - бинарник не поможет
+            debug_print(f"⚠️ ADB shell on {device_id} failed: {e}")
+            return None
+        except socket.timeout:
+            # Медленное устройство, а не недоступный сервер - повтор через бинарник ждал бы столько же
+            debug_print(f"⚠️ ADB shell on {device_id} timed out after {timeout}s")
+            return None
+        except ConnectionError as e:
+            debug_print(f"⚠️ ADB server unavailable, falling back to adb binary: {e}")
+        except OSError as e:
+            debug_print(f"⚠️ ADB shell on {device_id} failed: {e}")
+            return None
+
+        # Запасной вызов укладывается в то же время, что и весь запрос
+        remaining = timeout - (time.monotonic() - started)
+        if remaining <= 0:
+            return None
+        try:
+            target = ['-t', transport_id] if transport_id else ['-s', device_id]
+            result = self._run_adb(target + ['shell', command], remaining)
+            if result.returncode == 0:
+                return result.stdout
+        except (subprocess.TimeoutExpired, FileNotFoundError, OSError) as e:
+            debug_print(f"⚠️ Error running adb shell on {device_id}: {e}")
+        return None
 
     def get_devices(self) -> List[Dict[str, str]]:
         """Получает список подключенных устройств"""
         try:
-            result = run_subprocess_safe(
-                [self.adb_path, 'devices', '-l'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if result.returncode != 0:
+            output = self.fetch_devices_output()
+            if output is None:
                 return []
-
-            devices = []
-            lines = result.stdout.strip().split('\n')[1:]  # Пропускаем заголовок
-
-            for line in lines:
-                if line.strip():
-                    # Разбираем строку, учитывая что разделитель может быть пробелами
-                    parts = line.strip().split()
-                    if len(parts) >= 2:
-                        device_id = parts[0]
-                        status = parts[1]
-
-                        # Извлекаем дополнительную информацию
-                        device_info = {
-                            'id': device_id,
-                            'status': status,
-                            'connection_type': self._get_connection_type(device_id),
-                            'model': self._get_device_model(device_id),
-                            'name': self._get_device_name(device_id)
-                        }
-                        devices.append(device_info)
-
-            self.devices = devices
-            self.device_list_changed.emit(devices)
-            return devices
+            return self.apply_devices_output(output)
 
         except (subprocess.TimeoutExpired, FileNotFoundError, Exception) as e:
             debug_print(f"⚠️ Error getting device list: {e}")
             return []
 
+    def fetch_devices_output(self) -> Optional[str]:
+        """Получает вывод `devices -l` (блокирующая часть get_devices, безопасна для рабочего потока)"""
+        try:
+            return self.adb_client.devices_long()
+        except socket.timeout:
+            # Сервер принял соединение, но не отвечает - бинарник ждал бы его столько же
+            debug_print("⚠️ ADB server did not answer host:devices-l in time")
+            return None
+        except (ConnectionError, AdbProtocolError) as e:
+            debug_print(f"⚠️ ADB server unavailable, falling back to adb binary: {e}")
+            result = self._run_adb(['devices', '-l'], timeout=10)
+            if result.returncode != 0:
+                return None
+            return result.stdout
+        except OSError as e:
+            debug_print(f"⚠️ ADB devices request failed: {e}")
+            return None
+
+    def apply_devices_output(self, output: str) -> List[Dict[str, str]]:
+        """Применяет полученный список устройств (вызывается в GUI-потоке)"""
+        devices = self._apply_devices_output(output)
+        debug_print(f"📊 Property cache: {self.property_cache.stats()}")
+        return devices
+
+    def _apply_devices_output(self, output: str) -> List[Dict[str, str]]:
+        """Применяет вывод `devices -l` и сообщает об изменениях только при реальной разнице"""
+        previous = {device['id']: device for device in self.devices}
+        devices = []
+        for line in output.strip().split('\n'):
+            parsed = parse_device_line(line)
+            if parsed is None:
+                continue
+
+            # Для устройств без изменений используем уже полученную информацию
+            known = previous.get(parsed['id'])
+            if known is not None and self._device_state(known) == self._device_state(parsed):
+                devices.append(known)
+                continue
+
+            devices.append(self._build_device_info(parsed))
+
+        # Отключенные и сменившие состояние устройства сбрасывают кэш свойств
+        current = {self._device_state(device) for device in devices}
+        for device in self.devices:
+            if self._device_state(device) not in current:
+                self.property_cache.invalidate(device['id'])
+
+        changed = self._device_states(devices) != self._device_states(self.devices)
+        self.devices = devices
+        # Сначала отдаем базовый список, подробности придут отдельными обновлениями
+        if changed:
+            self.device_list_changed.emit(devices)
+        for device in devices:
+            if self._needs_enrichment(device):
+                self._schedule_enrichment(device)
+        return devices
+
+    def _build_device_info(self, parsed: Dict[str, str]) -> Dict[str, str]:
+        """Заполняет информацию об устройстве из полей `devices -l`, getprop - только для недостающих"""
+        device_id = parsed['id']
+        device_info = {
+            'id': device_id,
+            'status': parsed['status'],
+            'connection_type': self._get_connection_type(device_id),
+            'model': parsed.get('model', ''),
+            'name': parsed.get('device', ''),
+            'product': parsed.get('product', ''),
+            'transport_id': parsed.get('transport_id', ''),
+            'usb': parsed.get('usb', '')
+        }
+
+        # Недостающее берем из кэша свойств без обращения к adb,
+        # остальное догрузит пул в _schedule_enrichment
+        cached = self.property_cache.peek(device_id)
+        if not device_info['model']:
+            device_info['model'] = cached.get('ro.product.model', '')
+        if not device_info['name']:
+            device_info['name'] = cached.get('ro.product.device', '')
+
+        for key in ('model', 'name'):
+            if not device_info[key]:
+                device_info[key] = "Unknown"
+        return device_info
+
+    @staticmethod
+    def _needs_enrichment(device: Dict[str, str]) -> bool:
+        """Проверяет, нужно ли догружать подробности (offline/unauthorized на getprop не отвечают)"""
+        return device['status'] == 'device' and "Unknown" in (device['model'], device['name'])
+
+    def _schedule_enrichment(self, device: Dict[str, str]):
+        """Ставит получение подробностей об устройстве в ограниченный пул потоков"""
+        if device['id'] in self._pending_enrichment:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_parallel_enrichment,
+                                                thread_name_prefix='adb-enrich')
+        self._pending_enrichment.add(device['id'])
+        self._executor.submit(self._enrich_device, dict(device))
+
+    def _enrich_device(self, device: Dict[str, str]):
+        """Получает подробности об устройстве (выполняется в рабочем потоке).
+
+        Вся работа укладывается в один дедлайн enrichment_timeout: только один
+        batched-вызов (или кэш), без повторных запросов отдельных свойств.
+        """
+        deadline = time.monotonic() + self.enrichment_timeout
+        try:
+            device_id = device['id']
+            values = self.property_cache.peek(device_id)
+            if not self.property_cache.has_entry(device_id):
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    values = self.fetch_device_properties(device_id, timeout=remaining)
+            if device['model'] == "Unknown":
+                device['model'] = values.get('ro.product.model') or "Unknown"
+            if device['name'] == "Unknown":
+                device['name'] = values.get('ro.product.device') or "Unknown"
+        except Exception as e:
+            debug_print(f"⚠️ Error getting details for {device['id']}: {e}")
+        self._device_enriched.emit(device)
+
+    def _on_device_enriched(self, device: Dict[str, str]):
+        """Применяет подробности об устройстве в GUI-потоке"""
+        self._pending_enrichment.discard(device['id'])
+        for i, current in enumerate(self.devices):
+            # Устройство могло отключиться или смениться, пока шел запрос
+            if self._device_state(current) == self._device_state(device):
+                self.devices[i] = device
+                self.device_info_updated.emit(device)
+                return
+
+    def shutdown(self):
+        """Останавливает отслеживание и пул получения подробностей"""
+        self.stop_tracking()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    @staticmethod
+    def _device_state(device: Dict[str, str]) -> Tuple[str, str, str]:
+        """Возвращает ключ состояния устройства: (id, статус, transport_id)"""
+        return device['id'], device['status'], device.get('transport_id', '')
+
+    def _device_states(self, devices: List[Dict[str, str]]) -> List[Tuple[str, str, str]]:
+        """Возвращает ключи состояния для сравнения списков устройств"""
+        return [self._device_state(device) for device in devices]
+
+    def get_transport_id(self, device_id: str) -> str:
+        """Возвращает transport_id устройства (для адресации через -t), если известен"""
+        device = self.get_device_info(device_id)
+        return device.get('transport_id', '') if device else ''
+
+    def start_tracking(self):
+        """Запускает push-отслеживание устройств через host:track-devices-l"""
+        if self.tracker is not None:
+            return
+        self.tracker = DeviceTracker(self.adb_client)
+        self.tracker.devices_reported.connect(self._on_devices_reported)
+        self.tracker.tracking_state_changed.connect(self.tracking_state_changed)
+        self.tracker.start()
+
+    def stop_tracking(self):
+        """Останавливает отслеживание устройств"""
+        if self.tracker is None:
+            return
+        tracker, self.tracker = self.tracker, None
+        tracker.devices_reported.disconnect(self._on_devices_reported)
+        tracker.stop()
+        if tracker.is_tracking:
+            self.tracking_state_changed.emit(False)
+
+    def is_tracking(self) -> bool:
+        """Проверяет, приходят ли изменения списка устройств от сервера"""
+        return self.tracker is not None and self.tracker.is_tracking
+
+    def _on_devices_reported(self, output: str):
+        """Обработчик нового списка устройств от трекера"""
+        try:
+            self._apply_devices_output(output)
+        except Exception as e:
+            debug_print(f"⚠️ Error applying tracked device list: {e}")
+
     def _get_connection_type(self, device_id: str) -> str:
         """Определяет тип подключения устройства"""
         if ':' in device_id:
             return 'wireless'
         return 'wired'
 
-    def _get_device_model(self, device_id: str) -> str:
-        """Получает модель устройства"""
-        try:
-            result = run_subprocess_safe(
-                [self.adb_path, '-s', device_id, 'shell', 'getprop', 'ro.product.model'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                return result.stdout.strip()
-        except:
-            pass
-        return "Unknown"
-
-    def _get_device_name(self, device_id: str) -> str:
-        """Получает имя устройства"""
-        try:
-            result = run_subprocess_safe(
-                [self.adb_path, '-s', device_id, 'shell', 'getprop', 'ro.product.device'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                return result.stdout.strip()
-        except:
-            pass
-        return "Unknown"
+    def _read_boot_id(self, device_id: str) -> str:
+        """Читает boot id устройства (меняется при каждой загрузке)"""
+        output = self._shell(device_id, 'cat /proc/sys/kernel/random/boot_id')
+        return output.strip() if output else ''
+
+    def fetch_device_properties(self, device_id: str, timeout: float = 5) -> Dict[str, str]:
+        """Получает все основные свойства устройства за один shell-вызов и кладет их в кэш"""
+        output = self._shell(device_id, build_batch_command(), timeout=timeout)
+        if output is None:
+            return {}
+        values = parse_batch_output(output, list(BATCH_PROPERTIES) + list(BATCH_COMMANDS))
+        boot_id = values.pop('boot_id', '')
+        self.property_cache.put(device_id, values, boot_id)
+        return values
+
+    def get_device_property(self, device_id: str, prop: str) -> Optional[str]:
+        """Получает свойство устройства через кэш, обращаясь к adb только при промахе"""
+        # По истечении TTL сверяем boot id: перезагрузка сбрасывает кэш
+        if self.property_cache.needs_validation(device_id):
+            self.property_cache.validate(device_id, self._read_boot_id(device_id))
+
+        value = self.property_cache.get(device_id, prop)
+        if value is not None:
+            return value
+
+        # Основные свойства получаем пачкой: следующие обращения попадут в кэш
+        if prop in BATCH_PROPERTIES or prop in BATCH_COMMANDS:
+            return self.fetch_device_properties(device_id).get(prop)
+
+        output = self._shell(device_id, f'getprop {prop}')
+        if output is None:
+            return None
+        value = output.strip()
+        boot_id = None if self.property_cache.has_entry(device_id) else self._read_boot_id(device_id)
+        self.property_cache.put(device_id, {prop: value}, boot_id)
+        return value
+
+    def get_device_properties(self, device_id: str) -> Dict[str, str]:
+        """Возвращает закэшированные свойства устройства без обращения к adb"""
+        return self.property_cache.peek(device_id)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Возвращает счетчики попаданий/промахов кэша свойств"""
+        return self.property_cache.stats()
 
     def connect_device(self, ip: str, port: int = 5555) -> Tuple[bool, str]:
         """Подключается к устройству по IP"""
+        address = f'{ip}:{port}'
         try:
-            result = run_subprocess_safe(
-                [self.adb_path, 'connect', f'{ip}:{port}'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if result.returncode == 0:
-                if 'connected' in result.stdout.lower():
-                    return True, "Успешно подключено"
-                else:
-                    return False, result.stdout.strip()
+            try:
+                message = self.adb_client.connect(address).strip()
+            except AdbProtocolError as e:
+                return False, str(e)
+            except socket.timeout:
+                # Повтор через бинарник добавил бы еще один полный таймаут
+                return False, "Таймаут подключения"
+            except ConnectionError as e:
+                debug_print(f"⚠️ ADB server unavailable, falling back to adb binary: {e}")
+                result = self._run_adb(['connect', address], timeout=10)
+                if result.returncode != 0:
+                    return False, result.stderr.strip()
+                message = result.stdout.strip()
+
+            if 'connected' in message.lower():
+                return True, "Успешно подключено"
             else:
-                return False, result.stderr.strip()
+                return False, message
 
         except subprocess.TimeoutExpired:
             return False, "Таймаут подключения"
@@ -135,14 +453,20 @@ class AdbManager(QObject):
     def disconnect_device(self, device_id: str) -> Tuple[bool, str]:
         """Отключает устройство"""
         try:
-            result = run_subprocess_safe(
-                [self.adb_path, 'disconnect', device_id],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-
+            try:
+                self.adb_client.disconnect(device_id)
+                self.property_cache.invalidate(device_id)
+                return True, "Успешно отключено"
+            except AdbProtocolError as e:
+                return False, str(e)
+            except socket.timeout:
+                return False, "Таймаут отключения"
+            except ConnectionError as e:
+                debug_print(f"⚠️ ADB server unavailable, falling back to adb binary: {e}")
+
+            result = self._run_adb(['disconnect', device_id], timeout=5)
             if result.returncode == 0:
+                self.property_cache.invalidate(device_id)
                 return True, "Успешно отключено"
             else:
                 return False, result.stderr.strip()
@@ -158,140 +482,86 @@ class AdbManager(QObject):
         return False
 
     def get_device_info(self, device_id: str) -> Optional[Dict[str, str]]:
-        """Получает информацию о конкретном устройстве"""
+        """Получает информацию о конкретном устройстве (без обращения к adb)"""
         for device in self.devices:
             if device['id'] == device_id:
                 return device
         return None
 
+    def measure_rtt(self, device_id: str) -> Optional[float]:
+        """Измеряет задержку канала до устройства (мс) пустой shell-командой.
+
+        Только через сокет ADB-сервера: запуск бинарника adb добавил бы к замеру
+        время старта процесса, поэтому при любой ошибке возвращается None.
+        """
+        transport_id = self.get_transport_id(device_id)
+        started = time.monotonic()
+        try:
+            self.adb_client.shell(device_id, 'echo', timeout=3, transport_id=transport_id)
+        except (OSError, AdbProtocolError) as e:
+            debug_print(f"⚠️ RTT probe of {device_id} failed: {e}")
+            return None
+        return (time.monotonic() - started) * 1000
+
     def refresh_devices(self):
         """Обновляет список устройств"""
         self.get_devices()
 
-    def get_cameras(self, device_id: str) -> List[Dict[str, Any]]:
-        """Получает список камер для устройства"""
+    def _run_camera_probe(self, device_id: str, probe_args: List[str]) -> Optional[str]:
+        """Запускает пробу scrcpy с постоянным кэшем.
+
+        Ключ кэша - серийник + ro.build.fingerprint, поэтому после обновления ОС
+        проба выполняется заново.
+        """
+        probe = ' '.join(probe_args)
+        fingerprint = self.get_device_property(device_id, 'ro.build.fingerprint') or ''
+        cached = camera_cache.get(device_id, fingerprint, probe)
+        if cached is not None:
+            debug_print(f"📷 Camera probe {probe} for {device_id} served from cache")
+            return cached
+
+        # Используем PathManager для определения пути к scrcpy
+        scrcpy_path = path_manager.get_scrcpy_path()
+        result = run_subprocess_safe(
+            [scrcpy_path, '-s', device_id] + probe_args,
+            capture_output=True,
+            text=True,
+            timeout=15
+        )
+
+        if result.returncode != 0:
+            return None
+
+        camera_cache.put(device_id, fingerprint, probe, result.stdout)
+        return result.stdout
+
+    def reprobe_cameras(self, device_id: str):
+        """Сбрасывает кэш камер устройства: следующий запрос выполнит пробу заново"""
+        camera_cache.invalidate(device_id)
+
+    def get_camera_capabilities(self, device_id: str) -> CameraCapabilities:
+        """Получает возможности всех камер устройства за одну пробу scrcpy"""
         try:
-            # Используем локальный scrcpy для получения списка камер
-            # Используем PathManager для определения пути к scrcpy
-            scrcpy_path = path_manager.get_scrcpy_path()
-            result = run_subprocess_safe(
-                [scrcpy_path, '-s', device_id, '--list-cameras'],
-                capture_output=True,
-                text=True,
-                timeout=15
-            )
-
-            if result.returncode != 0:
-                return []
-
-            cameras = []
-            lines = result.stdout.strip().split('\n')
-
-            for line in lines:
-                if '--camera-id=' in line and 'List of cameras:' not in line:
-                    # Парсим строку вида: --camera-id=0    (back, 4096x3072, fps=[15, 24, 30, 60])
-                    parts = line.split('--camera-id=')
-                    if len(parts) > 1:
-                        camera_info = parts[1].strip()
-                        # Извлекаем ID камеры
-                        camera_id = camera_info.split()[0]
-
-                        # Извлекаем тип камеры (back/front)
-                        camera_type = "unknown"
-                        if "(back," in camera_info:
-                            camera_type = "back"
-                        elif "(front," in camera_info:
-                            camera_type = "front"
-                        elif "(external," in camera_info:
-                            camera_type = "external"
-
-                        # Извлекаем максимальное разрешение
-                        resolution = "unknown"
-                        if "(" in camera_info and ")" in camera_info:
-                            resolution_part = camera_info.split("(")[1].split(")")[0]
-                            if "," in resolution_part:
-                                resolution = resolution_part.split(",")[1].strip()
-
-                        cameras.append({
-                            'id': camera_id,
-                            'type': camera_type,
-                            'max_resolution': resolution,
-                            'description': f"{camera_type} ({resolution})"
-                        })
-
-            return cameras
+            output = self._run_camera_probe(device_id, CAMERA_PROBE_ARGS)
+            if output is None:
+                return CameraCapabilities()
+            return parse_camera_capabilities(output)
         except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired) as e:
-            debug_print(f"⚠️ Error getting camera list: {e}")
-            return []
+            debug_print(f"⚠️ Error probing cameras: {e}")
+            return CameraCapabilities()
+
+    def get_cameras(self, device_id: str) -> List[Dict[str, Any]]:
+        """Получает список камер для устройства"""
+        capabilities = self.get_camera_capabilities(device_id)
+        return [camera.to_legacy_dict() for camera in capabilities.cameras]
 
     def get_camera_sizes(self, device_id: str, camera_id: str) -> List[str]:
         """Получает доступные размеры для конкретной камеры"""
-        try:
-            # Используем PathManager для определения пути к scrcpy
-            scrcpy_path = path_manager.get_scrcpy_path()
-            result = run_subprocess_safe(
-                [scrcpy_path, '-s', device_id, '--list-camera-sizes'],
-                capture_output=True,
-                text=True,
-                timeout=15
-            )
-
-            if result.returncode != 0:
-                return []
-
-            sizes = []
-            lines = result.stdout.strip().split('\n')
-            current_camera = None
-
-            for line in lines:
-                if f'--camera-id={camera_id}' in line:
-                    current_camera = camera_id
-                elif current_camera == camera_id and line.strip().startswith('- '):
-                    # Парсим строки вида: - 1920x1080 или - 1280x720 (fps=[120, 240, 480])
-                    size = line.strip()[2:].strip()
-                    # Убираем дополнительную информацию в скобках
-                    if '(' in size:
-                        size = size.split('(')[0].strip()
-                    if 'x' in size and size not in sizes:
-                        sizes.append(size)
-                elif '--camera-id=' in line and camera_id not in line:
-                    current_camera = None
-
-            return sorted(sizes, key=lambda x: (int(x.split('x')[0]) * int(x.split('x')[1])), reverse=True)
-        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired) as e:
-            debug_print(f"⚠️ Error getting camera dimensions: {e}")
-            return []
+        camera = self.get_camera_capabilities(device_id).get_camera(camera_id)
+        return camera.all_sizes() if camera else []
 
     def get_camera_fps_options(self, device_id: str, camera_id: str) -> List[int]:
         """Получает доступные FPS для конкретной камеры"""
-        try:
-            # Используем PathManager для определения пути к scrcpy
-            scrcpy_path = path_manager.get_scrcpy_path()
-            result = run_subprocess_safe(
-                [scrcpy_path, '-s', device_id, '--list-camera-sizes'],
-                capture_output=True,
-                text=True,
-                timeout=15
-            )
-
-            if result.returncode != 0:
-                return [15, 24, 30, 60]  # Стандартные значения
-
-            fps_options = []
-            lines = result.stdout.strip().split('\n')
-            current_camera = None
-
-            for line in lines:
-                if f'--camera-id={camera_id}' in line:
-                    current_camera = camera_id
-                    # Извлекаем FPS из строки вида: (back, 4096x3072, fps=[15, 24, 30, 60])
-                    if 'fps=[' in line:
-                        fps_part = line.split('fps=[')[1].split(']')[0]
-                        fps_options = [int(x.strip()) for x in fps_part.split(',')]
-                elif '--camera-id=' in line and camera_id not in line:
-                    current_camera = None
-
-            return fps_options if fps_options else [15, 24, 30, 60]
-        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired) as e:
-            debug_print(f"⚠️ Error getting camera FPS: {e}")
-            return [15, 24, 30, 60]
+        camera = self.get_camera_capabilities(device_id).get_camera(camera_id)
+        fps_options = camera.fps_options() if camera else []
+        return fps_options if fps_options else [15, 24, 30, 60]  # Стандартные значения
@@ -0,0 +1,212 @@
+"""
+Асинхронный доступ к AdbManager: блокирующие вызовы выполняются в отдельном QThread
+"""
+import itertools
+import threading
+from typing import Any, Tuple
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+from .adb_manager import AdbManager
+from .utils import debug_print
+
+
+class AdbWorker(QObject):
+    """Исполнитель запросов к ADB, живущий в рабочем потоке"""
+
+    request_finished = pyqtSignal(int, str, object)  # request_id, operation, result
+
+    # Как часто ожидающий запрос проверяет, не остановлен ли исполнитель, с
+    ABANDON_POLL_INTERVAL = 0.1
+
+    def __init__(self, adb_manager: AdbManager):
+        super().__init__()
+        self.adb_manager = adb_manager
+        self._lock = threading.Lock()
+        self._cancelled = set()
+        self._abandoned = threading.Event()
+
+    def abandon(self):
+        """Останавливает исполнитель: начатый запрос доработает в фоне, его результат отбрасывается"""
+        self._abandoned.set()
+
+    def cancel(self, request_id: int):
+        """Помечает запрос как отмененный (если он еще не начался, он будет пропущен)"""
+        with self._lock:
+            self._cancelled.add(request_id)
+
+    def _take_cancelled(self, request_id: int) -> bool:
+        """Проверяет и снимает отметку об отмене запроса"""
+        with self._lock:
+            if request_id in self._cancelled:
+                self._cancelled.discard(request_id)
+                return True
+            return False
+
+    @pyqtSlot(int, str, object)
+    def execute(self, request_id: int, operation: str, args: Tuple):
+        """Выполняет запрос в рабочем потоке.
+
+        Сам блокирующий вызов идет в daemon-потоке: прервать сокет или процесс adb
+        нельзя, а так рабочий поток может завершиться при выходе, не дожидаясь таймаута.
+        """
+        if self._take_cancelled(request_id) or self._abandoned.is_set():
+            return
+        outcome = {}
+        done = threading.Event()
+        runner = threading.Thread(target=self._run, args=(operation, args, outcome, done),
+                                  name=f'adb-{operation}', daemon=True)
+        runner.start()
+        while not done.wait(self.ABANDON_POLL_INTERVAL):
+            if self._abandoned.is_set():
+                debug_print(f"⚠️ ADB request {operation} abandoned on shutdown")
+                return
+        self.request_finished.emit(request_id, operation, outcome['result'])
+
+    def _run(self, operation: str, args: Tuple, outcome: dict, done: threading.Event):
+        """Блокирующий вызов AdbManager (в daemon-потоке)"""
+        try:
+            if operation == 'devices':
+                result = self.adb_manager.fetch_devices_output()
+            elif operation == 'connect':
+                result = self.adb_manager.connect_device(*args)
+            elif operation == 'disconnect':
+                result = self.adb_manager.disconnect_device(*args)
+            elif operation == 'rtt':
+                result = self.adb_manager.measure_rtt(*args)
+            else:
+                result = RuntimeError(f"Unknown operation: {operation}")
+        except Exception as e:
+            debug_print(f"⚠️ ADB request {operation} failed: {e}")
+            result = e
+        outcome['result'] = result
+        done.set()
+
+
+class AsyncAdbManager(QObject):
+    """Асинхронный вариант AdbManager: методы сразу возвращают id запроса, результат - через сигналы"""
+
+    refresh_finished = pyqtSignal(int, list)  # request_id, devices
+    connect_finished = pyqtSignal(int, str, bool, str)  # request_id, address, success, message
+    disconnect_finished = pyqtSignal(int, str, bool, str)  # request_id, device_id, success, message
+    rtt_measured = pyqtSignal(str, object)  # device_id, задержка в мс (None - устройство не ответило)
+    _request = pyqtSignal(int, str, object)
+    _rtt_finished = pyqtSignal(int, str, object)
+
+    def __init__(self, adb_manager: AdbManager):
+        super().__init__()
+        self.adb_manager = adb_manager
+        self._ids = itertools.count(1)
+        self._pending = {}  # request_id -> (operation, args)
+        self._pending_refresh = None
+
+        self.thread = QThread()
+        self.thread.setObjectName('adb-worker')
+        self.worker = AdbWorker(adb_manager)
+        self.worker.moveToThread(self.thread)
+        self._request.connect(self.worker.execute)
+        self.worker.request_finished.connect(self._on_request_finished)
+        self._rtt_finished.connect(self._on_request_finished)
+        self.thread.start()
+
+    def _submit(self, operation: str, args: Tuple = ()) -> int:
+        """Ставит запрос в очередь рабочего потока"""
+        request_id = next(self._ids)
+        self._pending[request_id] = (operation, args)
+        self._request.emit(request_id, operation, args)
+        return request_id
+
+    def refresh_devices(self) -> int:
+        """Запрашивает список устройств; повторные запросы объединяются с уже ожидающим"""
+        if self._pending_refresh is not None:
+            return self._pending_refresh
+        self._pending_refresh = self._submit('devices')
+        return self._pending_refresh
+
+    def connect_device(self, ip: str, port: int = 5555) -> int:
+        """Подключается к устройству по IP"""
+        return self._submit('connect', (ip, port))
+
+    def disconnect_device(self, device_id: str) -> int:
+        """Отключает устройство"""
+        return self._submit('disconnect', (device_id,))
+
+    def measure_rtt(self, device_id: str) -> int:
+        """Измеряет задержку канала до устройства.
+
+        Замер идет в отдельном daemon-потоке, а не в общей очереди: периодические
+        замеры не должны задерживать подключение и обновление списка.
+        """
+        request_id = next(self._ids)
+        self._pending[request_id] = ('rtt', (device_id,))
+        threading.Thread(target=self._measure_rtt, args=(request_id, device_id),
+                         name='adb-rtt', daemon=True).start()
+        return request_id
+
+    def _measure_rtt(self, request_id: int, device_id: str):
+        """Выполняет замер задержки (в daemon-потоке)"""
+        try:
+            rtt = self.adb_manager.measure_rtt(device_id)
+        except Exception as e:
+            debug_print(f"⚠️ RTT probe of {device_id} failed: {e}")
+            rtt = None
+        try:
+            # Сигнал из чужого потока доставляется в GUI-поток через очередь
+            self._rtt_finished.emit(request_id, 'rtt', rtt)
+        except RuntimeError:
+            pass  # менеджер уже удален при выходе
+
+    def is_pending(self, request_id: int) -> bool:
+        """Проверяет, ожидает ли запрос результата"""
+        return request_id in self._pending
+
+    def cancel(self, request_id: int):
+        """Отменяет запрос: не начатый пропускается, результат начатого отбрасывается"""
+        request = self._pending.pop(request_id, None)
+        if request is None:
+            return
+        if self._pending_refresh == request_id:
+            self._pending_refresh = None
+        if request[0] != 'rtt':  # замер идет вне очереди рабочего потока
+            self.worker.cancel(request_id)
+
+    def cancel_all(self):
+        """Отменяет все ожидающие запросы"""
+        for request_id in list(self._pending):
+            self.cancel(request_id)
+
+    def _on_request_finished(self, request_id: int, operation: str, result: Any):
+        """Раздает результаты запросов в GUI-потоке"""
+        request = self._pending.pop(request_id, None)
+        if request is None:
+            return  # запрос отменен
+        _, args = request
+
+        if operation == 'devices':
+            self._pending_refresh = None
+            devices = []
+            if isinstance(result, str):
+                devices = self.adb_manager.apply_devices_output(result)
+            self.refresh_finished.emit(request_id, devices)
+            return
+        if operation == 'rtt':
+            self.rtt_measured.emit(args[0], result if isinstance(result, float) else None)
+            return
+
+        success, message = result if isinstance(result, tuple) else (False, str(result))
+        if operation == 'connect':
+            ip, port = args
+            self.connect_finished.emit(request_id, f'{ip}:{port}', success, message)
+        elif operation == 'disconnect':
+            self.disconnect_finished.emit(request_id, args[0], success, message)
+
+    def shutdown(self, timeout_ms: int = 2000):
+        """Отменяет запросы и останавливает рабочий поток.
+
+        Начатый запрос не ждем: он доработает в daemon-потоке, а результат будет отброшен.
+        """
+        self.cancel_all()
+        self.worker.abandon()
+        self.thread.quit()
+        if not self.thread.wait(timeout_ms):
+            debug_print(f"⚠️ ADB worker thread did not stop in {timeout_ms} ms")
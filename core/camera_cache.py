@@ -0,0 +1,85 @@
+"""
+Постоянный кэш возможностей камер устройства (результаты проб scrcpy)
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from .path_manager import path_manager
+from .utils import debug_print
+
+
+class CameraCapabilityCache:
+    """Кэш результатов `scrcpy --list-cameras/--list-camera-sizes`.
+
+    Ключ - серийник устройства; запись действительна только для того же
+    ro.build.fingerprint, поэтому обновление ОС автоматически сбрасывает кэш.
+    """
+
+    def __init__(self, cache_file: str = None):
+        self.cache_file = cache_file or path_manager.get_data_path('camera_cache.json')
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        """Загружает кэш из файла"""
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+            except (json.JSONDecodeError, IOError) as e:
+                debug_print(f"⚠️ Error loading camera cache: {e}")
+        return {}
+
+    def _save(self):
+        """Сохраняет кэш в файл (вызывается под блокировкой)"""
+        try:
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_file, self.cache_file)
+        except IOError as e:
+            debug_print(f"❌ Error saving camera cache: {e}")
+
+    def get(self, serial: str, fingerprint: str, probe: str) -> Optional[str]:
+        """Возвращает сохраненный вывод пробы или None"""
+        if not fingerprint:
+            return None
+        with self._lock:
+            entry = self._entries.get(serial)
+            if not entry:
+                return None
+            if entry.get('fingerprint') != fingerprint:
+                # ОС обновилась - старые данные о камерах недействительны
+                debug_print(f"🔄 Build fingerprint changed for {serial}, dropping camera cache")
+                del self._entries[serial]
+                self._save()
+                return None
+            return entry.get('probes', {}).get(probe)
+
+    def put(self, serial: str, fingerprint: str, probe: str, output: str):
+        """Сохраняет вывод пробы"""
+        if not fingerprint:
+            return
+        with self._lock:
+            entry = self._entries.get(serial)
+            if not entry or entry.get('fingerprint') != fingerprint:
+                entry = {'fingerprint': fingerprint, 'probes': {}}
+                self._entries[serial] = entry
+            entry['probes'][probe] = output
+            entry['probed_at'] = time.time()
+            self._save()
+
+    def invalidate(self, serial: str):
+        """Сбрасывает кэш устройства (явная повторная проба)"""
+        with self._lock:
+            if self._entries.pop(serial, None) is not None:
+                self._save()
+
+
+# Глобальный экземпляр для использования в других модулях
+camera_cache = CameraCapabilityCache()
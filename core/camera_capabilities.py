@@ -0,0 +1,119 @@
+"""
+Структурированная модель возможностей камер из вывода одной пробы scrcpy
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# --camera-id=0    (back, 4000x3000, fps=[15, 24, 30, 60])
+CAMERA_HEADER_RE = re.compile(
+    r'--camera-id=(?P<id>\S+)\s+\((?P<facing>[^,]+),\s*(?P<size>\d+x\d+)(?:,\s*fps=\[(?P<fps>[^\]]*)\])?\)')
+# - 1920x1080  или  - 1280x720 (fps=[120, 240])
+CAMERA_SIZE_RE = re.compile(r'^\s*-\s+(?P<size>\d+x\d+)(?:\s+\(fps=\[(?P<fps>[^\]]*)\]\))?')
+
+# Аргументы единственной пробы: список камер и размеры за один запуск scrcpy
+CAMERA_PROBE_ARGS = ['--list-cameras', '--list-camera-sizes']
+
+
+def _parse_fps(text: Optional[str]) -> List[int]:
+    """Разбирает список FPS вида '15, 24, 30'"""
+    if not text:
+        return []
+    return [int(value) for value in re.findall(r'\d+', text)]
+
+
+def _size_area(size: str) -> int:
+    """Площадь размера вида 1920x1080 (для сортировки)"""
+    width, height = size.split('x')
+    return int(width) * int(height)
+
+
+@dataclass
+class CameraInfo:
+    """Возможности одной камеры"""
+
+    camera_id: str
+    facing: str = 'unknown'
+    active_size: str = ''  # размер активной области сенсора
+    fps: List[int] = field(default_factory=list)  # поддерживаемые FPS
+    sizes: List[str] = field(default_factory=list)  # обычные размеры
+    high_speed_sizes: Dict[str, List[int]] = field(default_factory=dict)  # размер -> FPS high-speed
+
+    def all_sizes(self) -> List[str]:
+        """Все размеры (обычные и high-speed) по убыванию площади"""
+        sizes = list(dict.fromkeys(self.sizes + list(self.high_speed_sizes)))
+        return sorted(sizes, key=_size_area, reverse=True)
+
+    def fps_options(self, high_speed: bool = False) -> List[int]:
+        """FPS для выбора: обычные либо объединение FPS high-speed размеров"""
+        if not high_speed:
+            return list(self.fps)
+        values = set()
+        for fps in self.high_speed_sizes.values():
+            values.update(fps)
+        return sorted(values)
+
+    def to_legacy_dict(self) -> Dict[str, str]:
+        """Описание камеры в формате AdbManager.get_cameras"""
+        return {
+            'id': self.camera_id,
+            'type': self.facing,
+            'max_resolution': self.active_size or 'unknown',
+            'description': f"{self.facing} ({self.active_size or 'unknown'})"
+        }
+
+
+@dataclass
+class CameraCapabilities:
+    """Возможности всех камер устройства"""
+
+    cameras: List[CameraInfo] = field(default_factory=list)
+
+    def get_camera(self, camera_id: str) -> Optional[CameraInfo]:
+        """Возвращает камеру по id"""
+        for camera in self.cameras:
+            if camera.camera_id == camera_id:
+                return camera
+        return None
+
+
+def parse_camera_capabilities(output: str) -> CameraCapabilities:
+    """Разбирает вывод `scrcpy --list-cameras --list-camera-sizes`.
+
+    Заголовки камер встречаются в обоих списках, поэтому камеры объединяются по id.
+    """
+    capabilities = CameraCapabilities()
+    current = None
+    high_speed = False
+
+    for line in output.splitlines():
+        header = CAMERA_HEADER_RE.search(line)
+        if header:
+            current = capabilities.get_camera(header.group('id'))
+            if current is None:
+                current = CameraInfo(camera_id=header.group('id'))
+                capabilities.cameras.append(current)
+            current.facing = header.group('facing').strip()
+            current.active_size = header.group('size')
+            current.fps = _parse_fps(header.group('fps')) or current.fps
+            high_speed = False
+            continue
+
+        if current is None:
+            continue
+        if 'High speed' in line:
+            high_speed = True
+            continue
+
+        size_match = CAMERA_SIZE_RE.match(line)
+        if size_match:
+            size = size_match.group('size')
+            if high_speed:
+                current.high_speed_sizes[size] = _parse_fps(size_match.group('fps'))
+            elif size not in current.sizes:
+                current.sizes.append(size)
+        elif line.strip() and not line.startswith(' '):
+            # Строка без отступа (лог scrcpy) завершает описание камеры
+            current = None
+
+    return capabilities
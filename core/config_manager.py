@@ -1,7 +1,10 @@
 import json
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
+from .disk_guard import default_disk_guard_settings
+from .postprocess_queue import default_postprocess_settings
+from .resource_governor import default_resource_policy
 from .utils import debug_print
 
 
@@ -40,7 +43,8 @@ class ConfigManager:
                     "max_fps": 0,
                     "codec": "h264",
                     "encoder": "",
-                    "buffer_size": 0
+                    "buffer_size": 0,
+                    "adaptive": False
                 },
                 "audio": {
                     "codec": "opus",
@@ -63,7 +67,14 @@ class ConfigManager:
                 "record": {
                     "file": "",
                     "format": "mp4",
-                    "time_limit": 0
+                    "time_limit": 0,
+                    "record_only": False,  # без окна (--no-playback / --no-window)
+                    "no_control": False,  # только вместе с record_only
+                    "segment_minutes": 0,  # 0 - без ротации по времени
+                    "segment_size_mb": 0,  # 0 - без ротации по размеру
+                    "retention_hours": 0,  # 0 - хранить сегменты без ограничения по возрасту
+                    "retention_size_mb": 0,  # 0 - без ограничения общего объема сегментов
+                    "priority": 0  # при нехватке места первыми останавливаются записи с меньшим приоритетом
                 },
                 "advanced": {
                     "keyboard": "disabled",
@@ -85,7 +96,8 @@ class ConfigManager:
                     "tcpip": "",
                     "select_usb": False,
                     "select_tcpip": False,
-                    "shortcut_mod": "lctrl,lalt,lsuper"
+                    "shortcut_mod": "lctrl,lalt,lsuper",
+                    "restart_policy": "never"
                 }
             }
         }
@@ -112,6 +124,22 @@ class ConfigManager:
         self.config["app_settings"][key] = value
         self.save_config()
 
+    def get_postprocess_settings(self) -> Dict[str, Any]:
+        """Получает настройки фоновой обработки записей"""
+        settings = default_postprocess_settings()
+        settings.update(self.get_app_setting("postprocess", {}))
+        return settings
+
+    def set_postprocess_settings(self, settings: Dict[str, Any]):
+        """Сохраняет настройки фоновой обработки записей"""
+        self.set_app_setting("postprocess", settings)
+
+    def get_disk_guard_settings(self) -> Dict[str, Any]:
+        """Получает настройки контроля места на диске для записей"""
+        settings = default_disk_guard_settings()
+        settings.update(self.get_app_setting("disk_guard", {}))
+        return settings
+
     def get_devices(self) -> List[Dict[str, Any]]:
         """Получает список сохраненных устройств"""
         return self.config.get("devices", [])
@@ -213,6 +241,62 @@ class ConfigManager:
         self.config["devices"] = devices
         self.save_config()
 
+    def get_resource_policy(self, device_id: str) -> Dict[str, Any]:
+        """Получает политику ресурсов хоста для процессов scrcpy устройства"""
+        policy = default_resource_policy()
+        for device in self.config.get("devices", []):
+            if device["id"] == device_id:
+                stored = device.get("resource_policy", {})
+                policy.update({key: value for key, value in stored.items() if key != "cgroup"})
+                policy["cgroup"].update(stored.get("cgroup", {}))
+                break
+        return policy
+
+    def set_resource_policy(self, device_id: str, policy: Dict[str, Any]):
+        """Устанавливает политику ресурсов хоста для устройства"""
+        debug_print(f"🧱 Saving resource policy for device: {device_id}")
+        devices = self.config.get("devices", [])
+        for device in devices:
+            if device["id"] == device_id:
+                device["resource_policy"] = policy
+                break
+        else:
+            devices.append({
+                "id": device_id,
+                "resource_policy": policy
+            })
+
+        self.config["devices"] = devices
+        self.save_config()
+
+    def get_encoder_benchmark(self, device_id: str) -> Optional[Dict[str, Any]]:
+        """Получает результат подбора видеоэнкодера для устройства (None - подбор не выполнялся)"""
+        for device in self.config.get("devices", []):
+            if device["id"] == device_id:
+                return device.get("encoder_benchmark")
+        return None
+
+    def set_encoder_benchmark(self, device_id: str, result: Optional[Dict[str, Any]]):
+        """Сохраняет результат подбора видеоэнкодера (None - сбросить)"""
+        debug_print(f"🏆 Saving encoder benchmark for device: {device_id}")
+        devices = self.config.get("devices", [])
+        for device in devices:
+            if device["id"] == device_id:
+                if result is None:
+                    device.pop("encoder_benchmark", None)
+                else:
+                    device["encoder_benchmark"] = result
+                break
+        else:
+            if result is not None:
+                devices.append({
+                    "id": device_id,
+                    "encoder_benchmark": result
+                })
+
+        self.config["devices"] = devices
+        self.save_config()
+
     def get_default_camera_settings(self) -> Dict[str, Any]:
         """Получает настройки камеры по умолчанию"""
         return {
@@ -0,0 +1,79 @@
+"""
+Отслеживание подключения устройств через поток host:track-devices-l
+"""
+import socket
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from .adb_client import AdbClient, AdbProtocolError
+from .utils import debug_print
+
+
+class DeviceTracker(QThread):
+    """Поток, держащий открытым host:track-devices-l и сообщающий о каждом новом списке"""
+
+    devices_reported = pyqtSignal(str)  # вывод в формате `adb devices -l`
+    tracking_state_changed = pyqtSignal(bool)  # True - поток активен, False - потерян
+
+    def __init__(self, adb_client: AdbClient, min_retry_delay: float = 1.0, max_retry_delay: float = 10.0):
+        super().__init__()
+        self.adb_client = adb_client
+        self.min_retry_delay = min_retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._stop_event = threading.Event()
+        self._sock_lock = threading.Lock()
+        self._sock = None
+        self.is_tracking = False
+
+    def run(self):
+        """Держит соединение открытым и переподключается при обрыве"""
+        retry_delay = self.min_retry_delay
+        while not self._stop_event.is_set():
+            try:
+                sock = self.adb_client.open_stream('host:track-devices-l')
+                with self._sock_lock:
+                    self._sock = sock
+                if self._stop_event.is_set():
+                    break
+                debug_print("📡 Device tracking started")
+                self._set_tracking(True)
+                retry_delay = self.min_retry_delay
+
+                while not self._stop_event.is_set():
+                    self.devices_reported.emit(self.adb_client.read_message(sock))
+
+            except (OSError, AdbProtocolError, ValueError) as e:
+                if not self._stop_event.is_set():
+                    debug_print(f"⚠️ Device tracking lost: {e}")
+            finally:
+                self._close_socket()
+
+            self._set_tracking(False)
+            # Пауза перед переподключением, прерываемая остановкой
+            if self._stop_event.wait(retry_delay):
+                break
+            retry_delay = min(retry_delay * 2, self.max_retry_delay)
+
+    def _set_tracking(self, active: bool):
+        """Сообщает об изменении состояния отслеживания"""
+        if self.is_tracking != active:
+            self.is_tracking = active
+            self.tracking_state_changed.emit(active)
+
+    def _close_socket(self):
+        """Закрывает текущее соединение (прерывает блокирующее чтение)"""
+        with self._sock_lock:
+            sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    def stop(self, timeout_ms: int = 2000):
+        """Останавливает отслеживание и дожидается завершения потока"""
+        self._stop_event.set()
+        self._close_socket()
+        self.wait(timeout_ms)
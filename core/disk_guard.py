@@ -0,0 +1,272 @@
+"""
+Контроль места на диске для записей: оценка потока, проверка перед запуском и остановка записей до заполнения диска
+"""
+import math
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from .recording_segmenter import is_segmented, list_segments
+from .utils import debug_print
+
+# Битрейты scrcpy по умолчанию, если в настройках не заданы
+DEFAULT_VIDEO_BIT_RATE = 8000000
+DEFAULT_AUDIO_BIT_RATE = 128000
+# Запас на контейнер и ключевые кадры
+CONTAINER_OVERHEAD = 1.05
+# Меньше этого запаса (в секундах записи) запуск отклоняется
+MIN_RECORD_SECONDS = 60
+# Сглаживание замеров роста файла (экспоненциальное среднее)
+RATE_SMOOTHING = 0.3
+# Сколько проверок ждать результата ротации, прежде чем остановить ту же запись
+ROTATE_GRACE_CHECKS = 3
+
+ACTION_ROTATE = 'rotate'
+ACTION_STOP = 'stop'
+
+
+def default_disk_guard_settings() -> Dict[str, Any]:
+    """Настройки контроля места по умолчанию"""
+    return {
+        "enabled": True,
+        "reserve_mb": 1024,  # сколько места оставлять свободным
+        "preflight_minutes": 60,  # на сколько минут записи должно хватать места при запуске
+        "stop_before_full_minutes": 5,  # за сколько минут до заполнения останавливать записи
+        "check_interval_sec": 5
+    }
+
+
+def estimate_record_rate(settings: Dict[str, Any]) -> float:
+    """Оценка скорости записи в байтах в секунду по битрейтам видео и звука"""
+    video = settings.get('video', {})
+    audio = settings.get('audio', {})
+    bits = video.get('bit_rate', 0) or DEFAULT_VIDEO_BIT_RATE
+    if not audio.get('disable_audio', False):
+        bits += audio.get('bit_rate', 0) or DEFAULT_AUDIO_BIT_RATE
+    return bits / 8 * CONTAINER_OVERHEAD
+
+
+def _existing_dir(path: str) -> str:
+    """Ближайший существующий каталог пути (файл записи еще не создан)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    while not os.path.isdir(directory) and os.path.dirname(directory) != directory:
+        directory = os.path.dirname(directory)
+    return directory
+
+
+def volume_of(path: str) -> Optional[int]:
+    """Идентификатор тома, на который пишется файл"""
+    try:
+        return os.stat(_existing_dir(path)).st_dev
+    except OSError:
+        return None
+
+
+def free_bytes(path: str) -> Optional[int]:
+    """Свободное место на томе файла"""
+    try:
+        return shutil.disk_usage(_existing_dir(path)).free
+    except OSError:
+        return None
+
+
+@dataclass
+class RecordingWatch:
+    """Наблюдение за файлом одной записи"""
+    device_id: str
+    path: str
+    record: Dict[str, Any]
+    estimated_rate: float
+    priority: int = 0
+    volume: Optional[int] = None
+    last_size: int = 0
+    last_check: float = field(default_factory=time.monotonic)
+    rate: Optional[float] = None  # измеренная скорость роста файла
+    action: str = ''  # ACTION_ROTATE / ACTION_STOP - что уже запрошено
+    action_at: float = 0.0
+
+    @property
+    def current_rate(self) -> float:
+        """Измеренная скорость, а пока замеров нет - оценка по битрейту"""
+        return self.estimated_rate if self.rate is None else self.rate
+
+
+class DiskGuard(QObject):
+    """Следит за местом на дисках, куда пишут записи scrcpy.
+
+    Перед запуском проверяет, что места хватит на preflight_minutes записи
+    с учетом уже идущих записей на тот же том (иначе предупреждает), и
+    отклоняет запуск, если места нет даже на минуту. Во время записи
+    измеряет рост файлов; когда до заполнения тома остается меньше
+    stop_before_full_minutes, просит ротировать (если у записи есть политика
+    хранения и старые сегменты) или остановить запись с наименьшим
+    приоритетом - по одной за проверку, пока прогноз не станет безопасным.
+    """
+
+    rotation_requested = pyqtSignal(str)  # device_id
+    stop_requested = pyqtSignal(str, int)  # device_id, свободно МБ
+    space_low = pyqtSignal(str, int, int)  # каталог, свободно МБ, минут записи осталось
+
+    def __init__(self, config_manager=None):
+        super().__init__()
+        self.config_manager = config_manager
+        self.watches = {}  # device_id -> RecordingWatch
+        self.focused_device: Optional[str] = None
+        self._warned_volumes = set()
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.check)
+
+    # Публичное API
+
+    def get_settings(self) -> Dict[str, Any]:
+        """Текущие настройки контроля места"""
+        if self.config_manager is not None:
+            return self.config_manager.get_disk_guard_settings()
+        return default_disk_guard_settings()
+
+    def preflight(self, device_id: str, settings: Dict[str, Any]) -> Optional[str]:
+        """Проверяет место перед запуском записи; возвращает текст ошибки, если запускать нельзя"""
+        guard = self.get_settings()
+        path = settings.get('record', {}).get('file', '')
+        if not path or not guard.get('enabled', True):
+            return None
+        free = free_bytes(path)
+        if free is None:
+            return None  # место узнать нельзя - не мешаем запуску
+
+        volume = volume_of(path)
+        rate = estimate_record_rate(settings)
+        # Остальные записи на тот же том тоже будут расходовать место
+        total_rate = rate + sum(watch.current_rate for watch in self.watches.values()
+                                if watch.volume == volume and watch.device_id != device_id)
+        headroom = free - guard.get('reserve_mb', 0) * 1024 * 1024
+        debug_print(f"💽 Recording preflight for {device_id}: {free / 1048576:.0f} MB free, "
+                    f"~{rate * 8 / 1000000:.1f} Mbit/s, volume total {total_rate / 1048576:.2f} MB/s")
+        # Перезапуск идущей записи (новый сегмент, другая ступень качества) не отклоняем - за ней следит check()
+        if headroom < total_rate * MIN_RECORD_SECONDS and device_id not in self.watches:
+            return (f"Недостаточно места для записи: свободно {free // 1048576} МБ "
+                    f"в {_existing_dir(path)}")
+
+        time_limit = settings.get('record', {}).get('time_limit', 0)
+        horizon = time_limit if time_limit > 0 else guard.get('preflight_minutes', 60) * 60
+        if headroom < total_rate * horizon and volume not in self._warned_volumes:
+            self._warned_volumes.add(volume)
+            self.space_low.emit(_existing_dir(path), free // 1048576, int(headroom / total_rate / 60))
+        return None
+
+    def track(self, device_id: str, settings: Dict[str, Any]):
+        """Начинает следить за файлом записи запущенной сессии"""
+        record = settings.get('record', {})
+        path = record.get('file', '')
+        if not path:
+            self.untrack(device_id)
+            return
+        previous = self.watches.get(device_id)
+        watch = RecordingWatch(device_id, path, dict(record), estimate_record_rate(settings),
+                               record.get('priority', 0), volume_of(path))
+        if previous is not None and previous.action == ACTION_ROTATE:
+            # Новый сегмент после ротации: помним, что ротация уже была
+            watch.action, watch.action_at = previous.action, previous.action_at
+        self.watches[device_id] = watch
+        if not self._timer.isActive():
+            self._timer.start(int(self.get_settings().get('check_interval_sec', 5) * 1000))
+
+    def untrack(self, device_id: str):
+        """Прекращает наблюдение за записью"""
+        self.watches.pop(device_id, None)
+        if not self.watches:
+            self._timer.stop()
+
+    def set_focused(self, device_id: Optional[str]):
+        """Запись активной сессии останавливается в последнюю очередь"""
+        self.focused_device = device_id
+
+    # Проверка
+
+    def check(self):
+        """Измеряет рост файлов и свободное место, при угрозе заполнения тома освобождает его"""
+        guard = self.get_settings()
+        if not guard.get('enabled', True):
+            return
+        now = time.monotonic()
+        volumes = {}
+        for watch in self.watches.values():
+            self._measure(watch, now)
+            volumes.setdefault(watch.volume, []).append(watch)
+        for volume, watches in volumes.items():
+            self._check_volume(volume, watches, guard, now)
+
+    @staticmethod
+    def _measure(watch: RecordingWatch, now: float):
+        """Обновляет скорость роста файла"""
+        try:
+            size = os.path.getsize(watch.path)
+        except OSError:
+            return  # scrcpy еще не создал файл
+        elapsed = now - watch.last_check
+        if elapsed > 0 and size >= watch.last_size:
+            rate = (size - watch.last_size) / elapsed
+            watch.rate = rate if watch.rate is None else watch.rate + RATE_SMOOTHING * (rate - watch.rate)
+        watch.last_size, watch.last_check = size, now
+
+    def _check_volume(self, volume, watches: List[RecordingWatch], guard: Dict[str, Any], now: float):
+        """Прогноз заполнения одного тома"""
+        path = watches[0].path
+        free = free_bytes(path)
+        if free is None:
+            return
+        total_rate = sum(watch.current_rate for watch in watches if watch.action != ACTION_STOP)
+        headroom = free - guard.get('reserve_mb', 0) * 1024 * 1024
+        seconds_left = headroom / total_rate if total_rate > 0 else math.inf
+
+        warn_seconds = guard.get('preflight_minutes', 60) * 60
+        if seconds_left < warn_seconds:
+            if volume not in self._warned_volumes:
+                self._warned_volumes.add(volume)
+                self.space_low.emit(_existing_dir(path), free // 1048576, int(max(0, seconds_left) / 60))
+        elif seconds_left > warn_seconds * 1.2:
+            self._warned_volumes.discard(volume)
+
+        if headroom > 0 and seconds_left >= guard.get('stop_before_full_minutes', 5) * 60:
+            return
+        victim = self._pick_victim(watches)
+        if victim is None:
+            return
+        grace = ROTATE_GRACE_CHECKS * guard.get('check_interval_sec', 5)
+        if victim.action == ACTION_ROTATE and now - victim.action_at < grace and headroom > 0:
+            return  # ждем, пока политика хранения удалит старые сегменты
+        debug_print(f"💽 Disk {_existing_dir(path)} fills in {max(0, seconds_left):.0f}s "
+                    f"({free / 1048576:.0f} MB free, {total_rate / 1048576:.2f} MB/s): {victim.device_id}")
+        if victim.action != ACTION_ROTATE and self._can_rotate(victim):
+            victim.action, victim.action_at = ACTION_ROTATE, now
+            debug_print(f"💽 Rotating recording of {victim.device_id} to let retention free space")
+            self.rotation_requested.emit(victim.device_id)
+        else:
+            victim.action, victim.action_at = ACTION_STOP, now
+            debug_print(f"💽 Stopping recording of {victim.device_id}: disk almost full")
+            self.stop_requested.emit(victim.device_id, free // 1048576)
+
+    def _pick_victim(self, watches: List[RecordingWatch]) -> Optional[RecordingWatch]:
+        """Запись с наименьшим приоритетом (при равенстве - не активная и растущая быстрее)"""
+        candidates = [watch for watch in watches if watch.action != ACTION_STOP]
+        if not candidates:
+            return None  # все записи тома уже останавливаются
+        return min(candidates, key=lambda watch: (watch.priority, watch.device_id == self.focused_device,
+                                                  -watch.current_rate))
+
+    @staticmethod
+    def _can_rotate(watch: RecordingWatch) -> bool:
+        """Ротация освобождает место, только если политика хранения удалит старые сегменты"""
+        record = watch.record
+        if not is_segmented(record):
+            return False
+        if record.get('retention_hours', 0) <= 0 and record.get('retention_size_mb', 0) <= 0:
+            return False
+        # В настройках процесса - путь сегмента, общий префикс строится от исходного файла
+        base_file = record.get('base_file') or record['file']
+        return len(list_segments(base_file, watch.device_id)) > 1
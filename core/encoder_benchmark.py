@@ -0,0 +1,363 @@
+"""
+Подбор видеоэнкодера устройства: пробные сессии scrcpy по каждой паре кодек/энкодер
+"""
+import os
+import re
+import shutil
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from .path_manager import path_manager
+from .process_backend import create_process_backend
+from .scrcpy_log_parser import EVENT_ENCODER_FAILED, EVENT_FATAL, ScrcpyLogParser
+from .utils import debug_print
+
+# Строка вывода --list-encoders: "--video-codec=h264 --video-encoder=c2.qti.avc.encoder (hw) [vendor]"
+ENCODER_LINE_RE = re.compile(r"--video-codec=(?P<codec>\w+)\s+--video-encoder='?(?P<encoder>[^\s']+)'?"
+                             r"(?:\s+\((?P<kind>hw|sw|hybrid)\))?")
+
+LIST_ENCODERS_TIMEOUT_MS = 20000
+PROBE_TIMEOUT_MS = 20000
+
+
+@dataclass
+class EncoderCandidate:
+    """Пара кодек/энкодер из вывода --list-encoders"""
+    codec: str
+    encoder: str
+    hardware: bool = False
+
+
+@dataclass
+class EncoderTrialResult:
+    """Результат пробной сессии с одним энкодером"""
+    codec: str
+    encoder: str
+    hardware: bool
+    fps: float = 0.0  # устойчивый FPS (кадры записи после прогрева)
+    frames: int = 0
+    error: str = ''
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+def parse_encoder_list(output: str) -> List[EncoderCandidate]:
+    """Извлекает видеоэнкодеры из вывода scrcpy --list-encoders"""
+    candidates = []
+    seen = set()
+    for match in ENCODER_LINE_RE.finditer(output):
+        key = (match.group('codec'), match.group('encoder'))
+        if key in seen:
+            continue
+        seen.add(key)
+        candidates.append(EncoderCandidate(key[0], key[1], match.group('kind') in ('hw', 'hybrid')))
+    return candidates
+
+
+def measure_fps(packet_times: List[float], warmup_seconds: float) -> tuple:
+    """Устойчивый FPS по временам кадров записи: кадры после прогрева на их промежуток времени"""
+    if not packet_times:
+        return 0.0, 0
+    start = packet_times[0] + warmup_seconds
+    sustained = [pts for pts in packet_times if pts >= start] or packet_times
+    span = sustained[-1] - sustained[0]
+    if len(sustained) < 2 or span <= 0:
+        return 0.0, len(packet_times)
+    return (len(sustained) - 1) / span, len(packet_times)
+
+
+def parse_packet_times(output: str) -> List[float]:
+    """Времена кадров из вывода ffprobe -show_entries packet=pts_time"""
+    times = []
+    for line in output.splitlines():
+        try:
+            times.append(float(line.strip().strip(',')))
+        except ValueError:
+            continue  # N/A и служебные строки
+    return sorted(times)
+
+
+def resolve_tool(path: str) -> Optional[str]:
+    """Путь к исполняемому файлу утилиты или None, если ее нет"""
+    if os.path.dirname(path):
+        return path if os.path.isfile(path) and os.access(path, os.X_OK) else None
+    return shutil.which(path)
+
+
+def pick_winner(results: List[EncoderTrialResult]) -> Optional[EncoderTrialResult]:
+    """Выбирает энкодер с наибольшим устойчивым FPS (при равенстве - аппаратный)"""
+    working = [result for result in results if result.ok and result.fps > 0]
+    if not working:
+        return None
+    return max(working, key=lambda result: (result.fps, result.hardware))
+
+
+class EncoderBenchmark(QObject):
+    """Перебирает энкодеры устройства короткими пробными сессиями без окна.
+
+    Сначала выполняется scrcpy --list-encoders, затем для каждой пары
+    кодек/энкодер - сессия без окна длиной trial_seconds с записью во
+    временный файл mkv. Счетчик --print-fps без показа видео не работает,
+    поэтому кадры считаются по записи через ffprobe; первые warmup_seconds
+    не учитываются. Пробы идут по очереди, чтобы не конкурировать за энкодер
+    устройства.
+    """
+
+    progress = pyqtSignal(str, int, int, str)  # device_id, завершено, всего, "codec/encoder"
+    finished = pyqtSignal(str, object)  # device_id, результат (см. to_config) или None (причина - в error)
+
+    def __init__(self, device_id: str, scrcpy_path: str, video_settings: Dict[str, Any] = None,
+                 trial_seconds: float = 8.0, warmup_seconds: int = 2, max_candidates: int = 8,
+                 ffprobe_path: str = None, parent=None):
+        super().__init__(parent)
+        self.device_id = device_id
+        self.scrcpy_path = scrcpy_path
+        self.ffprobe_path = ffprobe_path or path_manager.get_ffprobe_path()
+        self.video_settings = video_settings or {}
+        self.trial_seconds = trial_seconds
+        self.warmup_seconds = warmup_seconds
+        self.max_candidates = max_candidates
+        self.candidates: List[EncoderCandidate] = []
+        self.results: List[EncoderTrialResult] = []
+        self.process = None
+        self._output = []
+        self._current: Optional[EncoderTrialResult] = None
+        self._parser: Optional[ScrcpyLogParser] = None
+        self._trial_file = ''
+        self._cancelled = False
+        self._stopping = False  # процесс пробы останавливаем сами
+        self._process_started = False
+        self.error = ''  # почему перебор прерван (например, не найден ffprobe)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def missing_tool(self) -> Optional[str]:
+        """Имя утилиты, без которой перебор невозможен (scrcpy или ffprobe), или None"""
+        for name, path in (('scrcpy', self.scrcpy_path), ('ffprobe', self.ffprobe_path)):
+            if resolve_tool(path) is None:
+                return name
+        return None
+
+    def start(self):
+        """Запускает перебор (асинхронно)"""
+        missing = self.missing_tool()
+        if missing:
+            self.error = f"{missing} not found"
+            debug_print(f"⚠️ Encoder benchmark for {self.device_id}: {self.error}")
+            self._finish()
+            return
+        debug_print(f"🏁 Encoder benchmark for {self.device_id}: listing encoders")
+        self._run([self.scrcpy_path, '-s', self.device_id, '--list-encoders'], self._on_list_finished,
+                  LIST_ENCODERS_TIMEOUT_MS, 'scrcpy')
+
+    def cancel(self):
+        """Прерывает перебор без сохранения результата"""
+        self._cancelled = True
+        self._timer.stop()
+        if self.process is not None and self.process.is_running():
+            self.process.kill()
+            self.process.wait(1000)
+        self._remove_trial_file()
+
+    def is_running(self) -> bool:
+        """Проверяет, идет ли перебор"""
+        return self.process is not None
+
+    def to_config(self, winner: EncoderTrialResult) -> Dict[str, Any]:
+        """Представление результата для сохранения в конфигурации"""
+        return {
+            "codec": winner.codec,
+            "encoder": winner.encoder,
+            "fps": round(winner.fps, 1),
+            "measured_at": int(time.time()),
+            "results": [asdict(result) for result in self.results]
+        }
+
+    # Запуск процессов
+
+    def _run(self, cmd: List[str], on_finished, timeout_ms: int, tool: str):
+        """Запускает процесс пробы и собирает его вывод"""
+        self._output = []
+        self._stopping = False
+        self._process_started = False
+        self.process = create_process_backend(self)
+        self.process.started.connect(self._on_process_started)
+        self.process.stdout_text.connect(self._on_output)
+        self.process.stderr_text.connect(self._on_output)
+        self.process.error_occurred.connect(self._on_process_error)
+        self.process.finished.connect(lambda exit_code: self._on_run_finished(exit_code, on_finished, cmd[0], tool))
+        if not self.process.start(cmd):
+            self._on_start_failed(cmd[0], tool)
+            return
+        self._timer.start(int(timeout_ms))
+
+    def _on_process_started(self, pid: int):
+        self._process_started = True
+
+    def _on_run_finished(self, exit_code: int, on_finished, path: str, tool: str):
+        """QProcess сообщает о неудачном старте через finished - отличаем его от выхода процесса"""
+        if not self._process_started:
+            self._on_start_failed(path, tool)
+            return
+        on_finished(exit_code)
+
+    def _on_start_failed(self, path: str, tool: str):
+        """scrcpy или ffprobe не запустился - остальные пробы упадут так же, перебор завершается"""
+        self._release_process()
+        self._parser = None
+        if self._cancelled:
+            return
+        self.error = f"{tool} not found" if resolve_tool(path) is None else f"{tool} failed to start"
+        debug_print(f"⚠️ Encoder benchmark for {self.device_id}: {self.error}")
+        if self._current is not None:
+            self._current.error = self.error
+            self._complete_trial(continue_trials=False)
+        self._finish()
+
+    def _on_output(self, text: str):
+        self._output.append(text)
+        if self._current is None or self._parser is None:
+            return  # список энкодеров или разбор записи ffprobe
+        for event in self._parser.feed(text):
+            if event.kind in (EVENT_ENCODER_FAILED, EVENT_FATAL) and not self._current.error:
+                self._current.error = event.message
+                # Энкодер не работает - дальше ждать нечего
+                self._stopping = True
+                self.process.terminate()
+
+    def _on_process_error(self, message: str):
+        if self._stopping:
+            return  # аварийный выход по terminate ошибкой энкодера не считаем
+        if self._current is not None and not self._current.error:
+            self._current.error = message
+
+    def _on_timeout(self):
+        """Время пробы истекло - останавливаем процесс"""
+        if self.process is not None and self.process.is_running():
+            self._stopping = True
+            self.process.terminate()
+
+    def _remove_trial_file(self):
+        """Удаляет временную запись пробы"""
+        if self._trial_file:
+            try:
+                os.remove(self._trial_file)
+            except OSError:
+                pass
+            self._trial_file = ''
+
+    def _release_process(self):
+        self._timer.stop()
+        if self.process is not None:
+            self.process.deleteLater()
+            self.process = None
+
+    # Этапы перебора
+
+    def _on_list_finished(self, exit_code: int):
+        output = ''.join(self._output)
+        self._release_process()
+        if self._cancelled:
+            return
+        self.candidates = parse_encoder_list(output)
+        # Аппаратные энкодеры проверяем первыми - они обычно и выигрывают
+        self.candidates.sort(key=lambda candidate: not candidate.hardware)
+        self.candidates = self.candidates[:self.max_candidates]
+        if not self.candidates:
+            debug_print(f"⚠️ No video encoders reported for {self.device_id} (exit code {exit_code})")
+            self._finish()
+            return
+        debug_print(f"🏁 {len(self.candidates)} encoder candidates for {self.device_id}")
+        self._next_trial()
+
+    def _next_trial(self):
+        """Запускает пробу следующего энкодера или завершает перебор"""
+        if self._cancelled:
+            return
+        if len(self.results) >= len(self.candidates):
+            self._finish()
+            return
+        candidate = self.candidates[len(self.results)]
+        self._current = EncoderTrialResult(candidate.codec, candidate.encoder, candidate.hardware)
+        self._parser = ScrcpyLogParser(self.device_id)
+        safe_id = re.sub(r'[^\w.-]', '_', self.device_id)
+        self._trial_file = os.path.join(tempfile.gettempdir(),
+                                        f"mirrordroid-benchmark-{safe_id}-{len(self.results)}.mkv")
+        self.progress.emit(self.device_id, len(self.results), len(self.candidates),
+                           f"{candidate.codec}/{candidate.encoder}")
+        self._run(self._trial_command(candidate), self._on_trial_finished, self.trial_seconds * 1000, 'scrcpy')
+
+    def _trial_command(self, candidate: EncoderCandidate) -> List[str]:
+        """Команда пробной сессии: без окна, звука и управления, с записью во временный файл"""
+        cmd = [self.scrcpy_path, '-s', self.device_id, '--no-playback', '--no-audio', '--no-control',
+               '--record', self._trial_file, '--record-format', 'mkv',
+               '--video-codec', candidate.codec, '--video-encoder', candidate.encoder]
+        # Нагрузка как в обычной сессии
+        if self.video_settings.get('max_size', 0) > 0:
+            cmd.extend(['--max-size', str(self.video_settings['max_size'])])
+        if self.video_settings.get('bit_rate', 0) > 0:
+            cmd.extend(['--video-bit-rate', str(self.video_settings['bit_rate'])])
+        if self.video_settings.get('max_fps', 0) > 0:
+            cmd.extend(['--max-fps', str(self.video_settings['max_fps'])])
+        return cmd
+
+    def _on_trial_finished(self, exit_code: int):
+        timed_out = not self._timer.isActive()
+        self._release_process()
+        self._parser = None
+        if self._cancelled:
+            return
+        result = self._current
+        if not result.error and not timed_out:
+            # Процесс завершился сам раньше срока - энкодер не держит поток
+            result.error = f"exited with code {exit_code}"
+        if result.error or not os.path.exists(self._trial_file):
+            result.error = result.error or "no recording produced"
+            self._complete_trial()
+            return
+        # Считаем кадры, которые действительно попали в запись
+        self._run([self.ffprobe_path, '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'packet=pts_time',
+                   '-of', 'csv=p=0', self._trial_file], self._on_probe_finished, PROBE_TIMEOUT_MS, 'ffprobe')
+
+    def _on_probe_finished(self, exit_code: int):
+        output = ''.join(self._output)
+        self._release_process()
+        if self._cancelled:
+            return
+        result = self._current
+        if exit_code != 0:
+            result.error = f"ffprobe exited with code {exit_code}"
+        else:
+            result.fps, result.frames = measure_fps(parse_packet_times(output), self.warmup_seconds)
+            if result.fps <= 0:
+                result.error = "no frames recorded"
+        self._complete_trial()
+
+    def _complete_trial(self, continue_trials: bool = True):
+        """Фиксирует результат пробы и переходит к следующей"""
+        result, self._current = self._current, None
+        self._remove_trial_file()
+        debug_print(f"🏁 {self.device_id} {result.codec}/{result.encoder}: "
+                    f"{result.fps:.1f} fps, {result.frames} frames{' (' + result.error + ')' if result.error else ''}")
+        self.results.append(result)
+        if continue_trials:
+            self._next_trial()
+
+    def _finish(self):
+        """Сообщает итог перебора"""
+        winner = pick_winner(self.results)
+        if winner is None:
+            debug_print(f"⚠️ Encoder benchmark for {self.device_id}: no working encoder found")
+            self.finished.emit(self.device_id, None)
+            return
+        debug_print(f"🏆 Encoder benchmark for {self.device_id}: {winner.codec}/{winner.encoder} "
+                    f"({winner.fps:.1f} fps)")
+        self.finished.emit(self.device_id, self.to_config(winner))
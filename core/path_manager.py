@@ -3,6 +3,8 @@
 """
 import os
 import platform
+import shutil
+import sys
 
 
 class PathManager:
@@ -33,6 +35,32 @@ class PathManager:
         else:  # linux, darwin, etc.
             return os.path.join(self.app_dir, 'linux', 'scrcpy-server')
 
+    def get_ffmpeg_path(self) -> str:
+        """Возвращает путь к ffmpeg: из папки приложения, иначе из PATH"""
+        return self._get_tool_path('ffmpeg')
+
+    def get_ffprobe_path(self) -> str:
+        """Возвращает путь к ffprobe: из папки приложения, иначе из PATH"""
+        return self._get_tool_path('ffprobe')
+
+    def _get_tool_path(self, tool: str) -> str:
+        """Ищет утилиту рядом с adb/scrcpy, затем в PATH"""
+        name = f'{tool}.exe' if self.system == 'windows' else tool
+        bundled = os.path.join(self.app_dir, 'win' if self.system == 'windows' else 'linux', name)
+        if os.path.exists(bundled):
+            return bundled
+        return shutil.which(tool) or name
+
+    def get_data_path(self, filename: str) -> str:
+        """Возвращает путь к файлу данных приложения (рядом с config.json)"""
+        if getattr(sys, 'frozen', False):
+            # Приложение упаковано PyInstaller
+            base_dir = os.path.dirname(sys.executable)
+        else:
+            # Приложение запущено из исходного кода
+            base_dir = os.path.dirname(self.app_dir)
+        return os.path.join(base_dir, filename)
+
     def is_windows(self) -> bool:
         """Проверяет, является ли система Windows"""
         return self.system == 'windows'
@@ -0,0 +1,382 @@
+"""
+Фоновая обработка готовых записей через ffmpeg: перепаковка в mp4, архивное сжатие, превью
+"""
+import json
+import os
+import re
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, List, Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from .path_manager import path_manager
+from .process_backend import create_process_backend
+from .resource_governor import ResourceGovernor
+from .scrcpy_log_parser import EVENT_RECORDING_STARTED
+from .utils import debug_print
+
+TASK_REMUX = 'remux'
+TASK_TRANSCODE = 'transcode'
+TASK_THUMBNAIL = 'thumbnail'
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+# Сколько завершенных заданий хранить в истории
+MAX_FINISHED_JOBS = 200
+# Сколько последних строк stderr ffmpeg показывать в ошибке
+ERROR_TAIL_LINES = 3
+
+DURATION_RE = re.compile(r'Duration:\s*(?P<h>\d+):(?P<m>\d+):(?P<s>\d+(?:\.\d+)?)')
+
+
+def default_postprocess_settings() -> Dict[str, Any]:
+    """Настройки обработки записей по умолчанию (выключена)"""
+    return {
+        "enabled": False,
+        "remux_mp4": True,  # mkv -> mp4 без перекодирования
+        "transcode": False,  # сжатая копия для архива
+        "transcode_codec": "libx265",
+        "transcode_crf": 28,
+        "thumbnail": True,
+        "max_workers": 1,  # одновременных процессов ffmpeg
+        "ffmpeg_path": ""  # пусто - встроенный или из PATH
+    }
+
+
+@dataclass
+class PostProcessJob:
+    """Задание обработки одного файла"""
+    id: int
+    device_id: str
+    source: str
+    task: str
+    output: str
+    state: str = JOB_QUEUED
+    progress: int = 0  # проценты, -1 - длительность неизвестна
+    error: str = ''
+    created_at: float = 0.0
+    finished_at: float = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (JOB_DONE, JOB_FAILED)
+
+
+def job_outputs(source: str, settings: Dict[str, Any]) -> List[tuple]:
+    """Задачи и выходные файлы для записи согласно настройкам"""
+    stem, ext = os.path.splitext(source)
+    tasks = []
+    if settings.get('remux_mp4', True) and ext.lower() != '.mp4':
+        tasks.append((TASK_REMUX, f"{stem}.mp4"))
+    if settings.get('transcode', False):
+        tasks.append((TASK_TRANSCODE, f"{stem}_archive.mp4"))
+    if settings.get('thumbnail', True):
+        tasks.append((TASK_THUMBNAIL, f"{stem}.jpg"))
+    return tasks
+
+
+def build_ffmpeg_command(ffmpeg_path: str, job: PostProcessJob, settings: Dict[str, Any]) -> List[str]:
+    """Команда ffmpeg для задания (прогресс выводится в stdout)"""
+    cmd = [ffmpeg_path, '-hide_banner', '-nostdin', '-y', '-progress', 'pipe:1', '-nostats', '-i', job.source]
+    if job.task == TASK_REMUX:
+        cmd.extend(['-map', '0', '-c', 'copy', '-movflags', '+faststart'])
+    elif job.task == TASK_TRANSCODE:
+        cmd.extend(['-map', '0:v:0', '-map', '0:a?', '-c:v', settings.get('transcode_codec', 'libx265'),
+                    '-crf', str(settings.get('transcode_crf', 28)), '-preset', 'medium',
+                    '-c:a', 'aac', '-b:a', '96k', '-movflags', '+faststart'])
+    elif job.task == TASK_THUMBNAIL:
+        cmd.extend(['-vf', 'thumbnail', '-frames:v', '1'])
+    cmd.append(job.output)
+    return cmd
+
+
+class PostProcessQueue(QObject):
+    """Очередь обработки записей, завершенных процессами scrcpy.
+
+    Файлы, о записи которых сообщил scrcpy, ставятся в очередь, когда процесс
+    завершается (так записи упавших сессий тоже обрабатываются), а сегменты
+    сегментированной записи - сразу по сигналу segment_closed, не дожидаясь
+    конца всей записи.
+    Одновременно работает не больше max_workers процессов ffmpeg с минимальным
+    приоритетом CPU и ввода-вывода, чтобы не мешать живым сессиям. Очередь
+    хранится в файле: незавершенные задания продолжатся после перезапуска.
+    """
+
+    job_updated = pyqtSignal(object)  # PostProcessJob
+    queue_changed = pyqtSignal()  # задания добавлены, удалены или сменили состояние
+
+    def __init__(self, scrcpy_manager, config_manager, queue_file: str = None, recording_segmenter=None):
+        super().__init__()
+        self.config_manager = config_manager
+        self.queue_file = queue_file or path_manager.get_data_path('postprocess_queue.json')
+        self.jobs: List[PostProcessJob] = []
+        self._pending = deque()  # id заданий в порядке очереди
+        self._running = {}  # id задания -> процесс
+        self._recorded = {}  # device_id -> файлы, записанные текущим процессом
+        self._queued_sources = set()  # записи, уже поставленные в очередь в этом запуске
+        self._next_id = 1
+        self._governor = ResourceGovernor()
+        self._shutting_down = False
+
+        self._load()
+        scrcpy_manager.session_event.connect(self._on_session_event)
+        scrcpy_manager.process_finished.connect(self._on_process_finished)
+        if recording_segmenter is not None:
+            # Процесс сегмента заменяется следующим, и process_finished для него не приходит
+            recording_segmenter.segment_closed.connect(self._on_segment_closed)
+
+    # Публичное API
+
+    def enqueue(self, device_id: str, source: str) -> List[PostProcessJob]:
+        """Ставит в очередь обработку записи по текущим настройкам.
+
+        Задача, для которой уже есть задание (кроме неудавшегося), повторно не ставится -
+        иначе ffmpeg перезаписал бы готовый результат. Неудавшиеся повторяет retry_failed.
+        """
+        settings = self.config_manager.get_postprocess_settings()
+        added = []
+        for task, output in job_outputs(source, settings):
+            if any(job.source == source and job.task == task and job.state != JOB_FAILED for job in self.jobs):
+                continue
+            job = PostProcessJob(self._next_id, device_id, source, task, output, created_at=time.time())
+            self._next_id += 1
+            self.jobs.append(job)
+            self._pending.append(job.id)
+            added.append(job)
+        if added:
+            debug_print(f"🧾 Queued {len(added)} post-processing jobs for {source}")
+            self._save()
+            self.queue_changed.emit()
+            self._start_next()
+        return added
+
+    def retry_failed(self):
+        """Повторно ставит в очередь неудавшиеся задания"""
+        retried = False
+        for job in self.jobs:
+            if job.state == JOB_FAILED:
+                job.state, job.progress, job.error = JOB_QUEUED, 0, ''
+                self._pending.append(job.id)
+                retried = True
+        if retried:
+            self._save()
+            self.queue_changed.emit()
+            self._start_next()
+
+    def clear_finished(self):
+        """Удаляет из списка выполненные и неудавшиеся задания"""
+        self.jobs = [job for job in self.jobs if not job.finished]
+        self._save()
+        self.queue_changed.emit()
+
+    def pending_count(self) -> int:
+        """Количество заданий в очереди и в работе"""
+        return len(self._pending) + len(self._running)
+
+    def failed_count(self) -> int:
+        """Количество неудавшихся заданий"""
+        return sum(1 for job in self.jobs if job.state == JOB_FAILED)
+
+    def resume(self):
+        """Запускает обработку очереди (например, после включения в настройках)"""
+        self._start_next()
+
+    def shutdown(self):
+        """Останавливает ffmpeg; прерванные задания остаются в очереди до следующего запуска"""
+        self._shutting_down = True
+        for job_id, process in list(self._running.items()):
+            job = self._job(job_id)
+            if job is not None:
+                job.state, job.progress = JOB_QUEUED, 0
+            process.finished.disconnect()
+            process.kill()
+            process.wait(1000)
+            self._governor.release(f"postprocess-{job_id}")
+        self._running.clear()
+        self._save()
+
+    # Отслеживание записей
+
+    def _on_session_event(self, event):
+        """Запоминает файлы, которые пишет процесс scrcpy"""
+        # Только по началу записи: закрытый сегмент уже мог уйти в очередь (см. _on_segment_closed)
+        if event.kind == EVENT_RECORDING_STARTED:
+            path = event.data.get('file', '')
+            files = self._recorded.setdefault(event.device_id, [])
+            if path and path not in files:
+                files.append(path)
+
+    def _on_process_finished(self, device_id: str, exit_code: int):
+        """Процесс scrcpy завершился - его записи закрыты и готовы к обработке"""
+        for path in self._recorded.pop(device_id, []):
+            self._enqueue_recording(device_id, path)
+
+    def _on_segment_closed(self, device_id: str, path: str):
+        """Сегмент записи закрыт - обрабатываем его, не дожидаясь конца сессии"""
+        files = self._recorded.get(device_id, [])
+        if path in files:
+            files.remove(path)
+        if path in self._queued_sources:
+            # Уже поставлен по завершению процесса (резервное закрытие сегмента через 15 с)
+            return
+        self._enqueue_recording(device_id, path)
+
+    def _enqueue_recording(self, device_id: str, path: str):
+        """Ставит готовую запись в очередь, если обработка включена"""
+        if not self.config_manager.get_postprocess_settings().get('enabled', False):
+            return
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._queued_sources.add(path)
+            self.enqueue(device_id, path)
+        else:
+            debug_print(f"⚠️ Recording {path} is missing or empty, post-processing skipped")
+
+    # Выполнение заданий
+
+    def _job(self, job_id: int) -> Optional[PostProcessJob]:
+        return next((job for job in self.jobs if job.id == job_id), None)
+
+    def _start_next(self):
+        """Запускает задания, пока есть свободные места"""
+        if self._shutting_down:
+            return
+        settings = self.config_manager.get_postprocess_settings()
+        if not settings.get('enabled', False):
+            return
+        max_workers = max(1, int(settings.get('max_workers', 1)))
+        while self._pending and len(self._running) < max_workers:
+            job = self._job(self._pending.popleft())
+            if job is None or job.state != JOB_QUEUED:
+                continue
+            self._start_job(job, settings)
+
+    def _start_job(self, job: PostProcessJob, settings: Dict[str, Any]):
+        """Запускает ffmpeg для задания"""
+        if not os.path.exists(job.source):
+            self._finish_job(job, f"Файл не найден: {job.source}")
+            return
+        ffmpeg_path = settings.get('ffmpeg_path') or path_manager.get_ffmpeg_path()
+        cmd = build_ffmpeg_command(ffmpeg_path, job, settings)
+        debug_print(f"🧾 Post-processing job {job.id} ({job.task}): {' '.join(cmd)}")
+
+        job.state, job.progress, job.error = JOB_RUNNING, 0, ''
+        state = {'duration': 0.0, 'stderr': deque(maxlen=ERROR_TAIL_LINES), 'failure': ''}
+        process = create_process_backend(self)
+        self._running[job.id] = process
+        process.started.connect(lambda pid: self._on_job_started(job, pid))
+        process.stdout_text.connect(lambda text: self._on_progress_output(job, state, text))
+        process.stderr_text.connect(lambda text: self._on_ffmpeg_log(state, text))
+        process.error_occurred.connect(lambda message: state.update(failure=message))
+        process.finished.connect(lambda exit_code: self._on_job_finished(job, process, state, exit_code))
+        self.job_updated.emit(job)
+        self.queue_changed.emit()
+        if not process.start(cmd):
+            self._running.pop(job.id, None)
+            process.deleteLater()
+            self._finish_job(job, state['failure'] or "Не удалось запустить ffmpeg")
+
+    def _on_job_started(self, job: PostProcessJob, pid: int):
+        """ffmpeg работает с самым низким приоритетом CPU и диска"""
+        self._governor.apply(f"postprocess-{job.id}", pid, {
+            "enabled": True, "nice": 19, "background_nice": 19, "ionice_class": "idle"
+        })
+
+    @staticmethod
+    def _on_ffmpeg_log(state: Dict[str, Any], text: str):
+        """Берет длительность исходного файла и хвост лога для сообщения об ошибке"""
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            match = DURATION_RE.search(line)
+            if match and not state['duration']:
+                state['duration'] = (int(match.group('h')) * 3600 + int(match.group('m')) * 60
+                                     + float(match.group('s')))
+            state['stderr'].append(line)
+
+    def _on_progress_output(self, job: PostProcessJob, state: Dict[str, Any], text: str):
+        """Разбирает вывод -progress: out_time_us относительно длительности файла"""
+        for line in text.splitlines():
+            key, _, value = line.partition('=')
+            if key != 'out_time_us' or not value.strip().isdigit():
+                continue
+            if not state['duration']:
+                job.progress = -1
+            else:
+                job.progress = min(99, int(int(value) / 1e6 / state['duration'] * 100))
+            self.job_updated.emit(job)
+
+    def _on_job_finished(self, job: PostProcessJob, process, state: Dict[str, Any], exit_code: int):
+        """ffmpeg завершился - фиксируем результат и берем следующее задание"""
+        self._running.pop(job.id, None)
+        self._governor.release(f"postprocess-{job.id}")
+        process.deleteLater()
+        error = ''
+        if exit_code != 0 or not os.path.exists(job.output):
+            error = ' | '.join(state['stderr']) or state['failure'] or f"ffmpeg завершился с кодом {exit_code}"
+        self._finish_job(job, error)
+
+    def _finish_job(self, job: PostProcessJob, error: str = ''):
+        job.state = JOB_FAILED if error else JOB_DONE
+        job.progress = 0 if error else 100
+        job.error = error
+        job.finished_at = time.time()
+        if error:
+            debug_print(f"❌ Post-processing job {job.id} ({job.task}) failed: {error}")
+        else:
+            debug_print(f"✅ Post-processing job {job.id} done: {job.output}")
+        self._trim_history()
+        self._save()
+        self.job_updated.emit(job)
+        self.queue_changed.emit()
+        self._start_next()
+
+    def _trim_history(self):
+        """Ограничивает количество завершенных заданий в истории"""
+        finished = [job for job in self.jobs if job.finished]
+        if len(finished) <= MAX_FINISHED_JOBS:
+            return
+        drop = {job.id for job in sorted(finished, key=lambda job: job.finished_at)[:-MAX_FINISHED_JOBS]}
+        self.jobs = [job for job in self.jobs if job.id not in drop]
+
+    # Хранение очереди
+
+    def _load(self):
+        """Загружает очередь; прерванные задания снова ставятся в очередь"""
+        if not os.path.exists(self.queue_file):
+            return
+        try:
+            with open(self.queue_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            debug_print(f"⚠️ Error loading post-processing queue: {e}")
+            return
+        known = {f.name for f in fields(PostProcessJob)}
+        for item in data.get('jobs', []) if isinstance(data, dict) else []:
+            try:
+                job = PostProcessJob(**{key: value for key, value in item.items() if key in known})
+            except TypeError:
+                continue
+            if job.state == JOB_RUNNING:
+                job.state, job.progress = JOB_QUEUED, 0
+            self.jobs.append(job)
+            if job.state == JOB_QUEUED:
+                self._pending.append(job.id)
+            self._next_id = max(self._next_id, job.id + 1)
+        if self._pending:
+            debug_print(f"🧾 Restored {len(self._pending)} pending post-processing jobs")
+
+    def _save(self):
+        """Сохраняет очередь в файл"""
+        try:
+            tmp_file = f"{self.queue_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'jobs': [asdict(job) for job in self.jobs]}, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_file, self.queue_file)
+        except IOError as e:
+            debug_print(f"❌ Error saving post-processing queue: {e}")
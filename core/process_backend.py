@@ -0,0 +1,260 @@
+"""
+Единый интерфейс запуска процессов scrcpy (QProcess или subprocess.Popen)
+"""
+import abc
+import codecs
+import os
+import platform
+import subprocess
+import threading
+import time
+from typing import List, Optional
+
+from PyQt5.QtCore import QObject, QProcess, pyqtSignal
+
+from .utils import debug_print
+
+# Принудительный выбор бэкенда: MIRRORDROID_PROCESS_BACKEND=popen|qprocess
+PROCESS_BACKEND_ENV = 'MIRRORDROID_PROCESS_BACKEND'
+BACKEND_QPROCESS = 'qprocess'
+BACKEND_POPEN = 'popen'
+
+READ_CHUNK_SIZE = 65536
+
+
+def _new_decoder():
+    """Инкрементальный декодер: многобайтовый символ, разрезанный между чанками, не ломается"""
+    return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+
+class _QObjectABCMeta(type(QObject), abc.ABCMeta):
+    """Метакласс для абстрактных наследников QObject (метакласс sip и ABCMeta)"""
+
+
+class ProcessBackend(QObject, metaclass=_QObjectABCMeta):
+    """Базовый класс процесса: асинхронно читает вывод и сообщает о завершении.
+
+    Сигналы всегда приходят в поток, где живет объект (главный поток GUI).
+    """
+
+    started = pyqtSignal(int)  # pid
+    stdout_text = pyqtSignal(str)
+    stderr_text = pyqtSignal(str)
+    finished = pyqtSignal(int)  # exit_code (не 0 при аварийном завершении)
+    error_occurred = pyqtSignal(str)
+
+    name = ''
+
+    @abc.abstractmethod
+    def start(self, cmd: List[str]) -> bool:
+        """Запускает процесс, не дожидаясь его старта.
+
+        False - если запуск отклонен сразу; иначе о старте сообщит сигнал started,
+        а о неудаче - error_occurred и finished.
+        """
+
+    @abc.abstractmethod
+    def terminate(self):
+        """Просит процесс завершиться"""
+
+    @abc.abstractmethod
+    def kill(self):
+        """Принудительно завершает процесс"""
+
+    @abc.abstractmethod
+    def wait(self, timeout_ms: int) -> bool:
+        """Ждет завершения процесса, True - если процесс завершился"""
+
+    @abc.abstractmethod
+    def is_running(self) -> bool:
+        """Проверяет, работает ли процесс"""
+
+    @abc.abstractmethod
+    def pid(self) -> int:
+        """Идентификатор процесса"""
+
+
+class QtProcessBackend(ProcessBackend):
+    """Процесс на основе QProcess (вывод читается через цикл событий Qt)"""
+
+    name = BACKEND_QPROCESS
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.SeparateChannels)  # Разделяем stdout и stderr
+        self._stdout_decoder = _new_decoder()
+        self._stderr_decoder = _new_decoder()
+
+        self.process.readyReadStandardOutput.connect(self._read_stdout)
+        self.process.readyReadStandardError.connect(self._read_stderr)
+        self.process.finished.connect(self._on_finished)
+        self.process.errorOccurred.connect(self._on_error)
+        self.process.started.connect(lambda: self.started.emit(self.pid()))
+
+    def start(self, cmd: List[str]) -> bool:
+        # Не ждем waitForStarted: о старте сообщит сигнал QProcess.started
+        self.process.start(cmd[0], cmd[1:])
+        return True
+
+    def terminate(self):
+        self.process.terminate()
+
+    def kill(self):
+        self.process.kill()
+
+    def wait(self, timeout_ms: int) -> bool:
+        if self.process.state() == QProcess.NotRunning:
+            return True
+        return self.process.waitForFinished(timeout_ms)
+
+    def is_running(self) -> bool:
+        return self.process.state() != QProcess.NotRunning
+
+    def pid(self) -> int:
+        return int(self.process.processId())
+
+    def _read_stdout(self):
+        text = self._stdout_decoder.decode(self.process.readAllStandardOutput().data())
+        if text:
+            self.stdout_text.emit(text)
+
+    def _read_stderr(self):
+        text = self._stderr_decoder.decode(self.process.readAllStandardError().data())
+        if text:
+            self.stderr_text.emit(text)
+
+    def _on_finished(self, exit_code: int, exit_status):
+        # Дочитываем остатки вывода и хвост декодера
+        self._read_stdout()
+        self._read_stderr()
+        for decoder, signal in ((self._stdout_decoder, self.stdout_text), (self._stderr_decoder, self.stderr_text)):
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                signal.emit(tail)
+        # Аварийное завершение (сигнал) не должно выглядеть как нормальный выход
+        if exit_status == QProcess.CrashExit and exit_code == 0:
+            exit_code = -1
+        self.finished.emit(exit_code)
+
+    def _on_error(self, error):
+        self.error_occurred.emit(f"Ошибка процесса: {error}")
+        # При неудачном старте QProcess не присылает finished - сообщаем сами
+        if error == QProcess.FailedToStart:
+            self.finished.emit(-1)
+
+
+class PopenProcessBackend(ProcessBackend):
+    """Процесс на основе subprocess.Popen.
+
+    stdout и stderr читаются отдельными потоками, поэтому переполнение буфера
+    канала не блокирует scrcpy. Отдельный поток ждет завершения процесса.
+    """
+
+    name = BACKEND_POPEN
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.process: Optional[subprocess.Popen] = None
+        self._readers = []
+
+    def start(self, cmd: List[str]) -> bool:
+        kwargs = {}
+        if platform.system().lower() == 'windows':
+            # Скрываем консоль
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = subprocess.SW_HIDE
+            kwargs['startupinfo'] = startupinfo
+
+        try:
+            self.process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                **kwargs
+            )
+        except OSError as e:
+            self.error_occurred.emit(f"Ошибка запуска: {e}")
+            return False
+
+        self._readers = [
+            threading.Thread(target=self._drain, args=(self.process.stdout, self.stdout_text), daemon=True),
+            threading.Thread(target=self._drain, args=(self.process.stderr, self.stderr_text), daemon=True),
+        ]
+        for reader in self._readers:
+            reader.start()
+        threading.Thread(target=self._wait_for_exit, daemon=True).start()
+
+        self.started.emit(self.process.pid)
+        return True
+
+    @staticmethod
+    def _drain(pipe, signal):
+        """Читает канал до EOF и отдает декодированный текст"""
+        decoder = _new_decoder()
+        try:
+            while True:
+                chunk = pipe.read1(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                text = decoder.decode(chunk)
+                if text:
+                    signal.emit(text)
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                signal.emit(tail)
+        except (OSError, ValueError) as e:
+            debug_print(f"⚠️ Process pipe read failed: {e}")
+        finally:
+            pipe.close()
+
+    def _wait_for_exit(self):
+        """Ждет завершения процесса и сообщает код выхода после того, как вывод дочитан"""
+        exit_code = self.process.wait()
+        # Канал может держать открытым дочерний процесс (например, adb) - ждем не дольше секунды
+        deadline = time.monotonic() + 1.0
+        for reader in self._readers:
+            reader.join(timeout=max(0.0, deadline - time.monotonic()))
+        self.finished.emit(exit_code)
+
+    def terminate(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+
+    def kill(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+
+    def wait(self, timeout_ms: int) -> bool:
+        if self.process is None:
+            return True
+        try:
+            self.process.wait(timeout=timeout_ms / 1000)
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def pid(self) -> int:
+        return self.process.pid if self.process is not None else 0
+
+
+def default_backend_name() -> str:
+    """Выбирает бэкенд: переменная окружения, иначе Popen на Windows вне debug-режима"""
+    forced = os.environ.get(PROCESS_BACKEND_ENV, '').strip().lower()
+    if forced in (BACKEND_QPROCESS, BACKEND_POPEN):
+        return forced
+    if platform.system().lower() == 'windows' and os.environ.get('MIRRORDROID_DEBUG') != '1':
+        return BACKEND_POPEN
+    return BACKEND_QPROCESS
+
+
+def create_process_backend(parent=None, name: str = None) -> ProcessBackend:
+    """Создает процесс выбранного бэкенда"""
+    if (name or default_backend_name()) == BACKEND_POPEN:
+        return PopenProcessBackend(parent)
+    return QtProcessBackend(parent)
@@ -0,0 +1,96 @@
+"""
+Кэш свойств устройств (getprop), привязанный к серийнику и boot id
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+
+class DevicePropertyCache:
+    """Кэш свойств устройств.
+
+    Свойства вида ro.product.* не меняются, пока устройство подключено, поэтому
+    запись живет до отключения устройства или смены boot id. По истечении TTL
+    запись требует повторной проверки boot id (см. AdbManager).
+    """
+
+    def __init__(self, ttl: float = 600.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}  # serial -> {'boot_id': str, 'props': dict, 'validated_at': float}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, serial: str, key: str) -> Optional[str]:
+        """Возвращает свойство из кэша или None (с учетом счетчиков попаданий)"""
+        with self._lock:
+            entry = self._entries.get(serial)
+            if entry is not None and key in entry['props']:
+                self.hits += 1
+                return entry['props'][key]
+            self.misses += 1
+            return None
+
+    def put(self, serial: str, props: Dict[str, str], boot_id: str = None):
+        """Сохраняет свойства устройства"""
+        with self._lock:
+            entry = self._entries.get(serial)
+            if entry is None or (boot_id and entry['boot_id'] and entry['boot_id'] != boot_id):
+                entry = {'boot_id': boot_id or '', 'props': {}, 'validated_at': time.monotonic()}
+                self._entries[serial] = entry
+            elif boot_id and not entry['boot_id']:
+                entry['boot_id'] = boot_id
+            entry['props'].update(props)
+
+    def peek(self, serial: str) -> Dict[str, str]:
+        """Возвращает копию всех закэшированных свойств без учета в счетчиках"""
+        with self._lock:
+            entry = self._entries.get(serial)
+            return dict(entry['props']) if entry else {}
+
+    def has_entry(self, serial: str) -> bool:
+        """Проверяет, есть ли запись для устройства"""
+        with self._lock:
+            return serial in self._entries
+
+    def needs_validation(self, serial: str) -> bool:
+        """Проверяет, истек ли TTL записи (нужно сверить boot id)"""
+        with self._lock:
+            entry = self._entries.get(serial)
+            return entry is not None and time.monotonic() - entry['validated_at'] > self.ttl
+
+    def validate(self, serial: str, boot_id: str) -> bool:
+        """Сверяет boot id: при совпадении продлевает запись, иначе сбрасывает её"""
+        with self._lock:
+            entry = self._entries.get(serial)
+            if entry is None:
+                return False
+            if entry['boot_id'] and boot_id and entry['boot_id'] != boot_id:
+                del self._entries[serial]
+                self.invalidations += 1
+                return False
+            if boot_id:
+                entry['boot_id'] = boot_id
+            entry['validated_at'] = time.monotonic()
+            return True
+
+    def invalidate(self, serial: str):
+        """Сбрасывает кэш устройства (отключение, перезагрузка)"""
+        with self._lock:
+            if self._entries.pop(serial, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Возвращает счетчики кэша"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries)
+            }
+
+
+# Глобальный экземпляр: кэш общий для всех AdbManager (в том числе в диалогах)
+property_cache = DevicePropertyCache()
@@ -0,0 +1,282 @@
+"""
+Сегментированная запись: ротация файлов mkv по времени или размеру и удаление старых сегментов
+"""
+import copy
+import glob
+import math
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from .scrcpy_log_parser import EVENT_RECORDING_FINISHED
+from .utils import debug_print
+
+# mkv остается читаемым, даже если scrcpy не успел закрыть файл
+SEGMENT_FORMAT = 'mkv'
+# Через сколько секунд после ротации сегмент считается закрытым, если scrcpy не сообщил об этом
+CLOSE_FALLBACK_SECONDS = 15.0
+
+
+def is_segmented(record: Dict[str, Any]) -> bool:
+    """Включена ли сегментированная запись"""
+    return bool(record.get('file')) and (record.get('segment_minutes', 0) > 0 or record.get('segment_size_mb', 0) > 0)
+
+
+def segment_prefix(base_file: str, device_id: str) -> str:
+    """Общий префикс файлов сегментов устройства (без расширения)"""
+    stem = os.path.splitext(base_file)[0]
+    safe_id = re.sub(r'[^\w.-]', '_', device_id)
+    return f"{stem}_{safe_id}_"
+
+
+def list_segments(base_file: str, device_id: str) -> List[str]:
+    """Файлы сегментов устройства"""
+    return glob.glob(glob.escape(segment_prefix(base_file, device_id)) + '*.' + SEGMENT_FORMAT)
+
+
+def derived_files(path: str) -> List[str]:
+    """Файлы, созданные из сегмента обработкой (stem.mp4, stem_archive.mp4, stem.jpg)"""
+    stem = glob.escape(os.path.splitext(path)[0])
+    return [derived for derived in glob.glob(stem + '.*') + glob.glob(stem + '_*') if derived != path]
+
+
+def prune_segments(paths: List[str], max_age_hours: float = 0, max_total_mb: float = 0,
+                   keep: tuple = ()) -> List[str]:
+    """Удаляет сегменты старше max_age_hours и самые старые сверх max_total_mb, возвращает удаленные.
+
+    Производные файлы сегмента (см. derived_files) учитываются в объеме и удаляются вместе с ним.
+    """
+    segments = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        companions = derived_files(path)
+        size = stat.st_size + sum(os.path.getsize(companion) for companion in companions
+                                  if os.path.isfile(companion))
+        segments.append((stat.st_mtime, size, path, companions))
+    segments.sort()  # от старых к новым
+
+    now = time.time()
+    total = sum(size for _, size, _, _ in segments)
+    removed = []
+    for mtime, size, path, companions in segments:
+        if path in keep:
+            continue
+        too_old = max_age_hours > 0 and now - mtime > max_age_hours * 3600
+        over_budget = max_total_mb > 0 and total > max_total_mb * 1024 * 1024
+        if not (too_old or over_budget):
+            continue
+        try:
+            os.remove(path)
+        except OSError as e:
+            debug_print(f"⚠️ Could not remove old segment {path}: {e}")
+            continue
+        for companion in companions:
+            try:
+                os.remove(companion)
+            except OSError as e:
+                debug_print(f"⚠️ Could not remove {companion}: {e}")
+        total -= size
+        removed.append(path)
+    return removed
+
+
+@dataclass
+class SegmentedRecording:
+    """Состояние сегментированной записи устройства"""
+    device_id: str
+    record: Dict[str, Any]
+    started_at: float = field(default_factory=time.monotonic)
+    index: int = 0
+    current_path: str = ''
+    segment_started_at: float = 0.0
+    rotating: bool = False
+    closing: Dict[str, float] = field(default_factory=dict)  # путь -> когда началась ротация
+
+
+class RecordingSegmenter(QObject):
+    """Режет длинную запись scrcpy на сегменты.
+
+    scrcpy не умеет переключать файл на лету, поэтому каждый сегмент - это
+    отдельный запуск: prepare() подставляет путь следующего сегмента в настройки
+    перед каждым запуском (в том числе перезапуском после падения), а по времени
+    или размеру текущего файла посылается rotation_requested. Когда исчерпано
+    общее время записи, prepare() возвращает None и сессия завершается. Закрытые
+    сегменты сразу сообщаются сигналом segment_closed, а старые удаляются в фоне.
+    """
+
+    rotation_requested = pyqtSignal(str)  # device_id
+    segment_closed = pyqtSignal(str, str)  # device_id, путь к готовому сегменту
+    segments_pruned = pyqtSignal(str, list)  # device_id, удаленные файлы
+
+    def __init__(self, scrcpy_manager, check_interval_ms: int = 2000):
+        super().__init__()
+        self.recordings = {}  # device_id -> SegmentedRecording
+        self._closing = {}  # путь -> (device_id, record, когда началось закрытие) для остановленных записей
+        self._pruner = ThreadPoolExecutor(max_workers=1, thread_name_prefix='segment-pruner')
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(check_interval_ms)
+        self._timer.timeout.connect(self._check)
+        scrcpy_manager.session_event.connect(self._on_session_event)
+
+    # Публичное API
+
+    def prepare(self, device_id: str, settings: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Подставляет в настройки файл следующего сегмента (фильтр перед запуском scrcpy).
+
+        None - время записи исчерпано, запускать сессию больше не нужно.
+        """
+        record = settings.get('record', {})
+        if not is_segmented(record):
+            self.stop(device_id)
+            return settings
+
+        recording = self.recordings.get(device_id)
+        if recording is None or recording.record.get('file') != record['file']:
+            self.stop(device_id)
+            recording = SegmentedRecording(device_id, dict(record))
+            self.recordings[device_id] = recording
+        self._start_closing(recording)
+
+        settings = copy.deepcopy(settings)
+        segment = settings['record']
+        segment['format'] = SEGMENT_FORMAT
+        segment['base_file'] = record['file']
+        segment['time_limit'] = 0
+        time_limit = record.get('time_limit', 0)
+        if time_limit > 0:
+            # Ограничение времени действует на всю запись, а не на сегмент
+            remaining = time_limit - (time.monotonic() - recording.started_at)
+            if remaining <= 0:
+                debug_print(f"⏹️ Recording time limit reached for {device_id}, ending session")
+                self.stop(device_id)
+                return None
+            segment['time_limit'] = math.ceil(remaining)
+
+        recording.index += 1
+        recording.current_path = (f"{segment_prefix(record['file'], device_id)}"
+                                  f"{time.strftime('%Y%m%d-%H%M%S')}_{recording.index:04d}.{SEGMENT_FORMAT}")
+        recording.segment_started_at = time.monotonic()
+        recording.rotating = False
+        segment['file'] = recording.current_path
+        debug_print(f"🎞️ Recording {device_id} to segment {recording.current_path}")
+        if not self._timer.isActive():
+            self._timer.start()
+        return settings
+
+    def stop(self, device_id: str):
+        """Завершает сегментированную запись устройства (текущий сегмент закроется вместе с процессом)"""
+        recording = self.recordings.pop(device_id, None)
+        if recording is None:
+            return
+        self._start_closing(recording)
+        for path, since in recording.closing.items():
+            self._closing[path] = (device_id, recording.record, since)
+
+    def stop_all(self):
+        """Завершает все сегментированные записи"""
+        for device_id in list(self.recordings):
+            self.stop(device_id)
+
+    def is_recording(self, device_id: str) -> bool:
+        """Идет ли сегментированная запись"""
+        return device_id in self.recordings
+
+    def shutdown(self):
+        """Останавливает фоновую очистку"""
+        self._timer.stop()
+        self._pruner.shutdown(wait=False)
+
+    # Внутренняя логика
+
+    @staticmethod
+    def _start_closing(recording: SegmentedRecording):
+        """Текущий сегмент больше не пишется новым процессом - ждем его закрытия"""
+        if recording.current_path:
+            recording.closing[recording.current_path] = time.monotonic()
+            recording.current_path = ''
+
+    def _check(self):
+        """Проверяет, пора ли сменить сегмент, и закрывает сегменты, о которых scrcpy не сообщил"""
+        now = time.monotonic()
+        for recording in list(self.recordings.values()):
+            record = recording.record
+            if recording.current_path and not recording.rotating:
+                age = now - recording.segment_started_at
+                try:
+                    size = os.path.getsize(recording.current_path)
+                except OSError:
+                    size = 0
+                minutes, size_mb = record.get('segment_minutes', 0), record.get('segment_size_mb', 0)
+                if (minutes > 0 and age >= minutes * 60) or (size_mb > 0 and size >= size_mb * 1024 * 1024):
+                    recording.rotating = True
+                    debug_print(f"🎞️ Rotating recording of {recording.device_id} "
+                                f"(segment {recording.index}: {age:.0f}s, {size / 1048576:.1f} MB)")
+                    self.rotation_requested.emit(recording.device_id)
+            for path, since in list(recording.closing.items()):
+                if now - since >= CLOSE_FALLBACK_SECONDS:
+                    self._segment_closed(recording.device_id, record, path)
+
+        for path, (device_id, record, since) in list(self._closing.items()):
+            if now - since >= CLOSE_FALLBACK_SECONDS:
+                self._segment_closed(device_id, record, path)
+
+        if not self.recordings and not self._closing:
+            self._timer.stop()
+
+    def _on_session_event(self, event):
+        """scrcpy сообщает о завершении записи файла"""
+        if event.kind != EVENT_RECORDING_FINISHED:
+            return
+        path = event.data.get('file', '')
+        recording = self.recordings.get(event.device_id)
+        if recording is not None and path in recording.closing:
+            self._segment_closed(event.device_id, recording.record, path)
+        elif path in self._closing:
+            device_id, record, _ = self._closing[path]
+            self._segment_closed(device_id, record, path)
+        elif recording is not None and path == recording.current_path:
+            # Процесс закончил сегмент сам (например, по ограничению времени)
+            recording.current_path = ''
+            self._segment_closed(event.device_id, recording.record, path)
+
+    def _segment_closed(self, device_id: str, record: Dict[str, Any], path: str):
+        """Сегмент готов: сообщаем о нем и запускаем очистку по политике хранения"""
+        recording = self.recordings.get(device_id)
+        if recording is not None:
+            recording.closing.pop(path, None)
+        self._closing.pop(path, None)
+        if not os.path.exists(path):
+            return  # процесс не успел ничего записать
+        debug_print(f"✅ Segment ready: {path}")
+        self.segment_closed.emit(device_id, path)
+
+        max_age, max_size = record.get('retention_hours', 0), record.get('retention_size_mb', 0)
+        if max_age > 0 or max_size > 0:
+            # Пишущиеся и еще не закрытые сегменты не трогаем
+            keep = tuple(self._closing)
+            if recording is not None:
+                keep += (recording.current_path,) + tuple(recording.closing)
+            future = self._pruner.submit(
+                lambda: prune_segments(list_segments(record['file'], device_id), max_age, max_size, keep))
+            future.add_done_callback(lambda f: self._on_pruned(device_id, f))
+
+    def _on_pruned(self, device_id: str, future):
+        """Результат фоновой очистки (вызывается в потоке очистки)"""
+        try:
+            removed = future.result()
+        except Exception as e:
+            debug_print(f"⚠️ Segment pruning failed for {device_id}: {e}")
+            return
+        if removed:
+            debug_print(f"🧹 Pruned {len(removed)} old segments of {device_id}")
+            # Сигнал из рабочего потока доставляется в GUI-поток через очередь
+            self.segments_pruned.emit(device_id, removed)
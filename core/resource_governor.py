@@ -0,0 +1,216 @@
+"""
+Ограничение ресурсов хоста для процессов scrcpy (Linux): nice, ionice, CPU affinity, cgroup v2
+"""
+import os
+import platform
+import re
+import shutil
+import subprocess
+import threading
+from typing import Any, Dict, List, Optional
+
+from .utils import debug_print
+
+CGROUP_MOUNT = '/sys/fs/cgroup'
+CGROUP_SLICE = 'mirrordroid'
+CPU_MAX_PERIOD = 100000  # мкс
+
+IONICE_CLASSES = {'realtime': 1, 'best-effort': 2, 'idle': 3}
+
+# cpu.weight (1..10000, по умолчанию 100) для активной и фоновых сессий
+FOREGROUND_CPU_WEIGHT = 400
+BACKGROUND_CPU_WEIGHT = 50
+
+
+def default_resource_policy() -> Dict[str, Any]:
+    """Политика ресурсов по умолчанию (выключена)"""
+    return {
+        "enabled": False,
+        "nice": 0,  # для активной сессии
+        "background_nice": 10,  # для остальных сессий
+        "ionice_class": "",  # realtime / best-effort / idle, пусто - не менять
+        "ionice_level": 4,
+        "cpu_affinity": [],  # номера ядер, пусто - все
+        "cgroup": {
+            "enabled": False,
+            "cpu_max_percent": 0,  # 100 = одно ядро, 0 - без ограничения
+            "memory_max_mb": 0  # 0 - без ограничения
+        }
+    }
+
+
+class ResourceGovernor:
+    """Применяет политику ресурсов к процессам scrcpy.
+
+    nice, affinity и ionice задаются для всех потоков процесса (в Linux это
+    атрибуты потока); потоки, созданные позже, наследуют их от создателя, а
+    refresh() и смена активной сессии применяют политику к текущему набору
+    потоков заново. Повысить приоритет обратно (уменьшить nice) без
+    CAP_SYS_NICE нельзя, поэтому при включенном cgroup приоритет активной
+    сессии задается через cpu.weight - его владелец группы может менять свободно.
+    """
+
+    def __init__(self, cgroup_root: str = None):
+        self.supported = platform.system().lower() == 'linux'
+        self.cgroup_root = cgroup_root or os.path.join(CGROUP_MOUNT, CGROUP_SLICE)
+        self.sessions = {}  # device_id -> {'pid': int, 'policy': dict, 'cgroup': Optional[str]}
+        self.focused_device: Optional[str] = None
+
+    # Публичное API
+
+    def apply(self, device_id: str, pid: int, policy: Dict[str, Any]):
+        """Применяет политику к только что запущенному процессу"""
+        if not self.supported or not pid or not policy.get('enabled', False):
+            return
+        record = {'pid': pid, 'policy': policy, 'cgroup': None}
+        self.sessions[device_id] = record
+
+        cgroup = policy.get('cgroup', {})
+        if cgroup.get('enabled', False):
+            record['cgroup'] = self._attach_cgroup(device_id, pid, cgroup)
+        self._apply_threads(device_id, record)
+
+    def refresh(self, device_id: str):
+        """Применяет политику к потокам, которые процесс создал после запуска"""
+        record = self.sessions.get(device_id)
+        if record is not None:
+            self._apply_threads(device_id, record)
+
+    def release(self, device_id: str, pid: int = None):
+        """Забывает сессию и удаляет ее cgroup"""
+        record = self.sessions.get(device_id)
+        if record is None or (pid is not None and record['pid'] != pid):
+            return
+        del self.sessions[device_id]
+        if record['cgroup']:
+            try:
+                os.rmdir(record['cgroup'])
+            except OSError as e:
+                debug_print(f"⚠️ Could not remove cgroup {record['cgroup']}: {e}")
+        if self.focused_device == device_id:
+            self.focused_device = None
+
+    def set_focused(self, device_id: Optional[str]):
+        """Делает сессию активной: ей приоритет, остальным - фоновый"""
+        if device_id == self.focused_device:
+            return
+        self.focused_device = device_id
+        for session_id, record in self.sessions.items():
+            self._apply_priority(session_id, record)
+
+    # Отдельные механизмы
+
+    @staticmethod
+    def _thread_ids(pid: int) -> List[int]:
+        """Потоки процесса (nice и affinity в Linux задаются на поток)"""
+        try:
+            return [int(tid) for tid in os.listdir(f'/proc/{pid}/task')]
+        except OSError:
+            return [pid]
+
+    def _apply_threads(self, device_id: str, record: Dict[str, Any]):
+        """Применяет ionice, affinity и приоритет ко всем текущим потокам процесса"""
+        policy = record['policy']
+        self._apply_ionice(record['pid'], policy)
+        self._apply_affinity(record['pid'], policy.get('cpu_affinity') or [])
+        self._apply_priority(device_id, record)
+
+    def _apply_priority(self, device_id: str, record: Dict[str, Any]):
+        """Задает nice и cpu.weight в зависимости от того, активна ли сессия"""
+        policy = record['policy']
+        focused = device_id == self.focused_device
+        nice = policy.get('nice', 0) if focused else policy.get('background_nice', 10)
+        denied = 0
+        for tid in self._thread_ids(record['pid']):
+            try:
+                os.setpriority(os.PRIO_PROCESS, tid, nice)
+            except PermissionError:
+                # Уменьшить nice без привилегий нельзя - остальным потокам значение все равно задаем
+                denied += 1
+            except OSError:
+                continue
+        if denied:
+            # Где nice не изменился, остается cpu.weight
+            debug_print(f"⚠️ No permission to set nice {nice} for {denied} threads of {device_id}")
+        if record['cgroup']:
+            weight = FOREGROUND_CPU_WEIGHT if focused else BACKGROUND_CPU_WEIGHT
+            self._write(os.path.join(record['cgroup'], 'cpu.weight'), str(weight))
+
+    def _apply_ionice(self, pid: int, policy: Dict[str, Any]):
+        """Задает класс и уровень ввода-вывода всех потоков утилитой ionice (в фоновом потоке)"""
+        io_class = IONICE_CLASSES.get(policy.get('ionice_class') or '')
+        if io_class is None:
+            return
+        ionice = shutil.which('ionice')
+        if not ionice:
+            debug_print("⚠️ ionice not found, I/O priority not applied")
+            return
+        cmd = [ionice, '-c', str(io_class)]
+        if io_class != IONICE_CLASSES['idle']:
+            cmd += ['-n', str(policy.get('ionice_level', 4))]
+        cmd += ['-p'] + [str(tid) for tid in self._thread_ids(pid)]
+        # Запуск утилиты не должен задерживать GUI-поток
+        threading.Thread(target=self._run_ionice, args=(cmd,), name='ionice', daemon=True).start()
+
+    @staticmethod
+    def _run_ionice(cmd: List[str]):
+        """Выполняет ionice (вызывается в фоновом потоке)"""
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
+        except (OSError, subprocess.SubprocessError) as e:
+            debug_print(f"⚠️ ionice failed: {e}")
+            return
+        if result.returncode != 0:
+            debug_print(f"⚠️ ionice failed: {result.stderr.strip()}")
+
+    def _apply_affinity(self, pid: int, cpus: List[int]):
+        """Привязывает процесс к заданным ядрам"""
+        if not cpus:
+            return
+        available = os.sched_getaffinity(0)
+        cpus = {cpu for cpu in cpus if cpu in available}
+        if not cpus:
+            debug_print("⚠️ CPU affinity ignored: none of the configured CPUs are available")
+            return
+        for tid in self._thread_ids(pid):
+            try:
+                os.sched_setaffinity(tid, cpus)
+            except OSError:
+                continue
+
+    def _attach_cgroup(self, device_id: str, pid: int, cgroup: Dict[str, Any]) -> Optional[str]:
+        """Создает cgroup v2 для сессии, задает cpu.max/memory.max и переносит туда процесс"""
+        if not os.path.exists(os.path.join(CGROUP_MOUNT, 'cgroup.controllers')):
+            debug_print("⚠️ cgroup v2 is not mounted, cgroup limits skipped")
+            return None
+
+        path = os.path.join(self.cgroup_root, re.sub(r'[^\w.-]', '_', device_id))
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError as e:
+            debug_print(f"⚠️ Could not create cgroup {path}: {e}")
+            return None
+        # Контроллеры должны быть включены у родителя
+        self._write(os.path.join(self.cgroup_root, 'cgroup.subtree_control'), '+cpu +memory')
+
+        cpu_percent = cgroup.get('cpu_max_percent', 0)
+        cpu_max = f"{int(CPU_MAX_PERIOD * cpu_percent / 100)} {CPU_MAX_PERIOD}" if cpu_percent > 0 else 'max'
+        self._write(os.path.join(path, 'cpu.max'), cpu_max)
+        memory_mb = cgroup.get('memory_max_mb', 0)
+        self._write(os.path.join(path, 'memory.max'), str(memory_mb * 1024 * 1024) if memory_mb > 0 else 'max')
+
+        if not self._write(os.path.join(path, 'cgroup.procs'), str(pid)):
+            return None
+        debug_print(f"🧱 scrcpy {device_id} moved to cgroup {path} (cpu.max={cpu_max})")
+        return path
+
+    @staticmethod
+    def _write(path: str, value: str) -> bool:
+        """Записывает значение в файл cgroup"""
+        try:
+            with open(path, 'w') as f:
+                f.write(value)
+            return True
+        except OSError as e:
+            debug_print(f"⚠️ Could not write {value!r} to {path}: {e}")
+            return False
@@ -0,0 +1,162 @@
+"""
+Потоковый разбор вывода scrcpy в типизированные события сессии
+"""
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Типы событий
+EVENT_VERSION = 'version'
+EVENT_DEVICE = 'device'
+EVENT_RESOLUTION = 'resolution'
+EVENT_CODEC = 'codec'
+EVENT_ENCODER = 'encoder'
+EVENT_FPS = 'fps'
+EVENT_RECORDING_STARTED = 'recording_started'
+EVENT_RECORDING_FINISHED = 'recording_finished'
+EVENT_AUDIO_WARNING = 'audio_warning'
+EVENT_ENCODER_FAILED = 'encoder_failed'
+EVENT_DISCONNECTED = 'disconnected'
+EVENT_ERROR = 'error'
+EVENT_FATAL = 'fatal'
+EVENT_LOG = 'log'
+
+# Уровень и источник: "[server] INFO: ..." или "WARN: ..."
+LOG_LINE_RE = re.compile(r'^(?:\[(?P<source>\w+)\]\s*)?(?P<level>VERBOSE|DEBUG|INFO|WARN|ERROR):\s*(?P<message>.*)$')
+
+VERSION_RE = re.compile(r'^scrcpy (?P<version>\S+)')
+DEVICE_RE = re.compile(r'^Device:\s*(?:\[(?P<manufacturer>[^\]]*)\]\s*)?(?P<model>.+?)'
+                       r'(?:\s*\(Android (?P<android>[^)]+)\))?$')
+TEXTURE_RE = re.compile(r'^Texture:\s*(?P<width>\d+)x(?P<height>\d+)')
+CODEC_RE = re.compile(r'^(?P<stream>Video|Audio) codec:\s*(?P<codec>\w+)', re.IGNORECASE)
+ENCODER_RE = re.compile(r"^(?:Using )?(?P<stream>video |audio )?encoder:\s*'?(?P<encoder>[\w.\-]+)'?", re.IGNORECASE)
+FPS_RE = re.compile(r'^(?P<fps>\d+) fps(?: \(\+(?P<skipped>\d+) frames? skipped\))?')
+RECORDING_STARTED_RE = re.compile(r'^Recording started to (?P<format>\w+) file:\s*(?P<file>.+)$')
+RECORDING_FINISHED_RE = re.compile(r'^Recording complete to (?P<format>\w+) file:\s*(?P<file>.+)$')
+AUDIO_RE = re.compile(r'\baudio\b', re.IGNORECASE)
+ENCODER_FAILURE_RE = re.compile(r'encod(?:er|ing)|MediaCodec|CodecException', re.IGNORECASE)
+DISCONNECTED_RE = re.compile(r'^Device disconnected', re.IGNORECASE)
+
+# Ошибки, после которых сессия не сможет продолжиться
+FATAL_PATTERNS = (
+    re.compile(r'Could not find any ADB device', re.IGNORECASE),
+    re.compile(r'Server connection failed', re.IGNORECASE),
+    re.compile(r'Could not (?:connect|open|initialize|start)', re.IGNORECASE),
+    re.compile(r'Device .* not found', re.IGNORECASE),
+    re.compile(r'Unknown option|Unexpected argument|Could not parse', re.IGNORECASE),
+)
+
+
+@dataclass
+class ScrcpySessionEvent:
+    """Событие сессии scrcpy"""
+    device_id: str
+    kind: str
+    timestamp: float
+    level: str = 'INFO'
+    message: str = ''
+    source: str = 'client'
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+class ScrcpyLogParser:
+    """Разбирает вывод scrcpy построчно по мере поступления.
+
+    Неполная последняя строка остается в буфере до следующего куска или flush().
+    """
+
+    def __init__(self, device_id: str):
+        self.device_id = device_id
+        self._buffer = ''
+
+    def feed(self, text: str) -> List[ScrcpySessionEvent]:
+        """Добавляет кусок вывода и возвращает события по завершенным строкам"""
+        self._buffer += text
+        *lines, self._buffer = re.split(r'\r?\n|\r', self._buffer)
+        return self._parse_lines(lines)
+
+    def flush(self) -> List[ScrcpySessionEvent]:
+        """Разбирает остаток буфера (при завершении процесса)"""
+        lines, self._buffer = [self._buffer], ''
+        return self._parse_lines(lines)
+
+    def _parse_lines(self, lines: List[str]) -> List[ScrcpySessionEvent]:
+        events = []
+        for line in lines:
+            event = self.parse_line(line)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def parse_line(self, line: str) -> Optional[ScrcpySessionEvent]:
+        """Превращает одну строку вывода в событие"""
+        line = line.strip()
+        if not line:
+            return None
+
+        match = LOG_LINE_RE.match(line)
+        if match:
+            level = match.group('level')
+            source = match.group('source') or 'client'
+            message = match.group('message').strip()
+        else:
+            # Продолжение многострочного сообщения (например, стек Java от сервера)
+            level, source, message = 'INFO', 'client', line
+
+        kind, data = self._classify(level, message)
+        return ScrcpySessionEvent(self.device_id, kind, time.time(), level, message, source, data)
+
+    @staticmethod
+    def _classify(level: str, message: str):
+        """Определяет тип события и извлекает данные"""
+        if level == 'ERROR':
+            if ENCODER_FAILURE_RE.search(message):
+                return EVENT_ENCODER_FAILED, {}
+            if any(pattern.search(message) for pattern in FATAL_PATTERNS):
+                return EVENT_FATAL, {}
+            return EVENT_ERROR, {}
+
+        match = FPS_RE.match(message)
+        if match:
+            return EVENT_FPS, {'fps': int(match.group('fps')), 'skipped': int(match.group('skipped') or 0)}
+
+        if DISCONNECTED_RE.match(message):
+            return EVENT_DISCONNECTED, {}
+
+        if level == 'WARN' and AUDIO_RE.search(message):
+            return EVENT_AUDIO_WARNING, {}
+
+        match = RECORDING_STARTED_RE.match(message)
+        if match:
+            return EVENT_RECORDING_STARTED, {'format': match.group('format'), 'file': match.group('file').strip()}
+        match = RECORDING_FINISHED_RE.match(message)
+        if match:
+            return EVENT_RECORDING_FINISHED, {'format': match.group('format'), 'file': match.group('file').strip()}
+
+        match = TEXTURE_RE.match(message)
+        if match:
+            return EVENT_RESOLUTION, {'width': int(match.group('width')), 'height': int(match.group('height'))}
+
+        match = DEVICE_RE.match(message)
+        if match:
+            return EVENT_DEVICE, {
+                'manufacturer': (match.group('manufacturer') or '').strip(),
+                'model': match.group('model').strip(),
+                'android': match.group('android') or '',
+            }
+
+        match = CODEC_RE.match(message)
+        if match:
+            return EVENT_CODEC, {'stream': match.group('stream').lower(), 'codec': match.group('codec')}
+
+        match = ENCODER_RE.match(message)
+        if match:
+            stream = (match.group('stream') or 'video').strip().lower()
+            return EVENT_ENCODER, {'stream': stream, 'encoder': match.group('encoder')}
+
+        match = VERSION_RE.match(message)
+        if match:
+            return EVENT_VERSION, {'version': match.group('version')}
+
+        return EVENT_LOG, {}
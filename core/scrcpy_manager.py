@@ -1,11 +1,17 @@
 import os
-import platform
-import subprocess
-from typing import Dict, Any, List
+import time
+from collections import deque
+from typing import Dict, Any, List, Callable, Optional
 
-from PyQt5.QtCore import QObject, pyqtSignal, QProcess
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
 
+from .disk_guard import DiskGuard
 from .path_manager import path_manager
+from .process_backend import create_process_backend
+from .resource_governor import ResourceGovernor
+from .scrcpy_session import ScrcpySession, STATE_STREAMING
+from .scrcpy_log_parser import (ScrcpyLogParser, EVENT_LOG, EVENT_DEVICE, EVENT_RESOLUTION, EVENT_FPS,
+                                EVENT_RECORDING_STARTED)
 from .utils import debug_print
 
 
@@ -16,17 +22,56 @@ class ScrcpyManager(QObject):
     process_finished = pyqtSignal(str, int)  # device_id, exit_code
     process_error = pyqtSignal(str, str)  # device_id, error_message
     stderr_output = pyqtSignal(str, str)  # device_id, error_output
+    session_event = pyqtSignal(object)  # ScrcpySessionEvent
+    session_state_changed = pyqtSignal(str, str)  # device_id, state (см. core/scrcpy_session.py)
+    bulk_launch_result = pyqtSignal(str, bool, str)  # device_id, success, message
+    bulk_launch_finished = pyqtSignal(int, int)  # succeeded, failed
 
-    def __init__(self):
+    # События, после которых сервер scrcpy считается запущенным (push и старт завершены)
+    ADMISSION_EVENTS = (EVENT_DEVICE, EVENT_RESOLUTION, EVENT_FPS, EVENT_RECORDING_STARTED)
+
+    def __init__(self, config_manager=None):
         super().__init__()
-        self.active_processes = {}  # device_id -> QProcess
+        # Источник политик ресурсов хоста по устройствам (см. ConfigManager.get_resource_policy)
+        self.config_manager = config_manager
+        self.resource_governor = ResourceGovernor()
+        # Место на диске для записей: проверка перед запуском и наблюдение за ростом файлов
+        self.disk_guard = DiskGuard(config_manager)
+        self.active_processes = {}  # device_id -> ProcessBackend
+        self._stopping = {}  # ProcessBackend -> device_id: получили terminate, но еще не завершились
+        self.sessions = {}  # device_id -> ScrcpySession (последняя сессия устройства)
         # Используем PathManager для определения пути к scrcpy
         self.scrcpy_path = path_manager.get_scrcpy_path()
 
-    def start_scrcpy(self, device_id: str, settings: Dict[str, Any]) -> bool:
-        """Запускает scrcpy с заданными параметрами"""
+        # Очередь массового запуска
+        self._bulk_queue = deque()  # (device_id, settings, launcher)
+        self._bulk_in_flight = {}  # device_id -> QTimer таймаута допуска
+        self._bulk_max_in_flight = 4
+        self._bulk_admission_timeout = 20.0
+        self._bulk_results = [0, 0]  # succeeded, failed
+        self.session_event.connect(self._on_bulk_session_event)
+        self.process_finished.connect(self._on_bulk_process_finished)
+
+    def start_scrcpy(self, device_id: str, settings: Dict[str, Any],
+                     replace: bool = False) -> Optional[ScrcpySession]:
+        """Запускает scrcpy с заданными параметрами.
+
+        Не ждет старта процесса: сразу возвращает сессию, состояние которой
+        меняется сигналом session_state_changed. None - если запуск невозможен.
+        Пока остановленный процесс устройства не завершился, новый не запускается
+        (он писал бы в тот же файл записи); replace=True - осознанная замена
+        процесса при перезапуске с новыми настройками.
+        """
         if device_id in self.active_processes:
-            return False  # Уже запущен
+            return None  # Уже запущен
+        if not replace and self._refuse_while_stopping(device_id):
+            return None
+
+        error = self.disk_guard.preflight(device_id, settings)
+        if error:
+            debug_print(f"💽 Launch of {device_id} refused: {error}")
+            self.process_error.emit(device_id, error)
+            return None
 
         try:
             # Формируем команду scrcpy
@@ -36,114 +81,197 @@ class ScrcpyManager(QObject):
                 cmd.extend(['-V', 'debug'])
             debug_print(f"🔧 Scrcpy command: {' '.join(cmd)}")
 
-            # Гибридный подход: QProcess для debug, subprocess для обычного режима на Windows
-            if platform.system().lower() == 'windows' and os.environ.get('MIRRORDROID_DEBUG') != '1':
-                # Обычный режим на Windows - скрываем консоль
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = subprocess.SW_HIDE
-
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    startupinfo=startupinfo
-                )
-                # Сохраняем subprocess как QProcess для совместимости
-                self.active_processes[device_id] = process
-                self.process_started.emit(device_id, process.pid)
-                return True
-            else:
-                # Debug режим или Linux - используем QProcess
-                process = QProcess()
-                process.setProcessChannelMode(QProcess.SeparateChannels)  # Разделяем stdout и stderr
-
-                # Подключаем сигналы
-                process.finished.connect(
-                    lambda exit_code, exit_status: self._on_process_finished(device_id, exit_code, exit_status)
-                )
-                process.errorOccurred.connect(
-                    lambda error: self._on_process_error(device_id, error)
-                )
-
-                # Подключаем обработчик вывода
-                process.readyReadStandardOutput.connect(
-                    lambda: self._on_process_output(device_id, process.readAllStandardOutput().data().decode())
-                )
-                process.readyReadStandardError.connect(
-                    lambda: self._on_process_error_output(device_id, process.readAllStandardError().data().decode())
-                )
-                
-                # Запускаем процесс
-                process.start(cmd[0], cmd[1:])
-
-                if process.waitForStarted(5000):  # Ждем 5 секунд
-                    self.active_processes[device_id] = process
-                    self.process_started.emit(device_id, process.processId())
-                    return True
-                else:
-                    error_msg = f"Не удалось запустить scrcpy. Код ошибки: {process.error()}"
-                    self.process_error.emit(device_id, error_msg)
-                    return False
+            # Ошибку запуска сообщает сам бэкенд (см. _on_process_error)
+            session = self._start_process(device_id, cmd, 'scrcpy')
+            if session is not None:
+                self.disk_guard.track(device_id, settings)
+            return session
 
         except Exception as e:
             error_msg = f"Ошибка запуска: {e}"
             self.process_error.emit(device_id, error_msg)
+            return None
+
+    def start_bulk(self, device_settings: Dict[str, Dict[str, Any]], max_in_flight: int = 4,
+                   launcher: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+                   admission_timeout: float = 20.0) -> int:
+        """Запускает сессии на нескольких устройствах с ограничением одновременных запусков.
+
+        Одновременно «в полете» не больше max_in_flight сессий: сессия занимает слот,
+        пока scrcpy не сообщит об успешном старте сервера, не завершится или не
+        истечет admission_timeout. Результат по каждому устройству приходит
+        сигналом bulk_launch_result, итог - bulk_launch_finished. Истечение
+        admission_timeout считается неудачным запуском (процесс не останавливается).
+        Возвращает количество поставленных в очередь устройств.
+        """
+        launcher = launcher or self.start_scrcpy
+        self._bulk_max_in_flight = max(1, max_in_flight)
+        self._bulk_admission_timeout = admission_timeout
+        if not self.is_bulk_running():
+            self._bulk_results = [0, 0]
+
+        queued = {device_id for device_id, _, _ in self._bulk_queue} | set(self._bulk_in_flight)
+        added = 0
+        for device_id, settings in device_settings.items():
+            if device_id in queued:
+                continue
+            self._bulk_queue.append((device_id, settings, launcher))
+            added += 1
+        debug_print(f"🚀 Bulk launch: {added} queued, max in flight {self._bulk_max_in_flight}")
+        self._pump_bulk_queue()
+        return added
+
+    def cancel_bulk(self):
+        """Отменяет запуск устройств, которые еще ждут в очереди"""
+        self._bulk_queue.clear()
+        if not self._bulk_in_flight:
+            self._finish_bulk()
+
+    def is_bulk_running(self) -> bool:
+        """Проверяет, идет ли массовый запуск"""
+        return bool(self._bulk_queue or self._bulk_in_flight)
+
+    def _pump_bulk_queue(self):
+        """Запускает устройства из очереди, пока есть свободные слоты"""
+        while self._bulk_queue and len(self._bulk_in_flight) < self._bulk_max_in_flight:
+            device_id, settings, launcher = self._bulk_queue.popleft()
+            if self.is_scrcpy_running(device_id):
+                self._report_bulk_result(device_id, False, "Уже запущен")
+                continue
+
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda device_id=device_id: self._on_bulk_admission_timeout(device_id))
+            self._bulk_in_flight[device_id] = timer
+            if not launcher(device_id, settings):
+                self._bulk_in_flight.pop(device_id).deleteLater()
+                self._report_bulk_result(device_id, False, "Не удалось запустить scrcpy")
+                continue
+            # Процесс мог завершиться сразу (ошибка до старта цикла событий)
+            if device_id in self._bulk_in_flight:
+                timer.start(int(self._bulk_admission_timeout * 1000))
+
+        if not self._bulk_queue and not self._bulk_in_flight:
+            self._finish_bulk()
+
+    def _on_bulk_admission_timeout(self, device_id: str):
+        """scrcpy не сообщил о старте вовремя - считаем запуск неудачным и отдаем слот следующему"""
+        self._release_bulk_slot(device_id, False,
+                                f"Нет подтверждения запуска за {self._bulk_admission_timeout:g} с")
+
+    def _release_bulk_slot(self, device_id: str, success: bool, message: str):
+        """Освобождает слот запуска и запускает следующее устройство"""
+        timer = self._bulk_in_flight.pop(device_id, None)
+        if timer is None:
+            return
+        timer.stop()
+        timer.deleteLater()
+        self._report_bulk_result(device_id, success, message)
+        self._pump_bulk_queue()
+
+    def _report_bulk_result(self, device_id: str, success: bool, message: str):
+        """Сообщает результат запуска одного устройства"""
+        self._bulk_results[0 if success else 1] += 1
+        debug_print(f"{'✅' if success else '❌'} Bulk launch {device_id}: {message or 'started'}")
+        self.bulk_launch_result.emit(device_id, success, message)
+
+    def _finish_bulk(self):
+        """Сообщает итог массового запуска"""
+        succeeded, failed = self._bulk_results
+        if succeeded or failed:
+            self._bulk_results = [0, 0]
+            self.bulk_launch_finished.emit(succeeded, failed)
+
+    def _on_bulk_session_event(self, event):
+        """Сервер scrcpy запустился - слот можно отдать следующему устройству"""
+        if event.device_id in self._bulk_in_flight and event.kind in self.ADMISSION_EVENTS:
+            self._release_bulk_slot(event.device_id, True, "")
+
+    def _on_bulk_process_finished(self, device_id: str, exit_code: int):
+        """Процесс завершился, не успев запуститься"""
+        if device_id in self._bulk_in_flight:
+            self._release_bulk_slot(device_id, False, f"scrcpy завершился с кодом {exit_code}")
+
+    def stop_scrcpy(self, device_id: str, grace_ms: int = 3000) -> bool:
+        """Останавливает scrcpy для устройства, не блокируя интерфейс.
+
+        Процесс получает terminate сразу, а kill - если не завершится за grace_ms.
+        До завершения процесса is_scrcpy_running остается True.
+        """
+        process = self.active_processes.pop(device_id, None)
+        if process is None:
             return False
-
-    def stop_scrcpy(self, device_id: str) -> bool:
-        """Останавливает scrcpy для устройства"""
-        if device_id in self.active_processes:
-            process = self.active_processes[device_id]
-
-            # Проверяем тип процесса
-            if hasattr(process, 'terminate'):  # QProcess
-                process.terminate()
-                if not process.waitForFinished(3000):  # Ждем 3 секунды
-                    process.kill()  # Принудительно завершаем
-            else:  # subprocess.Popen
-                process.terminate()
-                try:
-                    process.wait(timeout=3)  # Ждем 3 секунды
-                except subprocess.TimeoutExpired:
-                    process.kill()  # Принудительно завершаем
-
-            # Безопасное удаление - проверяем еще раз
-            if device_id in self.active_processes:
-                del self.active_processes[device_id]
-            return True
-        return False
-
-    def stop_all_scrcpy(self):
-        """Останавливает все процессы scrcpy"""
-        # Создаем копию списка ключей, чтобы избежать изменения словаря во время итерации
-        device_ids = list(self.active_processes.keys())
-        for device_id in device_ids:
-            if device_id in self.active_processes:  # Проверяем, что процесс еще существует
-                self.stop_scrcpy(device_id)
+        self._terminate_processes({process: device_id}, grace_ms)
+        return True
+
+    def stop_all_scrcpy(self, grace_ms: int = 3000):
+        """Останавливает все процессы scrcpy одновременно с общим сроком до kill"""
+        processes = {process: device_id for device_id, process in self.active_processes.items()}
+        self.active_processes.clear()
+        self._terminate_processes(processes, grace_ms)
+
+    def is_stopping(self, device_id: str) -> bool:
+        """Проверяет, завершается ли остановленный процесс устройства"""
+        return any(stopping_id == device_id and process.is_running()
+                   for process, stopping_id in self._stopping.items())
+
+    def _refuse_while_stopping(self, device_id: str) -> bool:
+        """Отклоняет запуск, пока предыдущий процесс устройства еще завершается"""
+        if not self.is_stopping(device_id):
+            return False
+        debug_print(f"⏳ Launch of {device_id} refused: previous scrcpy process is still exiting")
+        self.process_error.emit(device_id, "Предыдущий процесс scrcpy еще завершается, повторите запуск позже")
+        return True
+
+    def _terminate_processes(self, processes: Dict[Any, str], grace_ms: int):
+        """Отправляет terminate всем процессам (процесс -> device_id) и планирует kill отставших"""
+        for process, device_id in processes.items():
+            self._stopping[process] = device_id
+            process.terminate()
+        processes = list(processes)
+        if processes:
+            QTimer.singleShot(grace_ms, lambda: self._kill_stragglers(processes))
+
+    def _kill_stragglers(self, processes):
+        """Принудительно завершает процессы, не ответившие на terminate"""
+        for process in processes:
+            # Завершившиеся процессы уже убраны из _stopping (и могут быть удалены)
+            if process in self._stopping and process.is_running():
+                debug_print(f"🔪 Killing scrcpy process {process.pid()} that ignored terminate")
+                process.kill()
+
+    def shutdown(self, timeout_ms: int = 3000):
+        """Останавливает все процессы при выходе за ограниченное время.
+
+        terminate отправляется всем сразу, ожидание идет с одним общим сроком,
+        после чего оставшиеся процессы получают kill.
+        """
+        self.cancel_bulk()
+        self.stop_all_scrcpy(timeout_ms)
+        processes = list(self._stopping)
+        deadline = time.monotonic() + timeout_ms / 1000
+
+        for process in processes:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0 or not process.wait(remaining_ms):
+                break
+
+        stragglers = [process for process in processes if process.is_running()]
+        for process in stragglers:
+            debug_print(f"🔪 Killing scrcpy process {process.pid()} on shutdown")
+            process.kill()
+        for process in stragglers:
+            process.wait(500)
+        debug_print(f"🛑 Scrcpy shutdown: {len(processes)} stopped, {len(stragglers)} killed")
 
     def is_scrcpy_running(self, device_id: str) -> bool:
-        """Проверяет, запущен ли scrcpy для устройства"""
-        if device_id in self.active_processes:
-            process = self.active_processes[device_id]
-            # Проверяем тип процесса
-            if hasattr(process, 'state'):  # QProcess
-                return process.state() == QProcess.Running
-            else:  # subprocess.Popen
-                return process.poll() is None  # None означает, что процесс еще работает
-        return False
+        """Проверяет, запущен ли scrcpy для устройства (в том числе еще завершающийся после остановки)"""
+        process = self.active_processes.get(device_id)
+        return (process is not None and process.is_running()) or self.is_stopping(device_id)
 
     def get_active_devices(self) -> List[str]:
         """Получает список устройств с активными scrcpy"""
-        active_devices = []
-        for device_id, process in self.active_processes.items():
-            if hasattr(process, 'state'):  # QProcess
-                if process.state() == QProcess.Running:
-                    active_devices.append(device_id)
-            else:  # subprocess.Popen
-                if process.poll() is None:  # None означает, что процесс еще работает
-                    active_devices.append(device_id)
-        return active_devices
+        return [device_id for device_id, process in self.active_processes.items() if process.is_running()]
 
     def is_camera_running(self, device_id: str) -> bool:
         """Проверяет, запущена ли камера для устройства"""
@@ -152,6 +280,9 @@ class ScrcpyManager(QObject):
     def _build_scrcpy_command(self, device_id: str, settings: Dict[str, Any]) -> List[str]:
         """Строит команду scrcpy на основе настроек"""
         cmd = [self.scrcpy_path, '-s', device_id]
+        # Режим только записи: без окна, по желанию и без управления
+        record_only = self.is_record_only(settings)
+        no_control = record_only and settings.get('record', {}).get('no_control', False)
 
         # Видео настройки
         video = settings.get('video', {})
@@ -161,10 +292,16 @@ class ScrcpyManager(QObject):
             cmd.extend(['--video-bit-rate', str(video['bit_rate'])])
         if video.get('max_fps', 0) > 0:
             cmd.extend(['--max-fps', str(video['max_fps'])])
-        if video.get('codec'):
-            cmd.extend(['--video-codec', video['codec']])
-        if video.get('encoder'):
-            cmd.extend(['--video-encoder', video['encoder']])
+        codec, encoder = video.get('codec'), video.get('encoder')
+        if not encoder and self.config_manager is not None:
+            # Энкодер не закреплен пользователем - берем победителя подбора (см. EncoderBenchmark)
+            benchmark = self.config_manager.get_encoder_benchmark(device_id)
+            if benchmark and benchmark.get('fps', 0) > 0:
+                codec, encoder = benchmark['codec'], benchmark['encoder']
+        if codec:
+            cmd.extend(['--video-codec', codec])
+        if encoder:
+            cmd.extend(['--video-encoder', encoder])
 
         # Аудио настройки
         audio = settings.get('audio', {})
@@ -180,24 +317,27 @@ class ScrcpyManager(QObject):
 
         # Настройки отображения
         display = settings.get('display', {})
-        if display.get('rotation', 0) != 0:
-            cmd.extend(['--display-orientation', str(display['rotation'])])
         if display.get('crop'):
             cmd.extend(['--crop', display['crop']])
-        if display.get('fullscreen', False):
-            cmd.append('--fullscreen')
-        if display.get('always_on_top', False):
-            cmd.append('--always-on-top')
-        if display.get('window_title'):
-            cmd.extend(['--window-title', display['window_title']])
+        if not record_only:
+            # Параметры окна
+            if display.get('rotation', 0) != 0:
+                cmd.extend(['--display-orientation', str(display['rotation'])])
+            if display.get('fullscreen', False):
+                cmd.append('--fullscreen')
+            if display.get('always_on_top', False):
+                cmd.append('--always-on-top')
+            if display.get('window_title'):
+                cmd.extend(['--window-title', display['window_title']])
 
         # Настройки управления
         control = settings.get('control', {})
         if control.get('show_touches', False):
             cmd.append('--show-touches')
-        if control.get('stay_awake', False):
+        # stay-awake и turn-screen-off выполняются через канал управления
+        if control.get('stay_awake', False) and not no_control:
             cmd.append('--stay-awake')
-        if control.get('turn_screen_off', False):
+        if control.get('turn_screen_off', False) and not no_control:
             cmd.append('--turn-screen-off')
 
         # Настройки записи
@@ -208,6 +348,10 @@ class ScrcpyManager(QObject):
                 cmd.extend(['--record-format', record['format']])
             if record.get('time_limit', 0) > 0:
                 cmd.extend(['--time-limit', str(record['time_limit'])])
+            if record_only:
+                cmd.extend(['--no-playback', '--no-window'])
+                if no_control:
+                    cmd.append('--no-control')
 
         # Настройки камеры
         camera = settings.get('camera', {})
@@ -223,8 +367,8 @@ class ScrcpyManager(QObject):
         if camera.get('camera_high_speed', False):
             cmd.append('--camera-high-speed')
 
-        # Настройки управления и устройств ввода
-        control = settings.get('control', {})
+        # Настройки управления и устройств ввода (без окна вводить нечего)
+        control = {} if record_only else settings.get('control', {})
         keyboard_mode = control.get('keyboard')
         if keyboard_mode in ('uhid', 'aoa', 'sdk'):
             cmd.append(f"--keyboard={keyboard_mode}")
@@ -282,42 +426,140 @@ class ScrcpyManager(QObject):
             cmd.extend(['--shortcut-mod', advanced['shortcut_mod']])
 
         # Дополнительные полезные параметры
-        if display.get('always_on_top', False):
+        if display.get('always_on_top', False) and not record_only:
             cmd.append('--always-on-top')
 
         # Параметры для улучшения качества
         if video.get('buffer_size', 0) > 0:
             cmd.extend(['--video-buffer', str(video['buffer_size'])])
 
+        # FPS раз в секунду для телеметрии сессии (счетчик кадров работает только при показе видео)
+        if not record_only:
+            cmd.append('--print-fps')
+
         return cmd
 
-    def _on_process_finished(self, device_id: str, exit_code: int, exit_status):
+    @staticmethod
+    def is_record_only(settings: Dict[str, Any]) -> bool:
+        """Сессия только пишет видео в файл, без окна"""
+        record = settings.get('record', {})
+        return bool(record.get('file')) and record.get('record_only', False)
+
+    def set_focused_session(self, device_id: Optional[str]):
+        """Отдает приоритет ресурсов хоста выбранной сессии, остальные становятся фоновыми"""
+        self.resource_governor.set_focused(device_id)
+        self.disk_guard.set_focused(device_id)
+
+    def get_session(self, device_id: str) -> Optional[ScrcpySession]:
+        """Возвращает последнюю сессию устройства"""
+        return self.sessions.get(device_id)
+
+    def _start_process(self, device_id: str, cmd: List[str], kind: str) -> Optional[ScrcpySession]:
+        """Запускает процесс через выбранный бэкенд и подключает обработчики"""
+        process = create_process_backend(self)
+        debug_print(f"⚙️ Process backend: {process.name}")
+        session = ScrcpySession(device_id, kind, self)
+        session.state_changed.connect(lambda _, state: self._on_session_state_changed(device_id, state, session))
+        # Отдельный парсер на каждый канал, чтобы неполные строки не смешивались
+        parsers = (ScrcpyLogParser(device_id), ScrcpyLogParser(device_id))
+
+        process.started.connect(lambda pid: self._on_process_started(device_id, session, pid))
+        process.stdout_text.connect(lambda text: self._on_process_output(device_id, text, parsers[0], session))
+        process.stderr_text.connect(lambda text: self._on_process_error_output(device_id, text, parsers[1], session))
+        process.finished.connect(
+            lambda exit_code: self._on_process_finished(device_id, process, exit_code, parsers, session))
+        process.error_occurred.connect(lambda message: self._on_process_error(device_id, process, message, session))
+
+        self.sessions[device_id] = session
+        self.active_processes[device_id] = process
+        if not process.start(cmd):
+            if self.active_processes.get(device_id) is process:
+                del self.active_processes[device_id]
+            process.deleteLater()
+            return None
+        return session
+
+    def _on_process_started(self, device_id: str, session: ScrcpySession, pid: int):
+        """Процесс создан - scrcpy поднимает сервер на устройстве"""
+        session.on_process_started(pid)
+        if self.config_manager is not None:
+            self.resource_governor.apply(device_id, pid, self.config_manager.get_resource_policy(device_id))
+        self.process_started.emit(device_id, pid)
+
+    def _on_session_state_changed(self, device_id: str, state: str, session: ScrcpySession):
+        """Пересылает смену состояния сессии"""
+        if self.sessions.get(device_id) is not session:
+            return  # сессия уже заменена новой (перезапуск с другими настройками)
+        if state == STATE_STREAMING:
+            # Потоки декодера и записи уже созданы - применяем к ним политику ресурсов
+            self.resource_governor.refresh(device_id)
+        if session.time_to_first_frame is not None and state == STATE_STREAMING:
+            debug_print(f"🎬 [scrcpy:{device_id}] first frame in {session.time_to_first_frame:.2f}s")
+        self.session_state_changed.emit(device_id, state)
+
+    def _on_process_finished(self, device_id: str, process, exit_code: int, parsers=(), session=None):
         """Обработчик завершения процесса"""
-        if device_id in self.active_processes:
+        for parser in parsers:
+            self._emit_session_events(parser.flush(), session)
+        # Запись могла уже смениться новым процессом для того же устройства
+        current = self.active_processes.get(device_id)
+        if current is process:
             del self.active_processes[device_id]
+        self._stopping.pop(process, None)
+        process.deleteLater()
+        if session is not None:
+            self.resource_governor.release(device_id, session.pid)
+            session.on_finished(exit_code)
+        if current is not None and current is not process:
+            # Завершился замененный процесс - для устройства уже работает новый
+            debug_print(f"🔁 Replaced scrcpy process for {device_id} exited with code {exit_code}")
+            return
+        self.disk_guard.untrack(device_id)
         self.process_finished.emit(device_id, exit_code)
 
-    def _on_process_output(self, device_id: str, output: str):
+    def _emit_session_events(self, events, session: ScrcpySession = None):
+        """Рассылает разобранные события сессии"""
+        for event in events:
+            if session is not None:
+                session.on_session_event(event)
+            if event.kind != EVENT_LOG:
+                debug_print(f"📡 [scrcpy:{event.device_id}] {event.kind}: {event.data or event.message}")
+            self.session_event.emit(event)
+
+    def _on_process_output(self, device_id: str, output: str, parser: ScrcpyLogParser = None, session=None):
         """Обработчик вывода процесса"""
+        if parser is not None:
+            self._emit_session_events(parser.feed(output), session)
         if output.strip():
             debug_print(f"[scrcpy:{device_id}] {output.strip()}")
 
-    def _on_process_error_output(self, device_id: str, error_output: str):
+    def _on_process_error_output(self, device_id: str, error_output: str, parser: ScrcpyLogParser = None,
+                                 session=None):
         """Обработчик вывода ошибок процесса"""
+        if parser is not None:
+            self._emit_session_events(parser.feed(error_output), session)
         if error_output.strip():
             debug_print(f"⚠️ [scrcpy:{device_id}:err] {error_output.strip()}")
             # Эмитируем сигнал для отображения в статусбаре
             self.stderr_output.emit(device_id, error_output.strip())
 
-    def _on_process_error(self, device_id: str, error):
+    def _on_process_error(self, device_id: str, process, error_msg: str, session=None):
         """Обработчик ошибки процесса"""
-        error_msg = f"Ошибка процесса: {error}"
+        if process in self._stopping:
+            # Процесс останавливаем сами - аварийный выход по terminate/kill ошибкой не считаем
+            debug_print(f"⚠️ [scrcpy:{device_id}] {error_msg} (while stopping)")
+            return
+        if session is not None:
+            session.on_error(error_msg)
         self.process_error.emit(device_id, error_msg)
-        if device_id in self.active_processes:
+        if self.active_processes.get(device_id) is process:
             del self.active_processes[device_id]
 
-    def start_camera(self, device_id: str, camera_settings: Dict[str, Any]) -> bool:
-        """Запускает камеру для устройства с настройками"""
+    def start_camera(self, device_id: str, camera_settings: Dict[str, Any],
+                     replace: bool = False) -> Optional[ScrcpySession]:
+        """Запускает камеру для устройства с настройками (возвращает сессию, см. start_scrcpy)"""
+        if not replace and self._refuse_while_stopping(device_id):
+            return None
         try:
             # Формируем команду для камеры
             cmd = self._build_camera_command(device_id, camera_settings)
@@ -326,53 +568,11 @@ class ScrcpyManager(QObject):
                 cmd.extend(['-V', 'debug'])
             debug_print(f"🔧 Camera command: {' '.join(cmd)}")
 
-            # Гибридный подход: QProcess для debug, subprocess для обычного режима на Windows
-            if platform.system().lower() == 'windows' and os.environ.get('MIRRORDROID_DEBUG') != '1':
-                # Обычный режим на Windows - скрываем консоль
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = subprocess.SW_HIDE
-
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    startupinfo=startupinfo
-                )
-                # Сохраняем subprocess как QProcess для совместимости
-                self.active_processes[device_id] = process
-                self.process_started.emit(device_id, process.pid)
-                return True
-            else:
-                # Debug режим или Linux - используем QProcess
-                process = QProcess()
-
-                # Подключаем сигналы
-                process.finished.connect(
-                    lambda exit_code, exit_status: self._on_process_finished(device_id, exit_code, exit_status))
-                process.errorOccurred.connect(lambda error: self._on_process_error(device_id, error))
-                process.readyReadStandardOutput.connect(
-                    lambda: self._on_process_output(device_id, process.readAllStandardOutput().data().decode()))
-                process.readyReadStandardError.connect(
-                    lambda: self._on_process_error_output(device_id, process.readAllStandardError().data().decode()))
-
-                # Запускаем процесс
-                process.start(cmd[0], cmd[1:])
-
-                if not process.waitForStarted(5000):
-                    return False
-
-                # Сохраняем процесс
-                self.active_processes[device_id] = process
-
-                # Эмитируем сигнал
-                self.process_started.emit(device_id, process.processId())
-
-                return True
+            return self._start_process(device_id, cmd, 'camera')
 
         except Exception as e:
             debug_print(f"⚠️ Error starting camera: {e}")
-            return False
+            return None
 
     def _build_camera_command(self, device_id: str, camera_settings: Dict[str, Any]) -> List[str]:
         """Строит команду scrcpy для камеры на основе настроек"""
@@ -432,4 +632,7 @@ class ScrcpyManager(QObject):
                 buffer_ms = v4l2['buffers'] * 33
                 cmd.extend(['--v4l2-buffer', str(buffer_ms)])
 
+        # FPS раз в секунду для телеметрии сессии
+        cmd.append('--print-fps')
+
         return cmd
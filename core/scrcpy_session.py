@@ -0,0 +1,78 @@
+"""
+Дескриптор сессии scrcpy и ее состояния от запуска до первого кадра
+"""
+import time
+from typing import Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from .scrcpy_log_parser import EVENT_FATAL, EVENT_FPS, EVENT_RECORDING_STARTED, EVENT_RESOLUTION
+
+# Состояния сессии
+STATE_SPAWNING = 'spawning'  # процесс создается
+STATE_CONNECTING = 'connecting'  # процесс запущен, scrcpy поднимает сервер на устройстве
+STATE_STREAMING = 'streaming'  # получен первый кадр (или началась запись)
+STATE_FAILED = 'failed'  # не удалось запустить или сессия упала до первого кадра
+STATE_FINISHED = 'finished'  # сессия завершилась после успешного старта
+
+# События вывода scrcpy, означающие, что видео пошло
+FIRST_FRAME_EVENTS = (EVENT_RESOLUTION, EVENT_FPS, EVENT_RECORDING_STARTED)
+
+
+class ScrcpySession(QObject):
+    """Сессия scrcpy, возвращаемая сразу при запуске.
+
+    Состояние меняется по сигналам процесса и разобранному выводу scrcpy:
+    spawning -> connecting -> streaming -> finished, либо failed.
+    """
+
+    state_changed = pyqtSignal(str, str)  # device_id, state
+
+    def __init__(self, device_id: str, kind: str, parent=None):
+        super().__init__(parent)
+        self.device_id = device_id
+        self.kind = kind
+        self.state = STATE_SPAWNING
+        self.spawned_at = time.monotonic()
+        self.pid = 0
+        self.time_to_first_frame: Optional[float] = None
+        self.exit_code: Optional[int] = None
+        self.error = ''
+
+    def is_active(self) -> bool:
+        """Сессия еще запускается или работает"""
+        return self.state in (STATE_SPAWNING, STATE_CONNECTING, STATE_STREAMING)
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            self.state = state
+            self.state_changed.emit(self.device_id, state)
+
+    def on_process_started(self, pid: int):
+        """Процесс создан"""
+        self.pid = pid
+        if self.state == STATE_SPAWNING:
+            self._set_state(STATE_CONNECTING)
+
+    def on_session_event(self, event):
+        """Обновляет состояние по событиям вывода scrcpy"""
+        if event.kind in FIRST_FRAME_EVENTS and self.state in (STATE_SPAWNING, STATE_CONNECTING):
+            self.time_to_first_frame = time.monotonic() - self.spawned_at
+            self._set_state(STATE_STREAMING)
+        elif event.kind == EVENT_FATAL and not self.error:
+            self.error = event.message
+
+    def on_error(self, message: str):
+        """Ошибка процесса (например, не удалось запустить)"""
+        if not self.error:
+            self.error = message
+        if self.state in (STATE_SPAWNING, STATE_CONNECTING):
+            self._set_state(STATE_FAILED)
+
+    def on_finished(self, exit_code: int):
+        """Процесс завершился"""
+        self.exit_code = exit_code
+        if self.state == STATE_STREAMING or (exit_code == 0 and self.state != STATE_FAILED):
+            self._set_state(STATE_FINISHED)
+        else:
+            self._set_state(STATE_FAILED)
@@ -0,0 +1,309 @@
+"""
+Супервизор сессий scrcpy: автоматический перезапуск упавших сессий
+"""
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from .utils import debug_print
+
+# Политики перезапуска
+RESTART_NEVER = 'never'
+RESTART_ON_FAILURE = 'on-failure'
+RESTART_ALWAYS = 'always'
+RESTART_POLICIES = (RESTART_NEVER, RESTART_ON_FAILURE, RESTART_ALWAYS)
+
+# Состояния сессии
+STATE_RUNNING = 'running'
+STATE_BACKOFF = 'backoff'
+STATE_WAITING_DEVICE = 'waiting_device'
+STATE_CRASH_LOOP = 'crash_loop'
+
+SESSION_SCRCPY = 'scrcpy'
+SESSION_CAMERA = 'camera'
+
+
+@dataclass
+class SupervisedSession:
+    """Состояние одной наблюдаемой сессии"""
+    device_id: str
+    kind: str
+    settings: Dict[str, Any]
+    policy: str = RESTART_NEVER
+    state: str = STATE_RUNNING
+    restart_count: int = 0
+    consecutive_failures: int = 0
+    started_at: float = 0.0
+    down_since: Optional[float] = None
+    total_downtime: float = 0.0
+    failures: deque = field(default_factory=deque)
+    timer: Optional[QTimer] = None
+
+    def downtime(self, now: float = None) -> float:
+        """Суммарный простой с учетом текущего"""
+        if self.down_since is None:
+            return self.total_downtime
+        return self.total_downtime + ((now or time.monotonic()) - self.down_since)
+
+
+class SessionSupervisor(QObject):
+    """Следит за сессиями scrcpy и перезапускает их согласно политике.
+
+    Перезапуск выполняется с экспоненциальной задержкой и случайным разбросом,
+    только когда устройство снова видно в списке устройств. Слишком частые
+    падения подряд останавливают перезапуски (защита от crash-loop).
+    """
+
+    session_restarting = pyqtSignal(str, int, float)  # device_id, attempt, delay_seconds
+    session_waiting_device = pyqtSignal(str)  # device_id
+    session_restored = pyqtSignal(str, int)  # device_id, restart_count
+    session_gave_up = pyqtSignal(str, int)  # device_id, failures
+    session_finished = pyqtSignal(str)  # device_id: фильтр запуска завершил сессию
+
+    def __init__(self, scrcpy_manager, adb_manager, base_delay: float = 1.0, max_delay: float = 60.0,
+                 crash_loop_limit: int = 5, crash_loop_window: float = 120.0, stable_after: float = 30.0):
+        super().__init__()
+        self.scrcpy_manager = scrcpy_manager
+        self.adb_manager = adb_manager
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.crash_loop_limit = crash_loop_limit
+        self.crash_loop_window = crash_loop_window
+        self.stable_after = stable_after
+        self.sessions = {}  # device_id -> SupervisedSession
+        # Функции (device_id, settings) -> settings, применяемые перед каждым запуском процесса;
+        # None вместо настроек завершает сессию (например, исчерпано время записи)
+        self.launch_filters: List[Callable[[str, Dict[str, Any]], Optional[Dict[str, Any]]]] = []
+
+        self.scrcpy_manager.process_finished.connect(self._on_process_finished)
+        self.adb_manager.device_list_changed.connect(self._on_device_list_changed)
+
+    # Запуск и остановка
+
+    def start_scrcpy(self, device_id: str, settings: Dict[str, Any], policy: str = RESTART_NEVER) -> bool:
+        """Запускает зеркалирование под наблюдением супервизора"""
+        return self._start(SupervisedSession(device_id, SESSION_SCRCPY, settings, self._normalize(policy)))
+
+    def start_camera(self, device_id: str, settings: Dict[str, Any], policy: str = RESTART_NEVER) -> bool:
+        """Запускает камеру под наблюдением супервизора"""
+        return self._start(SupervisedSession(device_id, SESSION_CAMERA, settings, self._normalize(policy)))
+
+    def stop(self, device_id: str) -> bool:
+        """Останавливает сессию по запросу пользователя (без перезапуска)"""
+        self._forget(device_id)
+        return self.scrcpy_manager.stop_scrcpy(device_id)
+
+    def stop_all(self):
+        """Останавливает все сессии без перезапуска"""
+        for device_id in list(self.sessions):
+            self._forget(device_id)
+        self.scrcpy_manager.stop_all_scrcpy()
+
+    def relaunch(self, device_id: str, settings: Dict[str, Any]) -> bool:
+        """Перезапускает работающую сессию с новыми настройками, сохраняя наблюдение и счетчики"""
+        session = self.sessions.get(device_id)
+        if session is None:
+            # Сессия без наблюдения - просто заменяем процесс того же вида
+            current = self.scrcpy_manager.get_session(device_id)
+            kind = current.kind if current is not None else SESSION_SCRCPY
+            self.scrcpy_manager.stop_scrcpy(device_id)
+            settings = self._filter_settings(device_id, settings)
+            if settings is None:
+                self._finish(device_id)
+                return False
+            if kind == SESSION_CAMERA:
+                return bool(self.scrcpy_manager.start_camera(device_id, settings, replace=True))
+            return bool(self.scrcpy_manager.start_scrcpy(device_id, settings, replace=True))
+        if session.state != STATE_RUNNING:
+            # Сессия и так ждет перезапуска - он пройдет уже с новыми настройками
+            session.settings = settings
+            return True
+
+        self.scrcpy_manager.stop_scrcpy(device_id)
+        session.settings = settings
+        now = time.monotonic()
+        launched = self._launch(session, replace=True)
+        if launched is None:
+            self._finish(device_id)
+            return False
+        if not launched:
+            session.down_since = now
+            self._register_failure(session, now)
+            return False
+        session.started_at = now
+        return True
+
+    def is_pending_restart(self, device_id: str) -> bool:
+        """Проверяет, ожидает ли сессия перезапуска"""
+        session = self.sessions.get(device_id)
+        return session is not None and session.state in (STATE_BACKOFF, STATE_WAITING_DEVICE)
+
+    # Статистика
+
+    def get_session_stats(self, device_id: str) -> Optional[Dict[str, Any]]:
+        """Возвращает счетчик перезапусков и простой сессии"""
+        session = self.sessions.get(device_id)
+        if session is None:
+            return None
+        return {
+            'kind': session.kind,
+            'policy': session.policy,
+            'state': session.state,
+            'restart_count': session.restart_count,
+            'consecutive_failures': session.consecutive_failures,
+            'downtime': round(session.downtime(), 3),
+        }
+
+    def get_all_stats(self) -> List[Dict[str, Any]]:
+        """Возвращает статистику по всем сессиям"""
+        return [dict(device_id=device_id, **self.get_session_stats(device_id)) for device_id in self.sessions]
+
+    # Внутренняя логика
+
+    @staticmethod
+    def _normalize(policy: str) -> str:
+        """Приводит политику к одному из допустимых значений"""
+        return policy if policy in RESTART_POLICIES else RESTART_NEVER
+
+    def _filter_settings(self, device_id: str, settings: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Применяет фильтры запуска (например, подставляет файл очередного сегмента записи)"""
+        for launch_filter in self.launch_filters:
+            settings = launch_filter(device_id, settings)
+            if settings is None:
+                return None
+        return settings
+
+    def _launch(self, session: SupervisedSession, replace: bool = False) -> Optional[bool]:
+        """Запускает процесс сессии через ScrcpyManager (replace - замена еще завершающегося процесса).
+
+        None - фильтр запуска решил, что сессия окончена, и процесс не запускался.
+        """
+        settings = self._filter_settings(session.device_id, session.settings)
+        if settings is None:
+            return None
+        if session.kind == SESSION_CAMERA:
+            return self.scrcpy_manager.start_camera(session.device_id, settings, replace=replace)
+        return self.scrcpy_manager.start_scrcpy(session.device_id, settings, replace=replace)
+
+    def _start(self, session: SupervisedSession) -> bool:
+        """Первичный запуск сессии"""
+        self._forget(session.device_id)
+        if not self._launch(session):
+            return False
+        session.started_at = time.monotonic()
+        if session.policy != RESTART_NEVER:
+            self.sessions[session.device_id] = session
+            debug_print(f"🛡️ Supervising {session.kind} session {session.device_id} (policy: {session.policy})")
+        return True
+
+    def _finish(self, device_id: str):
+        """Завершает сессию по решению фильтра запуска (без перезапусков)"""
+        self._forget(device_id)
+        debug_print(f"🏁 Session {device_id} finished by launch filter")
+        self.session_finished.emit(device_id)
+
+    def _forget(self, device_id: str):
+        """Снимает сессию с наблюдения и отменяет запланированный перезапуск"""
+        session = self.sessions.pop(device_id, None)
+        if session is not None and session.timer is not None:
+            session.timer.stop()
+            session.timer = None
+
+    def _is_device_online(self, device_id: str) -> bool:
+        """Проверяет, что устройство видно в списке и готово к работе"""
+        return any(device['id'] == device_id and device.get('status') == 'device'
+                   for device in self.adb_manager.devices)
+
+    def _backoff_delay(self, failures: int) -> float:
+        """Экспоненциальная задержка с разбросом (половина фиксирована, половина случайна)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** max(0, failures - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _on_process_finished(self, device_id: str, exit_code: int):
+        """Решает, нужно ли перезапускать завершившуюся сессию"""
+        session = self.sessions.get(device_id)
+        if session is None or session.state != STATE_RUNNING:
+            return
+
+        failed = exit_code != 0
+        if session.policy == RESTART_ON_FAILURE and not failed:
+            debug_print(f"🛡️ Session {device_id} exited normally, not restarting")
+            self._forget(device_id)
+            return
+
+        now = time.monotonic()
+        session.down_since = now
+        # Долго проработавшая сессия начинает отсчет задержек заново
+        if now - session.started_at >= self.stable_after:
+            session.consecutive_failures = 0
+        self._register_failure(session, now)
+
+    def _register_failure(self, session: SupervisedSession, now: float):
+        """Учитывает падение и планирует перезапуск либо срабатывает предохранитель"""
+        session.consecutive_failures += 1
+        session.failures.append(now)
+        while session.failures and now - session.failures[0] > self.crash_loop_window:
+            session.failures.popleft()
+
+        if len(session.failures) >= self.crash_loop_limit:
+            session.state = STATE_CRASH_LOOP
+            debug_print(f"🛑 Session {session.device_id} is crash-looping "
+                        f"({len(session.failures)} failures in {self.crash_loop_window:.0f}s), giving up")
+            # Сессия остается в списке, чтобы была видна статистика
+            self.session_gave_up.emit(session.device_id, len(session.failures))
+            return
+
+        delay = self._backoff_delay(session.consecutive_failures)
+        session.state = STATE_BACKOFF
+        debug_print(f"🔁 Restarting session {session.device_id} in {delay:.1f}s "
+                    f"(attempt {session.consecutive_failures})")
+        self.session_restarting.emit(session.device_id, session.consecutive_failures, delay)
+
+        session.timer = QTimer(self)
+        session.timer.setSingleShot(True)
+        session.timer.timeout.connect(lambda device_id=session.device_id: self._attempt_restart(device_id))
+        session.timer.start(int(delay * 1000))
+
+    def _attempt_restart(self, device_id: str):
+        """Перезапускает сессию, если устройство доступно"""
+        session = self.sessions.get(device_id)
+        if session is None:
+            return
+        session.timer = None
+
+        if not self._is_device_online(device_id):
+            # Ждем появления устройства в списке (см. _on_device_list_changed)
+            if session.state != STATE_WAITING_DEVICE:
+                session.state = STATE_WAITING_DEVICE
+                debug_print(f"⏳ Waiting for {device_id} to reappear before restart")
+                self.session_waiting_device.emit(device_id)
+            return
+
+        now = time.monotonic()
+        launched = self._launch(session)
+        if launched is None:
+            self._finish(device_id)
+            return
+        if not launched:
+            self._register_failure(session, now)
+            return
+
+        session.state = STATE_RUNNING
+        session.started_at = now
+        session.restart_count += 1
+        if session.down_since is not None:
+            session.total_downtime += now - session.down_since
+            session.down_since = None
+        debug_print(f"✅ Session {device_id} restored (restarts: {session.restart_count}, "
+                    f"downtime: {session.total_downtime:.1f}s)")
+        self.session_restored.emit(device_id, session.restart_count)
+
+    def _on_device_list_changed(self, devices: list):
+        """Перезапускает сессии, ожидавшие возвращения устройства"""
+        for device_id, session in list(self.sessions.items()):
+            if session.state == STATE_WAITING_DEVICE and self._is_device_online(device_id):
+                self._attempt_restart(device_id)
@@ -0,0 +1,148 @@
+"""
+Телеметрия сессий scrcpy: FPS, пропущенные кадры и перезапуски
+"""
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from .scrcpy_log_parser import EVENT_FPS
+
+# Состояние сессии по телеметрии
+HEALTH_UNKNOWN = 'unknown'
+HEALTH_GOOD = 'good'
+HEALTH_DEGRADED = 'degraded'
+HEALTH_STALLED = 'stalled'
+
+# Доля пропущенных кадров, при которой сессия считается деградировавшей
+SKIPPED_DEGRADED_RATIO = 0.1
+# Сколько последних замеров учитывать при оценке состояния
+HEALTH_WINDOW = 5
+
+
+@dataclass
+class SessionStats:
+    """Кольцевые буферы замеров одной сессии"""
+    fps: deque
+    skipped: deque
+    restarts: int = 0
+    total_skipped: int = 0
+    last_sample_at: Optional[float] = None
+    started_at: float = field(default_factory=time.monotonic)
+    health: str = HEALTH_UNKNOWN
+
+
+class SessionTelemetry(QObject):
+    """Собирает замеры --print-fps по сессиям и рассылает их пачками.
+
+    Замеры копятся в кольцевых буферах, а сигнал telemetry_updated отправляется
+    не чаще одного раза за update_interval_ms сразу для всех изменившихся сессий.
+    """
+
+    telemetry_updated = pyqtSignal(dict)  # device_id -> снимок (None - сессия завершена)
+
+    def __init__(self, history_size: int = 60, update_interval_ms: int = 500, stall_timeout: float = 5.0):
+        super().__init__()
+        self.history_size = history_size
+        self.stall_timeout = stall_timeout
+        self.sessions = {}  # device_id -> SessionStats
+        self._dirty = set()
+        self._removed = set()
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(update_interval_ms)
+        self._timer.timeout.connect(self._flush)
+
+    def _get_stats(self, device_id: str) -> SessionStats:
+        """Возвращает (или создает) статистику сессии"""
+        stats = self.sessions.get(device_id)
+        if stats is None:
+            stats = SessionStats(deque(maxlen=self.history_size), deque(maxlen=self.history_size))
+            self.sessions[device_id] = stats
+            self._removed.discard(device_id)
+        return stats
+
+    def _mark_dirty(self, device_id: str):
+        """Помечает сессию для ближайшей рассылки"""
+        self._dirty.add(device_id)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def on_session_event(self, event):
+        """Принимает события разбора вывода scrcpy"""
+        if event.kind == EVENT_FPS:
+            self.record_fps(event.device_id, event.data['fps'], event.data.get('skipped', 0))
+
+    def record_fps(self, device_id: str, fps: int, skipped: int = 0):
+        """Добавляет замер FPS"""
+        stats = self._get_stats(device_id)
+        stats.fps.append(fps)
+        stats.skipped.append(skipped)
+        stats.total_skipped += skipped
+        stats.last_sample_at = time.monotonic()
+        self._mark_dirty(device_id)
+
+    def record_restart(self, device_id: str, restart_count: int = None):
+        """Учитывает перезапуск сессии супервизором"""
+        stats = self._get_stats(device_id)
+        stats.restarts = restart_count if restart_count is not None else stats.restarts + 1
+        # Отсчет зависания начинается заново
+        stats.last_sample_at = None
+        stats.started_at = time.monotonic()
+        self._mark_dirty(device_id)
+
+    def reset(self, device_id: str):
+        """Удаляет статистику завершенной сессии"""
+        if self.sessions.pop(device_id, None) is not None:
+            self._dirty.discard(device_id)
+            self._removed.add(device_id)
+            if not self._timer.isActive():
+                self._timer.start()
+
+    def snapshot(self, device_id: str) -> Optional[Dict[str, Any]]:
+        """Возвращает снимок телеметрии сессии"""
+        stats = self.sessions.get(device_id)
+        if stats is None:
+            return None
+        return {
+            'fps_history': list(stats.fps),
+            'last_fps': stats.fps[-1] if stats.fps else None,
+            'skipped_recent': sum(list(stats.skipped)[-HEALTH_WINDOW:]),
+            'total_skipped': stats.total_skipped,
+            'restarts': stats.restarts,
+            'health': stats.health,
+        }
+
+    def _evaluate_health(self, stats: SessionStats, now: float) -> str:
+        """Оценивает состояние сессии по последним замерам"""
+        last_activity = stats.last_sample_at or stats.started_at
+        if now - last_activity > self.stall_timeout:
+            return HEALTH_STALLED
+        if not stats.fps:
+            return HEALTH_UNKNOWN
+        rendered = sum(list(stats.fps)[-HEALTH_WINDOW:])
+        skipped = sum(list(stats.skipped)[-HEALTH_WINDOW:])
+        if skipped and skipped > (rendered + skipped) * SKIPPED_DEGRADED_RATIO:
+            return HEALTH_DEGRADED
+        return HEALTH_GOOD
+
+    def _flush(self):
+        """Рассылает накопившиеся изменения одним сигналом"""
+        now = time.monotonic()
+        for device_id, stats in self.sessions.items():
+            health = self._evaluate_health(stats, now)
+            if health != stats.health:
+                stats.health = health
+                self._dirty.add(device_id)
+
+        updates = {device_id: self.snapshot(device_id) for device_id in self._dirty}
+        updates.update({device_id: None for device_id in self._removed})
+        self._dirty.clear()
+        self._removed.clear()
+
+        if not self.sessions:
+            self._timer.stop()
+        if updates:
+            self.telemetry_updated.emit(updates)
@@ -9,6 +9,7 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QSpinBox, QComboBox, QCheckBox, QPushButton,
                              QGroupBox, QFormLayout, QMessageBox, QInputDialog)
 
+from core.camera_cache import camera_cache
 from core.utils import debug_print, get_icon_path, is_windows
 
 
@@ -23,6 +24,8 @@ class CameraSettingsDialog(QDialog):
         self.device_id = device_id
         self.current_settings = current_settings or {}
         self.localization_manager = localization_manager
+        # Возможности камер устройства (одна проба scrcpy на открытие диалога)
+        self.camera_capabilities = None
 
         self.setWindowTitle(f"{self.localization_manager.tr('camera_settings.title')} - {device_id}")
         self.setModal(True)
@@ -65,6 +68,14 @@ class CameraSettingsDialog(QDialog):
         self.refresh_cameras_button.setToolTip(refresh_tooltip)
         self.refresh_cameras_button.clicked.connect(self._refresh_camera_list)
         refresh_layout.addWidget(self.refresh_cameras_button)
+
+        # Кнопка повторной пробы (игнорирует сохраненный кэш возможностей камер)
+        reprobe_text = self.localization_manager.tr("camera_settings.reprobe_cameras")
+        reprobe_tooltip = self.localization_manager.tr("camera_settings.reprobe_cameras_tooltip")
+        self.reprobe_cameras_button = QPushButton(reprobe_text)
+        self.reprobe_cameras_button.setToolTip(reprobe_tooltip)
+        self.reprobe_cameras_button.clicked.connect(self._reprobe_cameras)
+        refresh_layout.addWidget(self.reprobe_cameras_button)
         refresh_layout.addStretch()
         main_layout.addRow("", refresh_layout)
 
@@ -121,6 +132,7 @@ class CameraSettingsDialog(QDialog):
         high_speed_tooltip = self.localization_manager.tr("camera_settings.high_speed_tooltip")
         self.camera_high_speed_check = QCheckBox(high_speed_text)
         self.camera_high_speed_check.setToolTip(high_speed_tooltip)
+        self.camera_high_speed_check.toggled.connect(self._on_high_speed_changed)
         advanced_layout.addRow("", self.camera_high_speed_check)
 
         # Отключить звук камеры
@@ -335,14 +347,22 @@ class CameraSettingsDialog(QDialog):
         thread.daemon = True
         thread.start()
 
+    def _reprobe_cameras(self):
+        """Сбрасывает кэш возможностей камер устройства и загружает их заново"""
+        if self.device_id:
+            camera_cache.invalidate(self.device_id)
+        self.camera_capabilities = None
+        self._refresh_camera_list()
+
     def _load_camera_data(self):
         """Загружает данные о камерах в отдельном потоке"""
         try:
             from core.adb_manager import AdbManager
             adb_manager = AdbManager()
 
-            # Получаем список камер
-            cameras = adb_manager.get_cameras(self.device_id)
+            # Получаем возможности всех камер одной пробой
+            self.camera_capabilities = adb_manager.get_camera_capabilities(self.device_id)
+            cameras = [camera.to_legacy_dict() for camera in self.camera_capabilities.cameras]
 
             # Обновляем UI в главном потоке
             self.camera_id_combo.clear()
@@ -412,14 +432,26 @@ class CameraSettingsDialog(QDialog):
         if self.v4l2_enabled_check and self.v4l2_enabled_check.isChecked():
             self._check_camera_v4l2_compatibility(camera_id)
 
+    def _on_high_speed_changed(self, enabled):
+        """Обработчик переключения high-speed: меняется набор доступных FPS"""
+        camera_id = self.camera_id_combo.currentData()
+        if camera_id and self.device_id:
+            self._load_camera_details(camera_id)
+
+    def _get_camera_info(self, camera_id):
+        """Возвращает модель камеры, при необходимости выполняя пробу"""
+        if self.camera_capabilities is None:
+            from core.adb_manager import AdbManager
+            self.camera_capabilities = AdbManager().get_camera_capabilities(self.device_id)
+        return self.camera_capabilities.get_camera(camera_id)
+
     def _load_camera_details(self, camera_id):
         """Загружает детали камеры (размеры и FPS)"""
         try:
-            from core.adb_manager import AdbManager
-            adb_manager = AdbManager()
+            camera_info = self._get_camera_info(camera_id)
 
             # Получаем размеры камеры
-            sizes = adb_manager.get_camera_sizes(self.device_id, camera_id)
+            sizes = camera_info.all_sizes() if camera_info else []
             self.camera_size_combo.clear()
             auto_text = self.localization_manager.tr("camera_settings.automatically")
             default_text = self.localization_manager.tr("camera_settings.default")
@@ -427,8 +459,11 @@ class CameraSettingsDialog(QDialog):
             for size in sizes:
                 self.camera_size_combo.addItem(size, size)
 
-            # Получаем FPS камеры
-            fps_options = adb_manager.get_camera_fps_options(self.device_id, camera_id)
+            # Получаем FPS камеры (для high-speed - FPS высокоскоростных режимов)
+            high_speed = self.camera_high_speed_check.isChecked()
+            fps_options = camera_info.fps_options(high_speed) if camera_info else []
+            if not fps_options:
+                fps_options = [15, 24, 30, 60]  # Стандартные значения
             self.camera_fps_combo.clear()
             self.camera_fps_combo.addItem(default_text, "0")
             for fps in fps_options:
@@ -769,18 +804,10 @@ class CameraSettingsDialog(QDialog):
         """Проверяет совместимость камеры с V4L2"""
         try:
             # Получаем информацию о камере
-            from core.adb_manager import AdbManager
-            adb_manager = AdbManager()
-            cameras = adb_manager.get_cameras(self.device_id)
-
-            camera_info = None
-            for camera in cameras:
-                if camera['id'] == camera_id:
-                    camera_info = camera
-                    break
-
-            if not camera_info:
+            camera = self._get_camera_info(camera_id)
+            if not camera:
                 return
+            camera_info = camera.to_legacy_dict()
 
             # Проверяем, является ли камера фронтальной
             camera_type = camera_info.get('type', '').lower()
@@ -0,0 +1,263 @@
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QPen
+from PyQt5.QtWidgets import (QListView, QStyledItemDelegate, QStyle, QMenu,
+                             QAction, QMessageBox, QAbstractItemView)
+
+from core.localization import LocalizationManager
+
+# Роли модели устройств
+DeviceRole = Qt.UserRole + 1
+RunningRole = Qt.UserRole + 2
+
+
+class DeviceListModel(QAbstractListModel):
+    """Модель списка устройств для виртуализированного отображения"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.devices = []
+        self.running = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.devices)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.devices):
+            return None
+        device = self.devices[index.row()]
+        if role == Qt.DisplayRole:
+            return device.get('id', 'Unknown')
+        if role == DeviceRole:
+            return device
+        if role == RunningRole:
+            return device.get('id') in self.running
+        return None
+
+    def device_at(self, row: int) -> dict:
+        """Возвращает устройство по номеру строки"""
+        return self.devices[row]
+
+    def set_devices(self, devices: list, running_ids: set):
+        """Обновляет модель по серийникам: вставляет/удаляет только изменившиеся строки"""
+        running_ids = set(running_ids)
+        new_ids = [device['id'] for device in devices]
+
+        # Удаляем отключенные устройства (снизу вверх, чтобы не сбивать индексы)
+        for row in reversed(range(len(self.devices))):
+            if self.devices[row]['id'] not in new_ids:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.devices[row]
+                self.endRemoveRows()
+
+        current_ids = [device['id'] for device in self.devices]
+        if [device_id for device_id in new_ids if device_id in current_ids] != current_ids:
+            # Порядок изменился - проще пересобрать модель целиком
+            self.beginResetModel()
+            self.devices = list(devices)
+            self.running = running_ids
+            self.endResetModel()
+            return
+
+        for row, device in enumerate(devices):
+            if row >= len(self.devices) or self.devices[row]['id'] != device['id']:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self.devices.insert(row, device)
+                self.endInsertRows()
+                continue
+            was_running = device['id'] in self.running
+            if self.devices[row] != device or was_running != (device['id'] in running_ids):
+                self.devices[row] = device
+                self.running.discard(device['id'])
+                if device['id'] in running_ids:
+                    self.running.add(device['id'])
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+        self.running = running_ids
+
+    def update_device(self, device: dict):
+        """Обновляет одну строку (подробности об устройстве получены)"""
+        for row, current in enumerate(self.devices):
+            if current['id'] == device['id']:
+                self.devices[row] = device
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+                return
+
+
+class DeviceItemDelegate(QStyledItemDelegate):
+    """Отрисовка строки устройства без создания виджетов"""
+
+    ROW_HEIGHT = 46
+
+    def __init__(self, localization_manager: LocalizationManager, parent=None):
+        super().__init__(parent)
+        self.localization_manager = localization_manager
+        self.id_font = QFont("Arial", 10, QFont.Bold)
+        self.details_font = QFont("Arial", 8)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        device = index.data(DeviceRole) or {}
+        running = bool(index.data(RunningRole))
+        rect = option.rect.adjusted(2, 2, -2, -2)
+
+        painter.save()
+
+        # Фон и рамка как у DeviceWidget
+        if option.state & QStyle.State_Selected:
+            background, border = QColor("#e7f1ff"), QColor("#007bff")
+        elif option.state & QStyle.State_MouseOver:
+            background, border = QColor("#f8f9fa"), QColor("#007bff")
+        else:
+            background, border = QColor("white"), QColor("#dee2e6")
+        painter.setPen(QPen(border))
+        painter.setBrush(background)
+        painter.drawRoundedRect(rect, 5, 5)
+
+        # Индикатор запущенного scrcpy
+        indicator = QRect(rect.right() - 18, rect.top() + (rect.height() - 10) // 2, 10, 10)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#28a745") if running else QColor("#ced4da"))
+        painter.drawEllipse(indicator)
+
+        text_rect = rect.adjusted(10, 4, -30, -4)
+        tr = self.localization_manager.tr
+
+        # ID и статус
+        status = device.get('status', 'Unknown')
+        painter.setFont(self.id_font)
+        painter.setPen(QColor("#212529"))
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignTop, device.get('id', 'Unknown'))
+        painter.setPen(QColor("green") if status == 'device' else QColor("red"))
+        painter.drawText(text_rect, Qt.AlignRight | Qt.AlignTop, f"{tr('device_widget.status')} {status}")
+
+        # Подробности
+        details = "   ".join([
+            f"{tr('device_widget.name')} {device.get('name', 'Unknown')}",
+            f"{tr('device_widget.model')} {device.get('model', 'Unknown')}",
+            f"{tr('device_widget.type')} {device.get('connection_type', 'Unknown')}",
+        ])
+        painter.setFont(self.details_font)
+        painter.setPen(QColor("#666"))
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignBottom, details)
+
+        painter.restore()
+
+
+class DeviceListView(QListView):
+    """Компактный виртуализированный список устройств для больших парков.
+
+    Сигналы совпадают с DeviceWidget, действия доступны через контекстное меню.
+    """
+
+    start_scrcpy = pyqtSignal(str)
+    stop_scrcpy = pyqtSignal(str)
+    disconnect_device = pyqtSignal(str)
+    remove_device = pyqtSignal(str)
+    configure_device = pyqtSignal(str)
+    start_camera = pyqtSignal(str)
+    benchmark_encoders = pyqtSignal(str)
+    start_selected = pyqtSignal(list)  # серийники выделенных устройств
+    focus_session = pyqtSignal(str)
+
+    def __init__(self, localization_manager: LocalizationManager = None, parent=None):
+        super().__init__(parent)
+        self.localization_manager = localization_manager
+        self.device_model = DeviceListModel(self)
+        self.setModel(self.device_model)
+        self.setItemDelegate(DeviceItemDelegate(localization_manager, self))
+
+        # Все строки одной высоты - QListView не измеряет каждую строку
+        self.setUniformItemSizes(True)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.customContextMenuRequested.connect(self._show_context_menu)
+        self.doubleClicked.connect(self._on_double_clicked)
+
+    def set_devices(self, devices: list, running_ids: set):
+        """Обновляет список устройств"""
+        self.device_model.set_devices(devices, running_ids)
+
+    def update_device(self, device: dict):
+        """Обновляет информацию об одном устройстве"""
+        self.device_model.update_device(device)
+
+    def currentChanged(self, current, previous):
+        """Текущая строка делает сессию устройства активной"""
+        super().currentChanged(current, previous)
+        if current.isValid():
+            self.focus_session.emit(self.device_model.device_at(current.row())['id'])
+
+    def selected_device_ids(self) -> list:
+        """Возвращает серийники выделенных устройств"""
+        rows = sorted(index.row() for index in self.selectionModel().selectedIndexes())
+        return [self.device_model.device_at(row)['id'] for row in rows]
+
+    def _on_double_clicked(self, index):
+        """Двойной клик запускает или останавливает scrcpy"""
+        device_id = self.device_model.device_at(index.row())['id']
+        if index.data(RunningRole):
+            self.stop_scrcpy.emit(device_id)
+        else:
+            self.start_scrcpy.emit(device_id)
+
+    def _show_context_menu(self, pos):
+        """Показывает контекстное меню для устройства под курсором"""
+        index = self.indexAt(pos)
+        if not index.isValid():
+            return
+        device_id = self.device_model.device_at(index.row())['id']
+        tr = self.localization_manager.tr
+        menu = QMenu(self)
+
+        selected_ids = self.selected_device_ids()
+        if len(selected_ids) > 1:
+            start_selected_action = QAction(f"{tr('start_selected')} ({len(selected_ids)})", menu)
+            start_selected_action.triggered.connect(lambda: self.start_selected.emit(selected_ids))
+            menu.addAction(start_selected_action)
+            menu.addSeparator()
+
+        if index.data(RunningRole):
+            stop_action = QAction(tr("device_widget.stop"), menu)
+            stop_action.triggered.connect(lambda: self.stop_scrcpy.emit(device_id))
+            menu.addAction(stop_action)
+        else:
+            start_action = QAction(tr("device_widget.start"), menu)
+            start_action.triggered.connect(lambda: self.start_scrcpy.emit(device_id))
+            menu.addAction(start_action)
+
+        camera_action = QAction(tr("device_widget.camera"), menu)
+        camera_action.triggered.connect(lambda: self.start_camera.emit(device_id))
+        menu.addAction(camera_action)
+
+        configure_action = QAction(tr("device_widget.configure"), menu)
+        configure_action.triggered.connect(lambda: self.configure_device.emit(device_id))
+        menu.addAction(configure_action)
+
+        benchmark_action = QAction(tr("device_widget.benchmark_encoders"), menu)
+        benchmark_action.triggered.connect(lambda: self.benchmark_encoders.emit(device_id))
+        menu.addAction(benchmark_action)
+
+        menu.addSeparator()
+
+        disconnect_action = QAction(tr("device_widget.disconnect"), menu)
+        disconnect_action.triggered.connect(lambda: self.disconnect_device.emit(device_id))
+        menu.addAction(disconnect_action)
+
+        remove_action = QAction(tr("device_widget.remove"), menu)
+        remove_action.triggered.connect(lambda: self._confirm_remove_device(device_id))
+        menu.addAction(remove_action)
+
+        menu.exec_(self.viewport().mapToGlobal(pos))
+
+    def _confirm_remove_device(self, device_id: str):
+        """Подтверждение удаления устройства"""
+        title = self.localization_manager.tr("device_widget.confirm_remove")
+        message = self.localization_manager.tr("device_widget.confirm_remove_message", device_id=device_id)
+        reply = QMessageBox.question(self, title, message, QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.remove_device.emit(device_id)
@@ -1,10 +1,48 @@
-from PyQt5.QtCore import pyqtSignal
-from PyQt5.QtGui import QFont
+from PyQt5.QtCore import QPointF, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QPainter, QPen, QPolygonF
 from PyQt5.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QLabel,
-                             QPushButton, QMenu, QAction, QMessageBox)
+                             QPushButton, QMenu, QAction, QMessageBox, QCheckBox)
 
 from core.localization import LocalizationManager
 
+# Цвета состояния сессии по телеметрии
+HEALTH_COLORS = {
+    'good': '#28a745',
+    'degraded': '#fd7e14',
+    'stalled': '#dc3545',
+    'unknown': '#6c757d',
+}
+
+
+class FpsSparkline(QWidget):
+    """Мини-график FPS последних замеров"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.values = []
+        self.color = QColor(HEALTH_COLORS['unknown'])
+        self.setFixedSize(80, 22)
+
+    def set_values(self, values, color: str):
+        """Задает замеры и цвет линии"""
+        self.values = list(values)
+        self.color = QColor(color)
+        self.update()
+
+    def paintEvent(self, event):
+        if len(self.values) < 2:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(self.color, 1.5))
+
+        width, height = self.width() - 2, self.height() - 2
+        peak = max(max(self.values), 1)
+        step = width / (len(self.values) - 1)
+        points = [QPointF(1 + index * step, 1 + height - value * height / peak)
+                  for index, value in enumerate(self.values)]
+        painter.drawPolyline(QPolygonF(points))
+
 
 class DeviceWidget(QWidget):
     """Виджет для отображения устройства в списке"""
@@ -15,6 +53,8 @@ class DeviceWidget(QWidget):
     remove_device = pyqtSignal(str)
     configure_device = pyqtSignal(str)
     start_camera = pyqtSignal(str)
+    benchmark_encoders = pyqtSignal(str)
+    focus_session = pyqtSignal(str)
 
     def __init__(self, device_info: dict, scrcpy_running: bool = False,
                  localization_manager: LocalizationManager = None):
@@ -29,6 +69,11 @@ class DeviceWidget(QWidget):
         layout = QHBoxLayout()
         layout.setContentsMargins(10, 5, 10, 5)
 
+        # Выбор устройства для массового запуска
+        self.select_check = QCheckBox()
+        self.select_check.setToolTip(self.localization_manager.tr("device_widget.select_tooltip"))
+        layout.addWidget(self.select_check)
+
         # Основная информация об устройстве
         info_layout = QVBoxLayout()
 
@@ -71,7 +116,25 @@ class DeviceWidget(QWidget):
             self.status_label.setStyleSheet("color: green; font-weight: bold;")
         else:
             self.status_label.setStyleSheet("color: red; font-weight: bold;")
-        info_layout.addWidget(self.status_label)
+        # Статус и телеметрия сессии в одной строке
+        status_layout = QHBoxLayout()
+        status_layout.addWidget(self.status_label)
+
+        self.fps_sparkline = FpsSparkline()
+        self.fps_sparkline.hide()
+        status_layout.addWidget(self.fps_sparkline)
+
+        self.fps_badge = QLabel()
+        self.fps_badge.hide()
+        status_layout.addWidget(self.fps_badge)
+
+        # Этап запуска сессии (скрыт, пока видео идет или сессии нет)
+        self.session_state_label = QLabel()
+        self.session_state_label.setStyleSheet("color: #6c757d; font-size: 9px;")
+        self.session_state_label.hide()
+        status_layout.addWidget(self.session_state_label)
+        status_layout.addStretch()
+        info_layout.addLayout(status_layout)
 
         layout.addLayout(info_layout)
 
@@ -171,6 +234,15 @@ class DeviceWidget(QWidget):
             }
         """)
 
+    def mousePressEvent(self, event):
+        """Клик по карточке делает сессию устройства активной"""
+        self.focus_session.emit(self.device_info['id'])
+        super().mousePressEvent(event)
+
+    def is_selected(self) -> bool:
+        """Отмечено ли устройство для массового запуска"""
+        return self.select_check.isChecked()
+
     def _on_start_scrcpy(self):
         """Обработчик запуска scrcpy"""
         self.start_scrcpy.emit(self.device_info['id'])
@@ -191,6 +263,14 @@ class DeviceWidget(QWidget):
         """Показывает контекстное меню"""
         menu = QMenu(self)
 
+        # Подбор видеоэнкодера
+        benchmark_text = self.localization_manager.tr("device_widget.benchmark_encoders")
+        benchmark_action = QAction(benchmark_text, self)
+        benchmark_action.triggered.connect(
+            lambda: self.benchmark_encoders.emit(self.device_info['id'])
+        )
+        menu.addAction(benchmark_action)
+
         # Действие отключения
         disconnect_text = self.localization_manager.tr("device_widget.disconnect")
         disconnect_action = QAction(disconnect_text, self)
@@ -295,3 +375,36 @@ class DeviceWidget(QWidget):
             self.status_label.setStyleSheet("color: green; font-weight: bold;")
         else:
             self.status_label.setStyleSheet("color: red; font-weight: bold;")
+
+    def update_telemetry(self, telemetry: dict):
+        """Обновляет мини-график FPS и значок состояния сессии"""
+        if not telemetry or telemetry.get('last_fps') is None and not telemetry.get('restarts'):
+            self.fps_sparkline.hide()
+            self.fps_badge.hide()
+            return
+
+        color = HEALTH_COLORS.get(telemetry.get('health'), HEALTH_COLORS['unknown'])
+        self.fps_sparkline.set_values(telemetry.get('fps_history', []), color)
+        self.fps_sparkline.setVisible(len(telemetry.get('fps_history', [])) > 1)
+
+        badge_text = self.localization_manager.tr("device_widget.fps", fps=telemetry.get('last_fps') or 0)
+        if telemetry.get('restarts'):
+            badge_text += f" ↻{telemetry['restarts']}"
+        self.fps_badge.setText(badge_text)
+        self.fps_badge.setStyleSheet(
+            f"background-color: {color}; color: white; border-radius: 3px; padding: 0 4px; font-size: 9px;")
+        self.fps_badge.setToolTip(self.localization_manager.tr(
+            "device_widget.telemetry_tooltip",
+            health=self.localization_manager.tr(f"device_widget.health_{telemetry.get('health', 'unknown')}"),
+            skipped=telemetry.get('total_skipped', 0), restarts=telemetry.get('restarts', 0)))
+        self.fps_badge.show()
+
+    def update_session_state(self, state: str):
+        """Показывает этап запуска сессии scrcpy"""
+        if state in ('spawning', 'connecting', 'failed'):
+            self.session_state_label.setText(self.localization_manager.tr(f"device_widget.state_{state}"))
+            color = "#dc3545" if state == 'failed' else "#6c757d"
+            self.session_state_label.setStyleSheet(f"color: {color}; font-size: 9px;")
+            self.session_state_label.show()
+        else:
+            self.session_state_label.hide()
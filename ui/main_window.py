@@ -1,3 +1,4 @@
+import copy
 import os
 import sys
 
@@ -8,10 +9,18 @@ from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QMessageBox, QStatusBar, QFrame, QCheckBox)
 
 from core.adb_manager import AdbManager
+from core.adb_worker import AsyncAdbManager
 from core.config_manager import ConfigManager
 from core.localization import LocalizationManager
 from core.scrcpy_manager import ScrcpyManager
+from core.adaptive_quality import AdaptiveQualityController
+from core.encoder_benchmark import EncoderBenchmark
+from core.postprocess_queue import JOB_FAILED, PostProcessQueue
+from core.recording_segmenter import RecordingSegmenter, is_segmented
+from core.session_supervisor import SessionSupervisor
+from core.session_telemetry import SessionTelemetry
 from core.utils import debug_print, get_icon_path
+from ui.device_list_view import DeviceListView
 from ui.device_widget import DeviceWidget
 from ui.settings_dialog import SettingsDialog
 
@@ -29,6 +38,8 @@ class MainWindow(QMainWindow):
         self.setup_connections()
         self.load_settings()
         self.refresh_devices()
+        # Push-отслеживание устройств; таймер остается запасным вариантом
+        self.adb_manager.start_tracking()
 
     def init_managers(self):
         """Инициализация менеджеров"""
@@ -43,10 +54,28 @@ class MainWindow(QMainWindow):
         debug_print(f"📁 Path to config.json: {config_path}")
         self.config_manager = ConfigManager(config_path)
         self.localization_manager = LocalizationManager(self.config_manager)
-        self.adb_manager = AdbManager()
-        self.scrcpy_manager = ScrcpyManager()
-
-        # Таймер для автообновления
+        self.adb_manager = AdbManager(
+            max_parallel_enrichment=self.config_manager.get_app_setting("adb_parallel_enrichment", 8)
+        )
+        # Блокирующие ADB-вызовы выполняются вне GUI-потока
+        self.async_adb = AsyncAdbManager(self.adb_manager)
+        self.connect_request = None
+        self._rendered_devices = None  # список, уже отрисованный по device_list_changed
+        self.bulk_launch_progress = None
+        self.encoder_benchmarks = {}  # device_id -> EncoderBenchmark
+        self.scrcpy_manager = ScrcpyManager(self.config_manager)
+        self.session_supervisor = SessionSupervisor(self.scrcpy_manager, self.adb_manager)
+        self.session_telemetry = SessionTelemetry()
+        self.adaptive_quality = AdaptiveQualityController(self.session_telemetry, self.async_adb)
+        self.recording_segmenter = RecordingSegmenter(self.scrcpy_manager)
+        # Каждый запуск (в том числе перезапуск) пишет запись в новый сегмент
+        self.session_supervisor.launch_filters.append(self.recording_segmenter.prepare)
+        self.postprocess_queue = PostProcessQueue(self.scrcpy_manager, self.config_manager,
+                                                  recording_segmenter=self.recording_segmenter)
+        self.postprocess_dialog = None
+        self.recording_suspended = set()  # устройства, запись которых остановлена из-за нехватки места
+
+        # Таймер для автообновления (пока не заработает отслеживание устройств)
         self.refresh_timer = QTimer()
         self.refresh_timer.timeout.connect(self.refresh_devices)
         self.refresh_timer.start(5000)  # Обновляем каждые 5 секунд
@@ -163,6 +192,12 @@ class MainWindow(QMainWindow):
         self.auto_refresh_check.toggled.connect(self.toggle_auto_refresh)
         toolbar_layout.addWidget(self.auto_refresh_check)
 
+        # Компактный виртуализированный список для большого числа устройств
+        self.compact_list_check = QCheckBox(self.localization_manager.tr("compact_list"))
+        self.compact_list_check.setChecked(self.config_manager.get_app_setting("compact_device_list", False))
+        self.compact_list_check.toggled.connect(self.toggle_compact_list)
+        toolbar_layout.addWidget(self.compact_list_check)
+
         # Кнопка настроек
         self.settings_button = QPushButton(self.localization_manager.tr("settings"))
         self.settings_button.clicked.connect(self.show_scrcpy_settings)
@@ -181,6 +216,24 @@ class MainWindow(QMainWindow):
         """)
         toolbar_layout.addWidget(self.settings_button)
 
+        # Кнопка массового запуска выбранных устройств
+        self.start_selected_button = QPushButton(self.localization_manager.tr("start_selected"))
+        self.start_selected_button.clicked.connect(lambda: self.start_selected_devices())
+        self.start_selected_button.setStyleSheet("""
+            QPushButton {
+                background-color: #28a745;
+                color: white;
+                border: none;
+                padding: 5px 10px;
+                border-radius: 3px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #218838;
+            }
+        """)
+        toolbar_layout.addWidget(self.start_selected_button)
+
         # Кнопка остановки всех scrcpy
         self.stop_all_button = QPushButton(self.localization_manager.tr("stop_all"))
         self.stop_all_button.clicked.connect(self.stop_all_scrcpy)
@@ -199,6 +252,12 @@ class MainWindow(QMainWindow):
         """)
         toolbar_layout.addWidget(self.stop_all_button)
 
+        # Кнопка очереди обработки записей
+        self.postprocess_button = QPushButton()
+        self.postprocess_button.clicked.connect(self.show_postprocess_queue)
+        toolbar_layout.addWidget(self.postprocess_button)
+        self.update_postprocess_button()
+
         toolbar_layout.addStretch()
 
         parent_layout.addWidget(toolbar_frame)
@@ -227,11 +286,37 @@ class MainWindow(QMainWindow):
         self.devices_container_layout = QVBoxLayout()
         self.devices_container.setLayout(self.devices_container_layout)
         self.devices_layout.addWidget(self.devices_container)
+        # Виджеты устройств по серийнику: обновляются на месте, а не пересоздаются
+        self.device_widgets = {}
+
+        # Сообщение об отсутствии устройств (создается один раз)
+        self.no_devices_label = QLabel(self.localization_manager.tr("no_devices"))
+        self.no_devices_label.setAlignment(Qt.AlignCenter)
+        self.no_devices_label.setStyleSheet("color: #666; font-size: 14px; padding: 20px;")
+        self.no_devices_label.hide()
+        self.devices_layout.addWidget(self.no_devices_label)
 
         self.devices_layout.addStretch()
         self.scroll_area.setWidget(self.devices_widget)
         parent_layout.addWidget(self.scroll_area)
 
+        # Компактный список: рисуются только видимые строки
+        self.device_list_view = DeviceListView(self.localization_manager)
+        self.device_list_view.start_scrcpy.connect(self.start_scrcpy)
+        self.device_list_view.stop_scrcpy.connect(self.stop_scrcpy)
+        self.device_list_view.disconnect_device.connect(self.disconnect_device)
+        self.device_list_view.remove_device.connect(self.remove_device)
+        self.device_list_view.configure_device.connect(self.configure_device)
+        self.device_list_view.start_camera.connect(self.start_camera)
+        self.device_list_view.benchmark_encoders.connect(self.benchmark_encoders)
+        self.device_list_view.start_selected.connect(self.start_selected_devices)
+        self.device_list_view.focus_session.connect(self.scrcpy_manager.set_focused_session)
+        parent_layout.addWidget(self.device_list_view)
+
+        compact = self.compact_list_check.isChecked()
+        self.scroll_area.setVisible(not compact)
+        self.device_list_view.setVisible(compact)
+
         # Убираем прогресс бар для сканирования
 
     def create_status_bar(self):
@@ -260,6 +345,43 @@ class MainWindow(QMainWindow):
         """Настраивает соединения сигналов"""
         # ADB Manager
         self.adb_manager.device_list_changed.connect(self.on_devices_changed)
+        self.adb_manager.device_info_updated.connect(self.on_device_info_updated)
+        self.adb_manager.tracking_state_changed.connect(self.on_tracking_state_changed)
+        self.async_adb.refresh_finished.connect(self.on_refresh_finished)
+        self.async_adb.connect_finished.connect(self.on_connect_finished)
+        self.async_adb.disconnect_finished.connect(self.on_disconnect_finished)
+
+        # Супервизор сессий
+        self.session_supervisor.session_restarting.connect(self.on_session_restarting)
+        self.session_supervisor.session_waiting_device.connect(self.on_session_waiting_device)
+        self.session_supervisor.session_restored.connect(self.on_session_restored)
+        self.session_supervisor.session_gave_up.connect(self.on_session_gave_up)
+        self.session_supervisor.session_finished.connect(self.on_session_finished)
+        self.session_supervisor.session_restored.connect(self.session_telemetry.record_restart)
+
+        # Телеметрия сессий
+        self.scrcpy_manager.session_event.connect(self.session_telemetry.on_session_event)
+        self.scrcpy_manager.session_state_changed.connect(self.on_session_state_changed)
+        self.session_telemetry.telemetry_updated.connect(self.on_telemetry_updated)
+        self.adaptive_quality.tier_changed.connect(self.on_quality_tier_changed)
+
+        # Сегментированная запись
+        self.recording_segmenter.rotation_requested.connect(self._relaunch_session)
+        self.recording_segmenter.segment_closed.connect(self.on_segment_closed)
+
+        # Контроль места на диске для записей
+        self.scrcpy_manager.disk_guard.rotation_requested.connect(self._relaunch_session)
+        self.scrcpy_manager.disk_guard.stop_requested.connect(self.on_disk_stop_requested)
+        self.scrcpy_manager.disk_guard.space_low.connect(self.on_disk_space_low)
+
+        # Обработка записей
+        self.postprocess_queue.queue_changed.connect(self.update_postprocess_button)
+        self.postprocess_queue.job_updated.connect(self.on_postprocess_job_updated)
+        self.postprocess_queue.resume()
+
+        # Массовый запуск
+        self.scrcpy_manager.bulk_launch_result.connect(self.on_bulk_launch_result)
+        self.scrcpy_manager.bulk_launch_finished.connect(self.on_bulk_launch_finished)
 
         # Scrcpy Manager
         self.scrcpy_manager.process_started.connect(self.on_scrcpy_started)
@@ -278,52 +400,84 @@ class MainWindow(QMainWindow):
             pass
 
     def refresh_devices(self):
-        """Обновляет список устройств"""
-        devices = self.adb_manager.get_devices()
-        self.update_devices_display(devices)
+        """Запрашивает обновление списка устройств (результат придет в on_refresh_finished)"""
+        self.async_adb.refresh_devices()
+
+    def on_refresh_finished(self, request_id, devices):
+        """Обработчик завершения обновления списка устройств"""
+        # Изменившийся список уже отрисован в on_devices_changed - второй раз не перерисовываем
+        if devices != self._rendered_devices:
+            self.update_devices_display(devices)
+        self._rendered_devices = None
         self.update_status()
 
     def update_devices_display(self, devices):
-        """Обновляет отображение устройств"""
-        # Очищаем текущие виджеты
-        for i in reversed(range(self.devices_container_layout.count())):
-            child = self.devices_container_layout.itemAt(i).widget()
-            if child:
-                child.setParent(None)
-
-        # Добавляем новые виджеты
-        for device in devices:
-            device_widget = DeviceWidget(device, self.scrcpy_manager.is_scrcpy_running(device['id']),
-                                         self.localization_manager)
-
-            # Подключаем сигналы
-            device_widget.start_scrcpy.connect(self.start_scrcpy)
-            device_widget.stop_scrcpy.connect(self.stop_scrcpy)
-            device_widget.disconnect_device.connect(self.disconnect_device)
-            device_widget.remove_device.connect(self.remove_device)
-            device_widget.configure_device.connect(self.configure_device)
-            device_widget.start_camera.connect(self.start_camera)
-
-            self.devices_container_layout.addWidget(device_widget)
+        """Обновляет отображение устройств: добавляет/удаляет только изменившиеся виджеты"""
+        if self.compact_list_check.isChecked():
+            running_ids = {device['id'] for device in devices
+                           if self.scrcpy_manager.is_scrcpy_running(device['id'])}
+            self.device_list_view.set_devices(devices, running_ids)
+            return
 
-        # Если устройств нет, показываем сообщение
-        if not devices:
-            no_devices_label = QLabel(self.localization_manager.tr("no_devices"))
-            no_devices_label.setAlignment(Qt.AlignCenter)
-            no_devices_label.setStyleSheet("color: #666; font-size: 14px; padding: 20px;")
-            self.devices_container_layout.addWidget(no_devices_label)
+        device_ids = [device['id'] for device in devices]
+
+        # Удаляем виджеты отключенных устройств
+        for device_id in list(self.device_widgets):
+            if device_id not in device_ids:
+                device_widget = self.device_widgets.pop(device_id)
+                self.devices_container_layout.removeWidget(device_widget)
+                device_widget.deleteLater()
+
+        for index, device in enumerate(devices):
+            running = self.scrcpy_manager.is_scrcpy_running(device['id'])
+            device_widget = self.device_widgets.get(device['id'])
+
+            if device_widget is None:
+                device_widget = self._create_device_widget(device, running)
+                self.device_widgets[device['id']] = device_widget
+                self.devices_container_layout.insertWidget(index, device_widget)
+                continue
+
+            # Обновляем существующий виджет на месте
+            if device_widget.device_info != device:
+                device_widget.update_device_info(device)
+            if device_widget.scrcpy_running != running:
+                device_widget.update_scrcpy_status(running)
+            if self.devices_container_layout.indexOf(device_widget) != index:
+                self.devices_container_layout.removeWidget(device_widget)
+                self.devices_container_layout.insertWidget(index, device_widget)
 
-        # Принудительно обновляем интерфейс
-        self.devices_container.update()
-        self.scroll_area.update()
+        # Если устройств нет, показываем сообщение
+        self.no_devices_label.setVisible(not devices)
+
+    def _create_device_widget(self, device, running):
+        """Создает виджет устройства и подключает его сигналы"""
+        device_widget = DeviceWidget(device, running, self.localization_manager)
+        device_widget.update_telemetry(self.session_telemetry.snapshot(device['id']))
+        session = self.scrcpy_manager.get_session(device['id'])
+        if session is not None:
+            device_widget.update_session_state(session.state)
+
+        # Подключаем сигналы
+        device_widget.start_scrcpy.connect(self.start_scrcpy)
+        device_widget.stop_scrcpy.connect(self.stop_scrcpy)
+        device_widget.disconnect_device.connect(self.disconnect_device)
+        device_widget.remove_device.connect(self.remove_device)
+        device_widget.configure_device.connect(self.configure_device)
+        device_widget.start_camera.connect(self.start_camera)
+        device_widget.benchmark_encoders.connect(self.benchmark_encoders)
+        device_widget.focus_session.connect(self.scrcpy_manager.set_focused_session)
+        return device_widget
 
     def start_scrcpy(self, device_id):
         """Запускает scrcpy для устройства"""
         # Получаем настройки для устройства
         settings = self.config_manager.get_device_settings(device_id)
 
-        # Запускаем scrcpy
-        success = self.scrcpy_manager.start_scrcpy(device_id, settings)
+        # Запущенная вручную сессия становится активной (приоритет ресурсов хоста)
+        self.scrcpy_manager.set_focused_session(device_id)
+
+        success = self._start_supervised_scrcpy(device_id, settings)
 
         if not success:
             QMessageBox.warning(self, self.localization_manager.tr("messages.error"),
@@ -332,16 +486,132 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage(self.localization_manager.tr("messages.scrcpy_started", device_id=device_id),
                                         3000)
 
+    def get_selected_device_ids(self):
+        """Возвращает устройства, выбранные для массового запуска"""
+        if self.compact_list_check.isChecked():
+            return self.device_list_view.selected_device_ids()
+        return [device_id for device_id, device_widget in self.device_widgets.items() if device_widget.is_selected()]
+
+    def start_selected_devices(self, device_ids=None):
+        """Запускает scrcpy на выбранных устройствах с ограничением одновременных запусков"""
+        device_ids = device_ids or self.get_selected_device_ids()
+        if not device_ids:
+            self.status_bar.showMessage(self.localization_manager.tr("messages.no_devices_selected"), 3000)
+            return
+
+        device_settings = {device_id: self.config_manager.get_device_settings(device_id) for device_id in device_ids}
+        max_in_flight = self.config_manager.get_app_setting("fleet_max_in_flight", 4)
+        self.bulk_launch_progress = {'done': 0, 'total': len(device_ids)}
+        self.scrcpy_manager.start_bulk(
+            device_settings,
+            max_in_flight=max_in_flight,
+            launcher=self._start_supervised_scrcpy
+        )
+        self.status_bar.showMessage(self.localization_manager.tr(
+            "messages.fleet_launch_started", count=len(device_ids), max_in_flight=max_in_flight), 3000)
+
+    def on_bulk_launch_result(self, device_id, success, message):
+        """Обработчик результата запуска одного устройства из пачки"""
+        progress = self.bulk_launch_progress or {'done': 0, 'total': 0}
+        progress['done'] += 1
+        if success:
+            text = self.localization_manager.tr(
+                "messages.fleet_device_started", device_id=device_id, done=progress['done'], total=progress['total'])
+        else:
+            text = self.localization_manager.tr(
+                "messages.fleet_device_failed", device_id=device_id, reason=message,
+                done=progress['done'], total=progress['total'])
+        self.status_bar.showMessage(text, 3000)
+        self.update_devices_display(self.adb_manager.devices)
+
+    def on_bulk_launch_finished(self, succeeded, failed):
+        """Обработчик завершения массового запуска"""
+        self.bulk_launch_progress = None
+        self.status_bar.showMessage(self.localization_manager.tr(
+            "messages.fleet_launch_finished", succeeded=succeeded, failed=failed), 5000)
+        self.update_status()
+
+    def _start_supervised_scrcpy(self, device_id, settings):
+        """Запускает scrcpy под наблюдением супервизора (и адаптивного качества, если включено)"""
+        self.recording_suspended.discard(device_id)
+        record = settings.get('record', {})
+        adaptive = settings.get('video', {}).get('adaptive', False)
+        if adaptive and record.get('file') and not is_segmented(record):
+            # Смена ступени перезапускает scrcpy, и запись в один файл начиналась бы заново
+            debug_print(f"⚠️ Adaptive quality disabled for {device_id}: recording to a single file")
+            adaptive = False
+        if adaptive:
+            settings = self.adaptive_quality.track(device_id, settings)
+        else:
+            self.adaptive_quality.untrack(device_id)
+        success = self.session_supervisor.start_scrcpy(device_id, settings, self._get_restart_policy(device_id))
+        if not success:
+            self.adaptive_quality.untrack(device_id)
+        return success
+
+    def _relaunch_session(self, device_id):
+        """Перезапускает работающую сессию с актуальными настройками (новая ступень качества, новый сегмент)"""
+        settings = self.adaptive_quality.apply(device_id, self.config_manager.get_device_settings(device_id))
+        if device_id in self.recording_suspended:
+            # Запись остановлена из-за нехватки места - зеркалирование продолжается без нее
+            settings = copy.deepcopy(settings)
+            settings.setdefault('record', {})['file'] = ''
+        return self.session_supervisor.relaunch(device_id, settings)
+
+    def on_quality_tier_changed(self, device_id, previous_tier, tier, quality):
+        """Перезапускает сессию на новой ступени качества"""
+        record = self.config_manager.get_device_settings(device_id).get('record', {})
+        if record.get('file') and not is_segmented(record) and device_id not in self.recording_suspended:
+            # Запись в один файл включили уже во время сессии - перезапуск обрезал бы ее
+            self.adaptive_quality.untrack(device_id)
+            return
+        if not self._relaunch_session(device_id):
+            return
+        max_size = quality['max_size'] or self.localization_manager.tr("main_settings.video.unlimited")
+        self.status_bar.showMessage(self.localization_manager.tr(
+            "messages.quality_lowered" if tier > previous_tier else "messages.quality_raised", device_id=device_id,
+            bit_rate=f"{quality['bit_rate'] / 1000000:g}", max_size=max_size), 5000)
+
+    def on_disk_stop_requested(self, device_id, free_mb):
+        """Диск почти заполнен - останавливаем запись устройства"""
+        self.status_bar.showMessage(self.localization_manager.tr(
+            "messages.disk_recording_stopped", device_id=device_id, free=free_mb), 10000)
+        if ScrcpyManager.is_record_only(self.config_manager.get_device_settings(device_id)):
+            # Без записи у сессии нет смысла
+            self.stop_scrcpy(device_id)
+            return
+        self.recording_suspended.add(device_id)
+        self._relaunch_session(device_id)
+
+    def on_disk_space_low(self, path, free_mb, minutes_left):
+        """Предупреждение о том, что места на диске хватит ненадолго"""
+        self.status_bar.showMessage(self.localization_manager.tr(
+            "messages.disk_space_low", path=path, free=free_mb, minutes=minutes_left), 10000)
+
+    def on_segment_closed(self, device_id, path):
+        """Обработчик готовности очередного сегмента записи"""
+        self.status_bar.showMessage(self.localization_manager.tr(
+            "messages.segment_ready", device_id=device_id, file=os.path.basename(path)), 3000)
+
+    def _get_restart_policy(self, device_id):
+        """Возвращает политику перезапуска сессии для устройства"""
+        settings = self.config_manager.get_device_settings(device_id)
+        return settings.get('advanced', {}).get('restart_policy', 'never')
+
     def stop_scrcpy(self, device_id):
         """Останавливает scrcpy для устройства"""
-        success = self.scrcpy_manager.stop_scrcpy(device_id)
+        self.adaptive_quality.untrack(device_id)
+        self.recording_segmenter.stop(device_id)
+        success = self.session_supervisor.stop(device_id)
         if success:
             self.status_bar.showMessage(self.localization_manager.tr("messages.scrcpy_stopped", device_id=device_id),
                                         3000)
 
     def stop_all_scrcpy(self):
         """Останавливает все процессы scrcpy"""
-        self.scrcpy_manager.stop_all_scrcpy()
+        self.adaptive_quality.clear()
+        self.recording_segmenter.stop_all()
+        self.session_supervisor.stop_all()
         self.status_bar.showMessage(self.localization_manager.tr("messages.all_scrcpy_stopped"), 3000)
         self.refresh_devices()  # Обновляем список устройств после остановки
 
@@ -385,7 +655,17 @@ class MainWindow(QMainWindow):
             return
 
         self.status_bar.showMessage(self.localization_manager.tr("messages.connecting", ip=ip), 0)
-        success, message = self.adb_manager.connect_device(ip, port)
+        # Повторное нажатие во время подключения отменяет предыдущую попытку
+        if self.connect_request is not None:
+            self.async_adb.cancel(self.connect_request)
+        self.connect_request = self.async_adb.connect_device(ip, port)
+
+    def on_connect_finished(self, request_id, address, success, message):
+        """Обработчик завершения подключения по IP"""
+        if request_id != self.connect_request:
+            return
+        self.connect_request = None
+        ip = address.rsplit(':', 1)[0]
 
         if success:
             self.status_bar.showMessage(self.localization_manager.tr("messages.device_connected", ip=ip), 3000)
@@ -396,7 +676,10 @@ class MainWindow(QMainWindow):
 
     def disconnect_device(self, device_id):
         """Отключает устройство"""
-        success, message = self.adb_manager.disconnect_device(device_id)
+        self.async_adb.disconnect_device(device_id)
+
+    def on_disconnect_finished(self, request_id, device_id, success, message):
+        """Обработчик завершения отключения устройства"""
         if success:
             self.status_bar.showMessage(
                 self.localization_manager.tr("messages.device_disconnected", device_id=device_id), 3000)
@@ -422,6 +705,55 @@ class MainWindow(QMainWindow):
         dialog.language_changed.connect(self.on_language_changed)
         dialog.exec_()
 
+    def benchmark_encoders(self, device_id):
+        """Подбирает лучший видеоэнкодер устройства пробными сессиями"""
+        if device_id in self.encoder_benchmarks:
+            return
+        if self.scrcpy_manager.is_scrcpy_running(device_id):
+            # Проба конкурировала бы с сессией за энкодер устройства
+            self.status_bar.showMessage(
+                self.localization_manager.tr("messages.benchmark_busy", device_id=device_id), 3000)
+            return
+        video = self.config_manager.get_device_settings(device_id).get('video', {})
+        benchmark = EncoderBenchmark(device_id, self.scrcpy_manager.scrcpy_path, video, parent=self)
+        missing = benchmark.missing_tool()
+        if missing:
+            # Без ffprobe кадры пробной записи не посчитать
+            benchmark.deleteLater()
+            QMessageBox.warning(self, self.localization_manager.tr("messages.error"),
+                                self.localization_manager.tr("messages.benchmark_tool_missing",
+                                                             device_id=device_id, tool=missing))
+            return
+        benchmark.progress.connect(self.on_benchmark_progress)
+        benchmark.finished.connect(self.on_benchmark_finished)
+        self.encoder_benchmarks[device_id] = benchmark
+        self.status_bar.showMessage(self.localization_manager.tr("messages.benchmark_started", device_id=device_id), 0)
+        benchmark.start()
+
+    def on_benchmark_progress(self, device_id, done, total, current):
+        """Обработчик перехода к следующему энкодеру"""
+        self.status_bar.showMessage(self.localization_manager.tr(
+            "messages.benchmark_progress", device_id=device_id, current=current, done=done + 1, total=total), 0)
+
+    def on_benchmark_finished(self, device_id, result):
+        """Сохраняет победителя подбора энкодера"""
+        benchmark = self.encoder_benchmarks.pop(device_id, None)
+        if benchmark is not None:
+            benchmark.deleteLater()
+        if result is None:
+            if benchmark is not None and benchmark.error:
+                QMessageBox.warning(self, self.localization_manager.tr("messages.error"),
+                                    self.localization_manager.tr("messages.benchmark_aborted",
+                                                                 device_id=device_id, error=benchmark.error))
+                return
+            self.status_bar.showMessage(
+                self.localization_manager.tr("messages.benchmark_failed", device_id=device_id), 5000)
+            return
+        self.config_manager.set_encoder_benchmark(device_id, result)
+        self.status_bar.showMessage(self.localization_manager.tr(
+            "messages.benchmark_finished", device_id=device_id,
+            encoder=f"{result['codec']}/{result['encoder']}", fps=f"{result['fps']:g}"), 5000)
+
     def save_device_settings(self, device_id, settings):
         """Сохраняет настройки устройства"""
         self.config_manager.set_device_settings(device_id, settings)
@@ -465,7 +797,7 @@ class MainWindow(QMainWindow):
                                     self.localization_manager.tr("messages.high_speed_fps_warning"))
                 return
 
-        success = self.scrcpy_manager.start_camera(device_id, settings)
+        success = self.session_supervisor.start_camera(device_id, settings, self._get_restart_policy(device_id))
         if success:
             self.status_bar.showMessage(self.localization_manager.tr("messages.camera_started", device_id=device_id),
                                         3000)
@@ -477,12 +809,31 @@ class MainWindow(QMainWindow):
     def toggle_auto_refresh(self, enabled):
         """Переключает автообновление"""
         if enabled:
-            self.refresh_timer.start(5000)  # Обновляем каждые 5 секунд
+            self.adb_manager.start_tracking()
+            if not self.adb_manager.is_tracking():
+                self.refresh_timer.start(5000)  # Обновляем каждые 5 секунд
             self.status_bar.showMessage(self.localization_manager.tr("messages.auto_refresh_enabled"), 2000)
         else:
+            self.adb_manager.stop_tracking()
             self.refresh_timer.stop()
             self.status_bar.showMessage(self.localization_manager.tr("messages.auto_refresh_disabled"), 2000)
 
+    def toggle_compact_list(self, enabled):
+        """Переключает компактный список устройств"""
+        self.config_manager.set_app_setting("compact_device_list", enabled)
+        self.scroll_area.setVisible(not enabled)
+        self.device_list_view.setVisible(enabled)
+
+        # Освобождаем представление, которое больше не показывается
+        if enabled:
+            for device_widget in self.device_widgets.values():
+                self.devices_container_layout.removeWidget(device_widget)
+                device_widget.deleteLater()
+            self.device_widgets.clear()
+        else:
+            self.device_list_view.set_devices([], set())
+        self.update_devices_display(self.adb_manager.devices)
+
     def show_scrcpy_settings(self, device_id: str = None):
         """Показывает настройки scrcpy"""
         if device_id:
@@ -513,6 +864,30 @@ class MainWindow(QMainWindow):
         dialog.device_connected.connect(self._on_qr_device_connected)
         dialog.exec_()
         
+    def show_postprocess_queue(self):
+        """Показывает окно очереди обработки записей"""
+        from ui.postprocess_dialog import PostProcessDialog
+
+        if self.postprocess_dialog is None:
+            self.postprocess_dialog = PostProcessDialog(self.postprocess_queue, self.config_manager, self,
+                                                        self.localization_manager)
+        self.postprocess_dialog.show()
+        self.postprocess_dialog.raise_()
+        self.postprocess_dialog.activateWindow()
+
+    def update_postprocess_button(self):
+        """Показывает на кнопке число необработанных записей"""
+        self.postprocess_button.setText(self.localization_manager.tr(
+            "postprocess_button", count=self.postprocess_queue.pending_count()))
+        failed = self.postprocess_queue.failed_count()
+        self.postprocess_button.setStyleSheet("color: #dc3545; font-weight: bold;" if failed else "")
+
+    def on_postprocess_job_updated(self, job):
+        """Сообщает о неудачной обработке записи"""
+        if job.state == JOB_FAILED:
+            self.status_bar.showMessage(self.localization_manager.tr(
+                "messages.postprocess_failed", file=os.path.basename(job.source), error=job.error), 5000)
+
     def _on_qr_device_connected(self, device_info: str):
         """Обработчик подключения устройства через QR"""
         self.status_bar.showMessage(self.localization_manager.tr("messages.qr_device_connected"), 3000)
@@ -540,8 +915,43 @@ class MainWindow(QMainWindow):
     def on_devices_changed(self, devices):
         """Обработчик изменения списка устройств"""
         self.update_devices_display(devices)
+        self._rendered_devices = devices
         self.update_status()
 
+    def on_device_info_updated(self, device):
+        """Обработчик получения подробностей об одном устройстве"""
+        if self.compact_list_check.isChecked():
+            self.device_list_view.update_device(device)
+            return
+        device_widget = self.device_widgets.get(device['id'])
+        if device_widget is not None:
+            device_widget.update_device_info(device)
+
+    def on_session_state_changed(self, device_id, state):
+        """Обработчик смены этапа сессии (запуск, подключение, первый кадр)"""
+        device_widget = self.device_widgets.get(device_id)
+        if device_widget is not None:
+            device_widget.update_session_state(state)
+        session = self.scrcpy_manager.get_session(device_id)
+        if state == 'streaming' and session is not None and session.time_to_first_frame is not None:
+            self.status_bar.showMessage(self.localization_manager.tr(
+                "messages.session_first_frame", device_id=device_id,
+                seconds=f"{session.time_to_first_frame:.1f}"), 3000)
+
+    def on_telemetry_updated(self, updates):
+        """Обработчик пачки обновлений телеметрии сессий"""
+        for device_id, telemetry in updates.items():
+            device_widget = self.device_widgets.get(device_id)
+            if device_widget is not None:
+                device_widget.update_telemetry(telemetry)
+
+    def on_tracking_state_changed(self, active):
+        """Переключает опрос по таймеру в зависимости от состояния отслеживания устройств"""
+        if active:
+            self.refresh_timer.stop()
+        elif self.auto_refresh_check.isChecked():
+            self.refresh_timer.start(5000)
+
     def on_scrcpy_started(self, device_id, process_id):
         """Обработчик запуска scrcpy"""
         # Показываем сообщение о запуске только на короткое время, чтобы не перекрывать ошибки
@@ -551,6 +961,11 @@ class MainWindow(QMainWindow):
 
     def on_scrcpy_finished(self, device_id, exit_code):
         """Обработчик завершения scrcpy"""
+        # Телеметрию, адаптацию качества и нумерацию сегментов сохраняем, только если сессию перезапустит супервизор
+        if not self.session_supervisor.is_pending_restart(device_id):
+            self.session_telemetry.reset(device_id)
+            self.adaptive_quality.untrack(device_id)
+            self.recording_segmenter.stop(device_id)
         # Показываем сообщение о завершении только если нет активных ошибок
         if exit_code == 0:  # Нормальное завершение
             self.status_bar.showMessage(self.localization_manager.tr("messages.scrcpy_finished", device_id=device_id), 3000)
@@ -560,11 +975,43 @@ class MainWindow(QMainWindow):
 
     def on_scrcpy_error(self, device_id, error_message):
         """Обработчик ошибки scrcpy"""
+        if self.session_supervisor.get_session_stats(device_id) is not None:
+            # Сессию перезапустит супервизор - не блокируем окно диалогом
+            self.status_bar.showMessage(f"[{device_id}]: {error_message}", 5000)
+            return
         QMessageBox.warning(self, self.localization_manager.tr("messages.scrcpy_error"),
                             f"{self.localization_manager.tr('messages.error')} для {device_id}:\n{error_message}")
         self.update_status()
         self.refresh_devices()
 
+    def on_session_restarting(self, device_id, attempt, delay):
+        """Обработчик планирования перезапуска сессии"""
+        self.status_bar.showMessage(self.localization_manager.tr(
+            "messages.session_restarting", device_id=device_id, delay=f"{delay:.1f}", attempt=attempt), 5000)
+
+    def on_session_waiting_device(self, device_id):
+        """Обработчик ожидания переподключения устройства"""
+        self.status_bar.showMessage(
+            self.localization_manager.tr("messages.session_waiting_device", device_id=device_id), 0)
+
+    def on_session_restored(self, device_id, restart_count):
+        """Обработчик успешного перезапуска сессии"""
+        self.status_bar.showMessage(
+            self.localization_manager.tr("messages.session_restored", device_id=device_id, count=restart_count), 3000)
+
+    def on_session_gave_up(self, device_id, failures):
+        """Обработчик срабатывания защиты от crash-loop"""
+        self.status_bar.showMessage(
+            self.localization_manager.tr("messages.session_gave_up", device_id=device_id, failures=failures), 0)
+        self.update_status()
+
+    def on_session_finished(self, device_id):
+        """Сессия завершена фильтром запуска (исчерпано время записи)"""
+        self.adaptive_quality.untrack(device_id)
+        self.status_bar.showMessage(
+            self.localization_manager.tr("messages.session_finished", device_id=device_id), 5000)
+        self.update_devices_display(self.adb_manager.devices)
+
     def on_scrcpy_stderr(self, device_id, error_output):
         """Обработчик ошибок stderr от scrcpy"""
         # Показываем ошибку в статусбаре с высоким приоритетом
@@ -598,8 +1045,15 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """Обработчик закрытия приложения"""
-        # Останавливаем все процессы scrcpy
-        self.scrcpy_manager.stop_all_scrcpy()
+        # Останавливаем отслеживание устройств и все процессы scrcpy
+        self.async_adb.shutdown()
+        self.adb_manager.shutdown()
+        for benchmark in self.encoder_benchmarks.values():
+            benchmark.cancel()
+        self.session_supervisor.stop_all()
+        self.scrcpy_manager.shutdown(timeout_ms=3000)
+        self.recording_segmenter.shutdown()
+        self.postprocess_queue.shutdown()
 
         # Сохраняем настройки
         self.config_manager.save_config()
@@ -0,0 +1,163 @@
+import os
+
+from PyQt5.QtGui import QColor, QIcon
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGroupBox, QCheckBox, QSpinBox,
+                             QLabel, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView,
+                             QProgressBar, QAbstractItemView)
+
+from core.postprocess_queue import JOB_FAILED, JOB_RUNNING
+from core.utils import get_icon_path
+
+
+class PostProcessDialog(QDialog):
+    """Окно очереди обработки записей: настройки, прогресс и ошибки по каждому файлу"""
+
+    COLUMN_FILE, COLUMN_TASK, COLUMN_STATE, COLUMN_PROGRESS, COLUMN_ERROR = range(5)
+
+    def __init__(self, queue, config_manager, parent=None, localization_manager=None):
+        super().__init__(parent)
+        self.queue = queue
+        self.config_manager = config_manager
+        self.localization_manager = localization_manager
+        self._rows = {}  # id задания -> строка таблицы
+
+        self.setWindowTitle(self.localization_manager.tr("postprocess.title"))
+        self.resize(800, 450)
+
+        # Устанавливаем иконку окна
+        icon_path = get_icon_path()
+        if os.path.exists(icon_path):
+            self.setWindowIcon(QIcon(icon_path))
+
+        self._create_ui()
+        self._load_settings()
+        self.queue.queue_changed.connect(self._populate)
+        self.queue.job_updated.connect(self._update_job)
+        self._populate()
+
+    def _create_ui(self):
+        """Создает интерфейс диалога"""
+        tr = self.localization_manager.tr
+        layout = QVBoxLayout()
+
+        # Настройки обработки
+        settings_group = QGroupBox(tr("postprocess.settings"))
+        settings_layout = QHBoxLayout()
+        self.enabled_check = QCheckBox(tr("postprocess.enabled"))
+        self.enabled_check.setToolTip(tr("postprocess.enabled_tooltip"))
+        self.remux_check = QCheckBox(tr("postprocess.remux"))
+        self.transcode_check = QCheckBox(tr("postprocess.transcode"))
+        self.transcode_check.setToolTip(tr("postprocess.transcode_tooltip"))
+        self.thumbnail_check = QCheckBox(tr("postprocess.thumbnail"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 4)
+        self.workers_spin.setToolTip(tr("postprocess.workers_tooltip"))
+        for check in (self.enabled_check, self.remux_check, self.transcode_check, self.thumbnail_check):
+            check.toggled.connect(self._save_settings)
+            settings_layout.addWidget(check)
+        self.workers_spin.valueChanged.connect(self._save_settings)
+        settings_layout.addWidget(QLabel(tr("postprocess.workers")))
+        settings_layout.addWidget(self.workers_spin)
+        settings_layout.addStretch()
+        settings_group.setLayout(settings_layout)
+        layout.addWidget(settings_group)
+
+        # Таблица заданий
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels([
+            tr("postprocess.column_file"), tr("postprocess.column_task"), tr("postprocess.column_state"),
+            tr("postprocess.column_progress"), tr("postprocess.column_error")
+        ])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(self.COLUMN_FILE, QHeaderView.Stretch)
+        header.setSectionResizeMode(self.COLUMN_ERROR, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        # Кнопки
+        buttons_layout = QHBoxLayout()
+        self.summary_label = QLabel()
+        buttons_layout.addWidget(self.summary_label)
+        buttons_layout.addStretch()
+        self.retry_button = QPushButton(tr("postprocess.retry_failed"))
+        self.retry_button.clicked.connect(self.queue.retry_failed)
+        buttons_layout.addWidget(self.retry_button)
+        clear_button = QPushButton(tr("postprocess.clear_finished"))
+        clear_button.clicked.connect(self.queue.clear_finished)
+        buttons_layout.addWidget(clear_button)
+        close_button = QPushButton(tr("buttons.close"))
+        close_button.clicked.connect(self.close)
+        buttons_layout.addWidget(close_button)
+        layout.addLayout(buttons_layout)
+
+        self.setLayout(layout)
+
+    def _load_settings(self):
+        """Загружает настройки обработки"""
+        settings = self.config_manager.get_postprocess_settings()
+        widgets = (self.enabled_check, self.remux_check, self.transcode_check, self.thumbnail_check, self.workers_spin)
+        for widget in widgets:
+            widget.blockSignals(True)
+        self.enabled_check.setChecked(settings['enabled'])
+        self.remux_check.setChecked(settings['remux_mp4'])
+        self.transcode_check.setChecked(settings['transcode'])
+        self.thumbnail_check.setChecked(settings['thumbnail'])
+        self.workers_spin.setValue(settings['max_workers'])
+        for widget in widgets:
+            widget.blockSignals(False)
+
+    def _save_settings(self):
+        """Сохраняет настройки сразу при изменении"""
+        settings = self.config_manager.get_postprocess_settings()
+        settings.update({
+            'enabled': self.enabled_check.isChecked(),
+            'remux_mp4': self.remux_check.isChecked(),
+            'transcode': self.transcode_check.isChecked(),
+            'thumbnail': self.thumbnail_check.isChecked(),
+            'max_workers': self.workers_spin.value()
+        })
+        self.config_manager.set_postprocess_settings(settings)
+        self.queue.resume()
+
+    def _populate(self):
+        """Перестраивает таблицу заданий"""
+        self.table.setRowCount(0)
+        self._rows = {}
+        for job in self.queue.jobs:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            self._rows[job.id] = row
+            file_item = QTableWidgetItem(os.path.basename(job.source))
+            file_item.setToolTip(job.source)
+            self.table.setItem(row, self.COLUMN_FILE, file_item)
+            self.table.setItem(row, self.COLUMN_TASK, QTableWidgetItem(
+                self.localization_manager.tr(f"postprocess.task_{job.task}")))
+            self.table.setItem(row, self.COLUMN_STATE, QTableWidgetItem())
+            self.table.setCellWidget(row, self.COLUMN_PROGRESS, QProgressBar())
+            self.table.setItem(row, self.COLUMN_ERROR, QTableWidgetItem())
+            self._update_job(job)
+
+        failed = self.queue.failed_count()
+        self.retry_button.setEnabled(failed > 0)
+        self.summary_label.setText(self.localization_manager.tr(
+            "postprocess.summary", pending=self.queue.pending_count(), failed=failed))
+
+    def _update_job(self, job):
+        """Обновляет строку задания"""
+        row = self._rows.get(job.id)
+        if row is None:
+            return
+        self.table.item(row, self.COLUMN_STATE).setText(self.localization_manager.tr(f"postprocess.state_{job.state}"))
+        progress = self.table.cellWidget(row, self.COLUMN_PROGRESS)
+        if job.state == JOB_RUNNING and job.progress < 0:
+            progress.setRange(0, 0)  # длительность неизвестна
+        else:
+            progress.setRange(0, 100)
+            progress.setValue(max(0, job.progress))
+        error_item = self.table.item(row, self.COLUMN_ERROR)
+        error_item.setText(job.error)
+        error_item.setToolTip(job.error)
+        if job.state == JOB_FAILED:
+            error_item.setForeground(QColor('#dc3545'))
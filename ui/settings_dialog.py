@@ -153,6 +153,12 @@ class SettingsDialog(QDialog):
         encoder_label = self.localization_manager.tr("main_settings.video.encoder")
         layout.addRow(encoder_label, self.encoder_edit)
 
+        # Адаптивное качество
+        self.adaptive_check = QCheckBox()
+        self.adaptive_check.setToolTip(self.localization_manager.tr("main_settings.video.adaptive_tooltip"))
+        adaptive_label = self.localization_manager.tr("main_settings.video.adaptive")
+        layout.addRow(adaptive_label, self.adaptive_check)
+
         widget.setLayout(layout)
         return widget
 
@@ -379,6 +385,36 @@ class SettingsDialog(QDialog):
         time_limit_label = self.localization_manager.tr("main_settings.record.time_limit")
         layout.addRow(time_limit_label, self.time_limit_spin)
 
+        # Только запись, без окна
+        self.record_only_check = QCheckBox(self.localization_manager.tr("main_settings.record.record_only"))
+        self.record_only_check.setToolTip(self.localization_manager.tr("main_settings.record.record_only_tooltip"))
+        self.record_only_check.toggled.connect(self._on_record_enabled_changed)
+        layout.addRow(self.record_only_check)
+
+        self.record_no_control_check = QCheckBox(self.localization_manager.tr("main_settings.record.no_control"))
+        self.record_no_control_check.setToolTip(self.localization_manager.tr("main_settings.record.no_control_tooltip"))
+        layout.addRow(self.record_no_control_check)
+
+        # Сегментированная запись (ротация файлов mkv)
+        self.segment_minutes_spin = self._create_record_spin(0, 1440, "units.min", "segment_minutes")
+        layout.addRow(self.localization_manager.tr("main_settings.record.segment_minutes"), self.segment_minutes_spin)
+        self.segment_size_spin = self._create_record_spin(0, 1048576, "units.mb", "segment_size")
+        layout.addRow(self.localization_manager.tr("main_settings.record.segment_size"), self.segment_size_spin)
+
+        # Политика хранения сегментов
+        self.retention_hours_spin = self._create_record_spin(0, 8760, "units.hours", "retention_hours")
+        layout.addRow(self.localization_manager.tr("main_settings.record.retention_hours"), self.retention_hours_spin)
+        self.retention_size_spin = self._create_record_spin(0, 10485760, "units.mb", "retention_size")
+        layout.addRow(self.localization_manager.tr("main_settings.record.retention_size"), self.retention_size_spin)
+
+        # Приоритет записи при нехватке места на диске
+        self.record_priority_combo = QComboBox()
+        self.record_priority_combo.addItem(self.localization_manager.tr("main_settings.record.priority_low"), -1)
+        self.record_priority_combo.addItem(self.localization_manager.tr("main_settings.record.priority_normal"), 0)
+        self.record_priority_combo.addItem(self.localization_manager.tr("main_settings.record.priority_high"), 1)
+        self.record_priority_combo.setToolTip(self.localization_manager.tr("main_settings.record.priority_tooltip"))
+        layout.addRow(self.localization_manager.tr("main_settings.record.priority"), self.record_priority_combo)
+
         # Изначально отключаем поля записи
         self._update_record_fields_state()
 
@@ -463,9 +499,29 @@ class SettingsDialog(QDialog):
         shortcut_mod_label = self.localization_manager.tr("main_settings.advanced.shortcut_mod")
         layout.addRow(shortcut_mod_label, self.shortcut_mod_edit)
 
+        # Автоматический перезапуск сессии
+        self.restart_policy_combo = QComboBox()
+        self.restart_policy_combo.addItem(self.localization_manager.tr("main_settings.advanced.restart_never"), "never")
+        self.restart_policy_combo.addItem(
+            self.localization_manager.tr("main_settings.advanced.restart_on_failure"), "on-failure")
+        self.restart_policy_combo.addItem(self.localization_manager.tr("main_settings.advanced.restart_always"), "always")
+        self.restart_policy_combo.setToolTip(
+            self.localization_manager.tr("main_settings.advanced.restart_policy_tooltip"))
+        restart_policy_label = self.localization_manager.tr("main_settings.advanced.restart_policy")
+        layout.addRow(restart_policy_label, self.restart_policy_combo)
+
         widget.setLayout(layout)
         return widget
 
+    def _create_record_spin(self, minimum: int, maximum: int, suffix_key: str, tooltip_key: str) -> QSpinBox:
+        """Создает поле настройки сегментов (0 - выключено)"""
+        spin = QSpinBox()
+        spin.setRange(minimum, maximum)
+        spin.setSuffix(self.localization_manager.tr(suffix_key))
+        spin.setSpecialValueText(self.localization_manager.tr("main_settings.record.off"))
+        spin.setToolTip(self.localization_manager.tr(f"main_settings.record.{tooltip_key}_tooltip"))
+        return spin
+
     def _on_record_enabled_changed(self, enabled):
         """Обработчик изменения состояния чекбокса записи"""
         self._update_record_fields_state()
@@ -477,6 +533,11 @@ class SettingsDialog(QDialog):
         self.record_file_button.setEnabled(enabled)
         self.record_format_combo.setEnabled(enabled)
         self.time_limit_spin.setEnabled(enabled)
+        self.record_only_check.setEnabled(enabled)
+        self.record_no_control_check.setEnabled(enabled and self.record_only_check.isChecked())
+        for spin in (self.segment_minutes_spin, self.segment_size_spin,
+                     self.retention_hours_spin, self.retention_size_spin, self.record_priority_combo):
+            spin.setEnabled(enabled)
 
     def _select_record_file(self):
         """Выбор файла для записи"""
@@ -498,6 +559,7 @@ class SettingsDialog(QDialog):
         self.max_fps_spin.setValue(video.get('max_fps', 0))
         self.codec_combo.setCurrentText(video.get('codec', 'h264'))
         self.encoder_edit.setText(video.get('encoder', ''))
+        self.adaptive_check.setChecked(video.get('adaptive', False))
 
         audio = self.current_settings.get('audio', {})
         self.audio_codec_combo.setCurrentText(audio.get('codec', 'opus'))
@@ -567,6 +629,13 @@ class SettingsDialog(QDialog):
         self.record_file_edit.setText(record.get('file', ''))
         self.record_format_combo.setCurrentText(record.get('format', 'mp4'))
         self.time_limit_spin.setValue(record.get('time_limit', 0))
+        self.record_only_check.setChecked(record.get('record_only', False))
+        self.record_no_control_check.setChecked(record.get('no_control', False))
+        self.segment_minutes_spin.setValue(record.get('segment_minutes', 0))
+        self.segment_size_spin.setValue(record.get('segment_size_mb', 0))
+        self.retention_hours_spin.setValue(record.get('retention_hours', 0))
+        self.retention_size_spin.setValue(record.get('retention_size_mb', 0))
+        self.record_priority_combo.setCurrentIndex(max(0, self.record_priority_combo.findData(record.get('priority', 0))))
         # Обновляем состояние полей
         self._update_record_fields_state()
 
@@ -581,6 +650,8 @@ class SettingsDialog(QDialog):
         self.select_usb_check.setChecked(advanced.get('select_usb', False))
         self.select_tcpip_check.setChecked(advanced.get('select_tcpip', False))
         self.shortcut_mod_edit.setText(advanced.get('shortcut_mod', 'lctrl,lalt,lmeta'))
+        restart_index = self.restart_policy_combo.findData(advanced.get('restart_policy', 'never'))
+        self.restart_policy_combo.setCurrentIndex(max(0, restart_index))
 
         # Загружаем настройки языка
         current_language = self.localization_manager.get_language()
@@ -597,7 +668,8 @@ class SettingsDialog(QDialog):
                 'bit_rate': self.bit_rate_spin.value(),
                 'max_fps': self.max_fps_spin.value(),
                 'codec': self.codec_combo.currentText(),
-                'encoder': self.encoder_edit.text()
+                'encoder': self.encoder_edit.text(),
+                'adaptive': self.adaptive_check.isChecked()
             },
             'audio': {
                 'codec': self.audio_codec_combo.currentText(),
@@ -629,7 +701,14 @@ class SettingsDialog(QDialog):
             'record': {
                 'file': self.record_file_edit.text() if self.enable_record_check.isChecked() else '',
                 'format': self.record_format_combo.currentText(),
-                'time_limit': self.time_limit_spin.value()
+                'time_limit': self.time_limit_spin.value(),
+                'record_only': self.record_only_check.isChecked(),
+                'no_control': self.record_no_control_check.isChecked(),
+                'segment_minutes': self.segment_minutes_spin.value(),
+                'segment_size_mb': self.segment_size_spin.value(),
+                'retention_hours': self.retention_hours_spin.value(),
+                'retention_size_mb': self.retention_size_spin.value(),
+                'priority': self.record_priority_combo.currentData()
             },
             'advanced': {
                 'otg': self.otg_check.isChecked(),
@@ -641,7 +720,8 @@ class SettingsDialog(QDialog):
                 'display_id': self.display_id_spin.value(),
                 'select_usb': self.select_usb_check.isChecked(),
                 'select_tcpip': self.select_tcpip_check.isChecked(),
-                'shortcut_mod': self.shortcut_mod_edit.text()
+                'shortcut_mod': self.shortcut_mod_edit.text(),
+                'restart_policy': self.restart_policy_combo.currentData() or 'never'
             }
         }
 